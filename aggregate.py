@@ -0,0 +1,304 @@
+"""ISBN 기준 서점 간 대사(reconciliation)/집계
+
+통합 결과를 정규화한 ISBN으로 해시 색인(IsbnIndex)한 뒤 (ISBN, 서점)별 합계 상태를 만든다.
+상태는 합계(건수/수량/금액)와 최솟값/최댓값(단가/정가)만 가지므로 새 묶음이 들어오면
+그 묶음만 집계해 기존 상태와 합치면 된다(전체 재계산 없음).
+"""
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+from isbn import normalize_isbn
+
+# 단가 차이 허용 오차(원). 교보 단가는 합계금액/수량을 반올림한 값이라 0.01 단위 오차가 생긴다.
+PRICE_TOLERANCE = 0.01
+
+# 상태 열 → 묶음끼리 합칠 때의 연산
+_MERGE = {
+    "도서명": "first",
+    "건수": "sum",
+    "입고수량": "sum",
+    "정산액": "sum",
+    "정가금액": "sum",        # 정가 × 입고수량(정가가 있는 행만)
+    "정가기준정산액": "sum",  # 위 행들의 정산액(실효 입고율 분자)
+    "단가최소": "min",
+    "단가최대": "max",
+    "정가최소": "min",
+    "정가최대": "max",
+}
+_STATE_COLUMNS = list(_MERGE)
+
+
+def normalize_isbn_key(s: pd.Series) -> pd.Series:
+    """색인용 ISBN 키(isbn.normalize_isbn): 정리 후 ISBN-10은 ISBN-13으로. 없으면 ''"""
+    return normalize_isbn(s)[0]
+
+
+class IsbnIndex:
+    """정규화 ISBN → 행 위치 해시 색인
+
+    keys: 고유 ISBN(pd.Index, 해시 조회), codes: 행별 키 번호(-1 = ISBN 없음).
+    행 위치는 첫 조회 때 키 번호순으로 정렬해 두고(offsets 구간) 이후 복사 없이 잘라 준다.
+    """
+
+    def __init__(self, isbn: pd.Series):
+        # 원본 값으로 먼저 해시 분해한 뒤 고유값만 정규화한다(행마다 문자열 연산하지 않음)
+        raw_codes, raw_uniques = pd.factorize(isbn, use_na_sentinel=True)
+        norm = normalize_isbn_key(pd.Series(raw_uniques, dtype=object))
+        key_codes, uniques = pd.factorize(norm.where(norm != "", None).to_numpy(dtype=object), use_na_sentinel=True)
+        codes = np.where(raw_codes >= 0, np.append(key_codes, -1)[raw_codes], -1)
+        self.keys = pd.Index(uniques, dtype=object)
+        self.codes = codes.astype(np.int64)
+        self._order: np.ndarray | None = None
+        self._offsets: np.ndarray | None = None
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, isbn: str) -> bool:
+        return isbn in self.keys
+
+    @property
+    def missing(self) -> int:
+        """ISBN이 없는 행 수"""
+        return int((self.codes < 0).sum())
+
+    def positions(self, isbn: str) -> np.ndarray:
+        """해당 ISBN 행의 위치(원래 순서). 없으면 빈 배열"""
+        i = self.keys.get_indexer([normalize_isbn_key(pd.Series([isbn])).iat[0]])[0]
+        if i < 0:
+            return np.empty(0, dtype=np.int64)
+        if self._order is None:
+            # 첫 조회 때 키 번호순 행 위치와 구간 경계를 만든다
+            valid = self.codes >= 0
+            self._order = np.flatnonzero(valid)[np.argsort(self.codes[valid], kind="stable")]
+            self._offsets = np.concatenate(([0], np.cumsum(np.bincount(self.codes[valid], minlength=len(self.keys)))))
+        return self._order[self._offsets[i]:self._offsets[i + 1]]
+
+
+def _reduce(codes: np.ndarray, n: int, cols: dict[str, np.ndarray]) -> dict[str, np.ndarray]:
+    """그룹 번호(0..n-1)별로 _MERGE 연산 적용. 정렬 없이 bincount/ufunc.at만 쓴다."""
+    out: dict[str, np.ndarray] = {}
+    for c, how in _MERGE.items():
+        v = cols[c]
+        if how == "sum":
+            out[c] = np.bincount(codes, weights=v, minlength=n)
+        elif how in ("min", "max"):
+            res = np.full(n, np.nan)
+            (np.fmin if how == "min" else np.fmax).at(res, codes, v)  # NaN 무시
+            out[c] = res
+        else:
+            out[c] = _first(codes, n, v)
+    return out
+
+
+def _first(codes: np.ndarray, n: int, v: np.ndarray) -> np.ndarray:
+    """그룹별 처음 나온 None/NaN 아닌 값"""
+    nonnull = np.flatnonzero(pd.notna(v))
+    first = pd.Series(codes[nonnull]).drop_duplicates()
+    res = np.full(n, None, dtype=object)
+    res[first.to_numpy()] = v[nonnull[first.index.to_numpy()]]
+    return res
+
+
+def _batch_state(df: pd.DataFrame, index: IsbnIndex | None = None) -> pd.DataFrame:
+    """묶음 하나의 (ISBN, 서점명)별 상태"""
+    index = index or IsbnIndex(df["ISBN"])
+    valid = index.codes >= 0
+    if not valid.any():
+        return _empty_state()
+
+    store_codes, stores = pd.factorize(df["서점명"].astype(object).to_numpy(), use_na_sentinel=False)
+    ns = max(len(stores), 1)
+    codes, gids = pd.factorize(index.codes[valid] * ns + store_codes[valid])
+
+    qty = df["입고수량"].to_numpy(dtype="float64")[valid]
+    amount = df["정산액"].to_numpy(dtype="float64")[valid]
+    unit = df["단가"].to_numpy(dtype="float64")[valid]
+    list_price = df["정가"].to_numpy(dtype="float64")[valid]
+    has_list = list_price > 0
+    title = df["도서명"].astype(object).to_numpy()[valid]
+    has_title = (df["도서명"].fillna("") != "").to_numpy(dtype=bool)[valid]
+
+    st = _reduce(codes, len(gids), {
+        "도서명": np.where(has_title, title, None),
+        "건수": np.ones(len(qty)),
+        "입고수량": qty,
+        "정산액": amount,
+        "정가금액": np.where(has_list, list_price * qty, 0.0),
+        "정가기준정산액": np.where(has_list, amount, 0.0),
+        # 0은 '값 없음'(파싱 기본값)이라 최솟값/최댓값에서 뺀다
+        "단가최소": np.where(unit > 0, unit, np.nan),
+        "단가최대": np.where(unit > 0, unit, np.nan),
+        "정가최소": np.where(has_list, list_price, np.nan),
+        "정가최대": np.where(has_list, list_price, np.nan),
+    })
+    return pd.DataFrame(st, index=_state_index(index.keys, stores, gids, ns))
+
+
+def _combine(*states: pd.DataFrame) -> pd.DataFrame:
+    """상태끼리 합치기(같은 (ISBN, 서점명)은 _MERGE 연산)"""
+    states = [st for st in states if len(st)]
+    if not states:
+        return _empty_state()
+    combined = pd.concat(states)
+    isbn_codes, isbns = pd.factorize(combined.index.get_level_values("ISBN"))
+    store_codes, stores = pd.factorize(combined.index.get_level_values("서점명"))
+    ns = max(len(stores), 1)
+    codes, gids = pd.factorize(isbn_codes * ns + store_codes)
+    st = _reduce(codes, len(gids), {c: combined[c].to_numpy() for c in _STATE_COLUMNS})
+    return pd.DataFrame(st, index=_state_index(isbns, stores, gids, ns))
+
+
+def _state_index(isbns, stores, gids: np.ndarray, ns: int) -> pd.MultiIndex:
+    """(ISBN 번호 × ns + 서점 번호) → MultiIndex. 고유값 배열을 level로 바로 써서 다시 분해하지 않는다."""
+    return pd.MultiIndex(
+        levels=[pd.Index(isbns, dtype=object), pd.Index(stores, dtype=object)],
+        codes=[gids // ns, gids % ns],
+        names=["ISBN", "서점명"],
+        verify_integrity=False,
+    )
+
+
+def _store_order(store: str) -> tuple[int, str]:
+    from pub_settlement import STORE_NAMES
+    return (STORE_NAMES.index(store) if store in STORE_NAMES else len(STORE_NAMES), store)
+
+
+def _empty_state() -> pd.DataFrame:
+    idx = pd.MultiIndex.from_arrays([[], []], names=["ISBN", "서점명"])
+    return pd.DataFrame({c: pd.Series(dtype=object if c == "도서명" else "float64") for c in _STATE_COLUMNS}, index=idx)
+
+
+class SettlementAggregate:
+    """(ISBN, 서점)별 누적 집계. update()로 새 묶음을 더해 간다."""
+
+    def __init__(self, state: pd.DataFrame | None = None):
+        # 밖에서 받은 상태(저장해 둔 보고서 등)는 한 번 합쳐 키를 고유하게 맞춘다
+        self.state = _empty_state() if state is None else _combine(state[_STATE_COLUMNS])
+        self.missing_isbn = 0  # ISBN이 없어 집계에서 뺀 행 수
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "SettlementAggregate":
+        return cls().update(df)
+
+    @classmethod
+    def from_chunks(cls, chunks) -> "SettlementAggregate":
+        agg = cls()
+        for chunk in chunks:
+            agg.update(chunk)
+        return agg
+
+    def update(self, df: pd.DataFrame) -> "SettlementAggregate":
+        """통합 스키마 묶음을 더한다(기존 상태 + 묶음 상태만 합침)"""
+        if len(df) == 0:
+            return self
+        index = IsbnIndex(df["ISBN"])
+        self.missing_isbn += index.missing
+        batch = _batch_state(df, index)
+        if len(self.state) == 0:
+            self.state = batch
+        elif len(batch):
+            self.state = _combine(self.state, batch)
+        return self
+
+    def merge(self, other: "SettlementAggregate") -> "SettlementAggregate":
+        """다른 집계(예: 다른 달/다른 작업)와 합친 새 집계"""
+        out = SettlementAggregate(_combine(self.state, other.state))
+        out.missing_isbn = self.missing_isbn + other.missing_isbn
+        return out
+
+    # ----------------- 결과 ----------------- #
+    def _codes(self) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """상태 행별 (ISBN 번호, 서점 번호)와 각 고유값(상태 MultiIndex의 level/code 그대로)"""
+        idx = self.state.index
+        return (
+            np.asarray(idx.codes[0]), idx.levels[0].to_numpy(dtype=object),
+            np.asarray(idx.codes[1]), idx.levels[1].to_numpy(dtype=object),
+        )
+
+    def _effective_rate(self) -> pd.Series:
+        """실효 입고율(%) = 정산액 / (정가 × 입고수량) × 100 (정가가 있는 행 기준)"""
+        st = self.state
+        return (st["정가기준정산액"] / st["정가금액"].where(st["정가금액"] != 0) * 100).round(1)
+
+    def by_title_store(self) -> pd.DataFrame:
+        """ISBN×서점 행: 도서명, 건수, 입고수량, 정산액, 실효 입고율(%)"""
+        st = self.state
+        out = st[["도서명", "건수", "입고수량", "정산액"]].assign(실효입고율=self._effective_rate()).reset_index()
+        out["건수"] = out["건수"].astype("int64")
+        out["입고수량"] = out["입고수량"].astype("int64")
+        order = out["서점명"].map(lambda v: _store_order(str(v)))
+        return out.assign(_o=order).sort_values(["ISBN", "_o"], ignore_index=True).drop(columns="_o")
+
+    def pivot(self, value: str = "입고수량") -> pd.DataFrame:
+        """도서(ISBN)별 행 × 서점별 열 표. value: 입고수량 | 정산액 | 실효입고율"""
+        if value not in ("입고수량", "정산액", "실효입고율"):
+            raise ValueError(f"value must be 입고수량/정산액/실효입고율: {value}")
+        ic, isbns, sc, stores = self._codes()
+        v = (self._effective_rate() if value == "실효입고율" else self.state[value]).to_numpy(dtype="float64")
+        grid = np.full((len(isbns), len(stores)), np.nan)
+        grid[ic, sc] = v
+        rows = np.bincount(ic, minlength=len(isbns)) > 0
+        cols = sorted(np.flatnonzero(np.bincount(sc, minlength=len(stores))), key=lambda j: _store_order(str(stores[j])))
+        table = pd.DataFrame(grid[rows][:, cols], columns=[str(stores[j]) for j in cols])
+        if value != "실효입고율":
+            table = table.fillna(0)
+            table["합계"] = table.sum(axis=1)
+            if value == "입고수량":
+                table = table.astype("int64")
+        table.insert(0, "도서명", _first(ic, len(isbns), self.state["도서명"].to_numpy())[rows])
+        table.insert(0, "ISBN", isbns[rows])
+        return table.sort_values("ISBN", ignore_index=True)
+
+    def discrepancies(self, tolerance: float = PRICE_TOLERANCE, cross_store_only: bool = True) -> pd.DataFrame:
+        """같은 ISBN인데 서점 간 단가/정가가 다른 도서
+
+        기본은 두 곳 이상의 서점에 있는 ISBN만 본다. cross_store_only=False면
+        한 서점 안의 단가/정가 차이(예: 같은 서점의 입고 건별 단가가 다름)도 잡는다.
+        """
+        ic, isbns, sc, stores = self._codes()
+        n = len(isbns)
+        st = self.state
+        g = {"서점수": np.bincount(ic, minlength=n)}
+        for c, ufunc in (("단가최소", np.fmin), ("단가최대", np.fmax), ("정가최소", np.fmin), ("정가최대", np.fmax)):
+            res = np.full(n, np.nan)
+            ufunc.at(res, ic, st[c].to_numpy(dtype="float64"))
+            g[c] = res
+        unit_diff = (g["단가최대"] - g["단가최소"]) > tolerance
+        list_diff = (g["정가최대"] - g["정가최소"]) > 0
+        flagged = unit_diff | list_diff
+        flagged &= g["서점수"] > (1 if cross_store_only else 0)
+        sel = np.flatnonzero(flagged)
+
+        # 서점 목록 문자열(서점 수가 적어 서점별 열 연산으로 이어 붙임)
+        present = np.zeros((n, len(stores)), dtype=bool)
+        present[ic, sc] = True
+        names = pd.Series("", index=sel, dtype=object)
+        for j in sorted(range(len(stores)), key=lambda j: _store_order(str(stores[j]))):
+            has = present[sel, j]
+            names[has] = np.where(names[has] == "", "", names[has] + ", ") + str(stores[j])
+
+        out = pd.DataFrame({
+            "ISBN": isbns[sel],
+            "도서명": _first(ic, n, st["도서명"].to_numpy())[sel],
+            "서점": names.to_numpy(),
+            "서점수": g["서점수"][sel],
+            **{c: g[c][sel] for c in ("단가최소", "단가최대", "정가최소", "정가최대")},
+            "단가불일치": unit_diff[sel],
+            "정가불일치": list_diff[sel],
+        })
+        return out.sort_values("ISBN", ignore_index=True)
+
+    def report(self, tolerance: float = PRICE_TOLERANCE) -> pd.DataFrame:
+        """대사 보고서: ISBN×서점 행에 ISBN 단위 단가/정가 불일치 표시를 붙인 표"""
+        flags = self.discrepancies(tolerance)[["ISBN", "단가불일치", "정가불일치"]]
+        out = self.by_title_store().merge(flags, on="ISBN", how="left")
+        for c in ("단가불일치", "정가불일치"):
+            out[c] = out[c].eq(True)  # 집계에 없는 ISBN(NaN) → False
+        return out
+
+    def lookup(self, isbn: str) -> pd.DataFrame:
+        """ISBN 하나의 서점별 상태"""
+        key = normalize_isbn_key(pd.Series([isbn])).iat[0]
+        i = self.state.index.levels[0].get_indexer([key])[0]
+        return self.state[np.asarray(self.state.index.codes[0]) == i] if i >= 0 else self.state.iloc[0:0]
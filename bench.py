@@ -0,0 +1,316 @@
+# bench.py — 파싱 파이프라인 벤치마크(합성 정산서 생성 + 단계별 측정 + 기준선 비교)
+"""
+사용 예:
+    python bench.py                         # 1k/100k 행, .xlsx/.xls, 결과 표 출력
+    python bench.py --sizes 1k,100k,1m      # 1M 행까지
+    python bench.py --save-baseline         # 현재 결과를 기준선으로 저장
+    python bench.py --threshold 0.2         # 기준선보다 20% 넘게 느린 단계가 있으면 종료 코드 1
+
+단계: read(엑셀 읽기, 처리기의 _read_*/_stream_*) → filter(유효 행 선별) → normalize(통합 스키마 변환)
+      → merge(스키마 고정 + 병합) → export.csv / export.xlsx, 그리고 process_file 전체(total).
+최대 메모리는 tracemalloc 기준(Python/NumPy 할당, Arrow 버퍼 제외)이며 시간 측정과 따로 잰다
+(tracemalloc은 읽기 단계를 크게 느리게 하므로 큰 파일은 --no-memory로 시간만 잴 수 있다).
+"""
+from __future__ import annotations
+import argparse
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+
+SIZES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+XLS_MAX_ROWS = 65_535  # .xls(BIFF8) 시트 행 한도 65,536 - 머리글
+
+# 기준선 대비 허용 지연 비율(PUB_SETTLEMENT_BENCH_THRESHOLD), 그보다 작은 절대 차이(초)는 잡음으로 본다
+THRESHOLD = float(os.environ.get("PUB_SETTLEMENT_BENCH_THRESHOLD", "0.25"))
+MIN_DELTA = 0.05
+BASELINE = "bench_baseline.json"
+DATA_DIR = os.environ.get("PUB_SETTLEMENT_BENCH_DIR", os.path.join(tempfile.gettempdir(), "pub_settlement_bench"))
+
+
+# ----------------- 합성 정산서 ----------------- #
+def _messy(values: np.ndarray, rng: np.random.Generator, share: float, fmt) -> np.ndarray:
+    """values 중 share 비율을 fmt(값)의 문자열로 바꾼 object 배열"""
+    out = values.astype(object)
+    idx = np.flatnonzero(rng.random(len(values)) < share)
+    out[idx] = [fmt(v) for v in values[idx]]
+    return out
+
+def yes24_frame(n: int, seed: int = 0) -> pd.DataFrame:
+    """예스24 입고 내역 n행(상품명/입고번호 빈 행, '1,000'·'₩'·'%' 표기 섞임)"""
+    rng = np.random.default_rng(seed)
+    qty = rng.integers(1, 50, n)
+    list_price = rng.choice([12000, 15000, 16800, 18000, 22000], n)
+    rate = rng.choice([55, 60, 65], n)
+    cost = list_price * rate // 100
+    df = pd.DataFrame({
+        "입고번호": (np.arange(n) + 1_000_000).astype(object),
+        "입고일자": "2025-10-01",
+        "상품명": np.char.add("도서 ", (np.arange(n) % 5000).astype(str)).astype(object),
+        "ISBN13": (9791100000000 + rng.integers(0, 50_000, n)).astype(object),
+        "입고수량": _messy(qty, rng, 0.05, lambda v: f"{v:,}"),
+        "원가": _messy(cost, rng, 0.05, lambda v: f"₩{v:,}"),
+        "조정입고금액": _messy(qty * cost, rng, 0.05, lambda v: f"{v:,}"),
+        "정가": _messy(list_price, rng, 0.05, lambda v: f"{v:,}"),
+        "입고율": _messy(rate, rng, 0.05, lambda v: f"{v}%"),
+    })
+    df.loc[::997, "상품명"] = None   # 제외될 행
+    df.loc[::1499, "입고번호"] = None
+    return df
+
+def kyobo_blocks(n: int, seed: int = 0) -> tuple[list[list], list[str], pd.DataFrame]:
+    """교보 정산서: (3행 서두, 여러 줄 머리글, 본문 n행 + 1,000행마다 소계 + 끝 합계)"""
+    rng = np.random.default_rng(seed + 1)
+    qty = rng.integers(-2, 30, n)
+    list_price = rng.choice([12000, 15000, 16800, 18000, 22000], n)
+    rate = rng.choice([55, 60, 65], n)
+    total = qty * list_price * rate // 100
+    preamble = [
+        ["교보문고 위탁 판매 정산서"],
+        ["거래처: 합성 출판사", None, None, "정산기간: 2025-10-01 ~ 2025-10-31"],
+        [None],
+    ]
+    header = ["순번", "상품코드", "상품\n명", "저자", "정가", "공급 율", "수량", "합계\n금액"]
+    body = pd.DataFrame({
+        "순번": np.arange(1, n + 1).astype(object),
+        "상품코드": _messy(9791100000000 + rng.integers(0, 50_000, n), rng, 0.3, str),
+        "상품명": np.char.add("도서 ", (np.arange(n) % 5000).astype(str)).astype(object),
+        "저자": "저자",
+        "정가": _messy(list_price, rng, 0.05, lambda v: f"{v:,}"),
+        "공급율": rate.astype(object),
+        "수량": _messy(qty, rng, 0.03, lambda v: f" {v} "),
+        "합계금액": _messy(total, rng, 0.05, lambda v: f"{v:,}"),
+    })
+    # 1,000행마다 소계(수량 빈 칸 → 제외 대상), 끝에 합계
+    sub = pd.DataFrame({c: [None] * (n // 1000) for c in body.columns})
+    sub["순번"] = "소계"
+    sub["합계금액"] = "-"
+    sub.index = np.arange(1, n // 1000 + 1) * 1000 - 0.5
+    body = pd.concat([body, sub]).sort_index(kind="stable").reset_index(drop=True) if len(sub) else body
+    last = pd.DataFrame([["합계", None, None, None, None, None, None, None]], columns=body.columns)
+    return preamble, header, pd.concat([body, last], ignore_index=True)
+
+def _write_xls(path: str, rows) -> None:
+    import xlwt  # .xls 생성에만 필요(선택 의존성)
+    wb = xlwt.Workbook(encoding="utf-8")
+    ws = wb.add_sheet("Sheet1")
+    for r, row in enumerate(rows):
+        for c, v in enumerate(row):
+            if v is not None and v == v:
+                ws.write(r, c, v.item() if isinstance(v, np.generic) else v)
+    wb.save(path)
+
+def _write_xlsx(path: str, rows) -> None:
+    from openpyxl import Workbook
+    wb = Workbook(write_only=True)  # 행을 바로 내보내 100만 행도 메모리에 쌓지 않는다
+    ws = wb.create_sheet("Sheet1")
+    for row in rows:
+        ws.append([None if v is None or v != v else (v.item() if isinstance(v, np.generic) else v) for v in row])
+    wb.save(path)
+
+def generate(store: str, n: int, fmt: str, directory: str = DATA_DIR, seed: int = 0) -> str:
+    """합성 정산서 파일 경로(같은 조건의 파일이 있으면 다시 만들지 않음)"""
+    os.makedirs(directory, exist_ok=True)
+    name = {"yes24": "예스24", "kyobo": "교보"}[store]
+    path = os.path.join(directory, f"bench_{name}_{n}_{seed}.{fmt}")
+    if os.path.exists(path):
+        return path
+    if store == "yes24":
+        df = yes24_frame(n, seed)
+        lead = [list(df.columns)]
+    else:
+        preamble, header, df = kyobo_blocks(n, seed)
+        lead = preamble + [header]
+    tmp = path + ".tmp"
+    rows = chain(lead, df.itertuples(index=False, name=None))
+    (_write_xlsx if fmt == "xlsx" else _write_xls)(tmp, rows)
+    os.replace(tmp, path)
+    return path
+
+
+# ----------------- 단계 ----------------- #
+def _stages(path: str, store: str, out_dir: str):
+    """(단계 이름, 함수) 목록. 각 함수는 이전 단계 결과를 받아 다음 단계 입력을 돌려준다."""
+    import pub_settlement as ps
+    from cache import ParseCache
+
+    class Reader(ps.BookstoreSettlementProcessor):
+        """처리기 자신의 _read_*/_stream_* 경로로 읽되, 묶음은 병합하지 않고 (원본, 필터, 정규화)로 모은다"""
+
+        def __init__(self):
+            super().__init__(cache=ParseCache(max_mb=0))
+            self.captured: list[tuple[pd.DataFrame, object, object]] = []
+
+        def _ingest(self, df, filter_fn, normalize_fn) -> int:
+            self.captured.append((df, filter_fn, normalize_fn))
+            return len(df)
+
+    def read(_):
+        proc = Reader()
+        _, err = proc.process_yes24(path) if store == "yes24" else proc.process_kyobo(path)
+        if err:
+            raise RuntimeError(err)
+        return proc.captured
+
+    def filter_(captured):
+        return [(filter_fn(df), normalize_fn) for df, filter_fn, normalize_fn in captured]
+
+    def normalize(kept):
+        return [normalize_fn(df) for df, normalize_fn in kept]
+
+    def merge(frames):
+        proc = ps.BookstoreSettlementProcessor(cache=ParseCache(max_mb=0))
+        for f in frames:
+            proc._append(f)
+        proc.get_unified_dataframe()
+        return proc
+
+    def export_csv(proc):
+        proc.save(os.path.join(out_dir, "bench.csv"))
+        return proc
+
+    def export_xlsx(proc):
+        proc.save(os.path.join(out_dir, "bench.xlsx"))
+        return proc
+
+    def total(_):
+        proc = ps.BookstoreSettlementProcessor(cache=ParseCache(max_mb=0))
+        cnt, err = proc.process_file(path)
+        if err:
+            raise RuntimeError(err)
+        return cnt
+
+    return [("read", read), ("filter", filter_), ("normalize", normalize), ("merge", merge),
+            ("export.csv", export_csv), ("export.xlsx", export_xlsx), ("total", total)]
+
+def run_case(path: str, store: str, rows: int, repeat: int = 1, memory: bool = True) -> list[dict]:
+    """파일 하나의 단계별 {stage, seconds, rows_per_sec, peak_mb}(반복 중 최소 시간)"""
+    with tempfile.TemporaryDirectory() as out_dir:
+        stages = _stages(path, store, out_dir)
+        best = dict.fromkeys(name for name, _ in stages)
+        for _ in range(max(1, repeat)):
+            value = None
+            for name, fn in stages:
+                gc.collect()
+                t0 = time.perf_counter()
+                value = fn(value)
+                dt = time.perf_counter() - t0
+                best[name] = dt if best[name] is None else min(best[name], dt)
+
+        peaks = {}
+        if memory:
+            value = None
+            tracemalloc.start()
+            try:
+                for name, fn in stages:
+                    if name == "total":  # 앞 단계들의 합이라 메모리 측정(느림)은 생략
+                        continue
+                    gc.collect()
+                    tracemalloc.reset_peak()
+                    base = tracemalloc.get_traced_memory()[0]
+                    value = fn(value)
+                    peaks[name] = (tracemalloc.get_traced_memory()[1] - base) / 2**20
+            finally:
+                tracemalloc.stop()
+
+    return [
+        {
+            "stage": name,
+            "seconds": round(best[name], 4),
+            "rows_per_sec": round(rows / best[name]) if best[name] else None,
+            "peak_mb": round(peaks[name], 1) if name in peaks else None,
+        }
+        for name, _ in stages
+    ]
+
+
+# ----------------- 기준선 ----------------- #
+def case_key(store: str, fmt: str, rows: int) -> str:
+    return f"{store}/{fmt}/{rows}"
+
+def compare(results: dict, baseline: dict, threshold: float = THRESHOLD) -> list[str]:
+    """기준선보다 threshold 비율(그리고 MIN_DELTA초) 넘게 느려진 단계 설명 목록"""
+    slow = []
+    for case, stages in results.items():
+        base = {s["stage"]: s["seconds"] for s in baseline.get(case, {}).get("stages", [])}
+        for s in stages.get("stages", []):
+            old = base.get(s["stage"])
+            if old and s["seconds"] > old * (1 + threshold) and s["seconds"] - old > MIN_DELTA:
+                slow.append(f"{case} {s['stage']}: {old:.3f}s → {s['seconds']:.3f}s (+{(s['seconds'] / old - 1) * 100:.0f}%)")
+    return slow
+
+def _parse_sizes(text: str) -> list[int]:
+    out = []
+    for part in filter(None, (p.strip().lower() for p in text.split(","))):
+        out.append(SIZES[part] if part in SIZES else int(part))
+    return out
+
+def _print_table(results: dict) -> None:
+    print(f"{'case':<22} {'stage':<12} {'seconds':>9} {'rows/s':>12} {'peak MB':>9}")
+    for case, res in results.items():
+        if res.get("error"):
+            print(f"{case:<22} {'-':<12} {res['error']}")
+            continue
+        for s in res["stages"]:
+            rps = f"{s['rows_per_sec']:,}" if s["rows_per_sec"] else "-"
+            peak = f"{s['peak_mb']:.1f}" if s["peak_mb"] is not None else "-"
+            print(f"{case:<22} {s['stage']:<12} {s['seconds']:>9.3f} {rps:>12} {peak:>9}")
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(prog="bench", description="정산서 파싱 파이프라인 벤치마크")
+    ap.add_argument("--sizes", default="1k,100k", help="행 수 목록(1k,100k,1m 또는 숫자, 기본 1k,100k)")
+    ap.add_argument("--stores", default="yes24,kyobo", help="서점 목록(기본 yes24,kyobo)")
+    ap.add_argument("--formats", default="xlsx,xls", help="파일 형식(기본 xlsx,xls; .xls는 xlwt 필요, 65,535행까지)")
+    ap.add_argument("--repeat", type=int, default=1, help="반복 횟수(단계별 최소 시간 사용)")
+    ap.add_argument("--no-memory", action="store_true", help="최대 메모리 측정(tracemalloc 추가 실행) 생략")
+    ap.add_argument("--data-dir", default=DATA_DIR, help=f"합성 파일 위치(기본 {DATA_DIR})")
+    ap.add_argument("--baseline", default=BASELINE, help=f"기준선 JSON(기본 {BASELINE})")
+    ap.add_argument("--save-baseline", action="store_true", help="이번 결과를 기준선으로 저장")
+    ap.add_argument("--threshold", type=float, default=THRESHOLD, help=f"허용 지연 비율(기본 {THRESHOLD})")
+    ap.add_argument("--json", metavar="PATH", help="결과를 JSON으로도 저장")
+    args = ap.parse_args(argv)
+
+    results: dict[str, dict] = {}
+    for store in filter(None, args.stores.split(",")):
+        for fmt in filter(None, args.formats.split(",")):
+            for rows in _parse_sizes(args.sizes):
+                case = case_key(store, fmt, rows)
+                if fmt == "xls" and rows > XLS_MAX_ROWS:
+                    print(f"· {case}: 건너뜀(.xls 시트 행 한도 초과)", file=sys.stderr)
+                    continue
+                try:
+                    t0 = time.perf_counter()
+                    path = generate(store, rows, fmt, args.data_dir)
+                    print(f"· {case}: {os.path.basename(path)} ({time.perf_counter() - t0:.1f}s)", file=sys.stderr)
+                    results[case] = {"file": path, "stages": run_case(path, store, rows, args.repeat, not args.no_memory)}
+                except Exception as e:  # xlwt 없음, .xls 읽기 엔진 없음 등은 해당 조합만 실패로 기록
+                    results[case] = {"error": f"{type(e).__name__}: {e}"}
+
+    _print_table(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({k: v for k, v in results.items() if "stages" in v}, f, ensure_ascii=False, indent=2)
+        print(f"\n기준선 저장: {args.baseline}")
+        return 0
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            slow = compare(results, json.load(f), args.threshold)
+        if slow:
+            print(f"\n기준선 대비 {args.threshold:.0%} 넘게 느려진 단계:\n" + "\n".join(slow))
+            return 1
+        print(f"\n기준선({args.baseline}) 대비 회귀 없음")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
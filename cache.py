@@ -0,0 +1,100 @@
+"""파일 내용 해시 기반 파싱 결과 디스크 캐시(Feather, 용량 상한 + LRU 정리)"""
+from __future__ import annotations
+import hashlib
+import os
+import pandas as pd
+
+from isbn import HAS_PYARROW
+
+CACHE_DIR = os.environ.get(
+    "PUB_SETTLEMENT_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "pub_settlement")
+)
+# 캐시 용량 상한(MB, PUB_SETTLEMENT_CACHE_MB). 0이면 캐시를 쓰지 않는다.
+CACHE_MAX_MB = float(os.environ.get("PUB_SETTLEMENT_CACHE_MB", "512"))
+
+def file_digest(filepath: str, block: int = 1 << 20) -> str:
+    """파일 내용의 SHA-256(16진수)"""
+    h = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        while chunk := f.read(block):
+            h.update(chunk)
+    return h.hexdigest()
+
+class ParseCache:
+    """(내용 해시, 서점, 파서 버전) → 정규화된 파일별 결과.
+
+    항목 파일명은 '{버전}-{서점}-{해시}.feather'이며, 적중 시 수정 시각을 갱신해
+    용량을 넘으면 오래 쓰지 않은 항목부터 지운다. 다른 파서 버전의 항목은
+    정리 때 가장 먼저 지운다.
+    """
+
+    SUFFIX = ".feather"
+
+    def __init__(self, directory: str | None = None, max_mb: float | None = None, version: str = ""):
+        self.directory = directory or CACHE_DIR
+        self.max_bytes = int((CACHE_MAX_MB if max_mb is None else max_mb) * 1024 * 1024)
+        self.version = version
+        self.enabled = HAS_PYARROW and self.max_bytes > 0
+
+    def key(self, digest: str, store: str) -> str:
+        return f"{self.version}-{store}-{digest}"
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + self.SUFFIX)
+
+    def get(self, key: str) -> pd.DataFrame | None:
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            df = pd.read_feather(path)
+            os.utime(path)  # LRU 갱신
+            return df
+        except Exception:
+            return None
+
+    def put(self, key: str, frame: pd.DataFrame) -> None:
+        if not self.enabled:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            path = self._path(key)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            frame.reset_index(drop=True).to_feather(tmp)
+            os.replace(tmp, path)
+            self._evict()
+        except Exception:
+            pass  # 캐시 실패는 처리 결과에 영향을 주지 않는다
+
+    def clear(self) -> None:
+        for name, _, _ in self._entries():
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+
+    def _entries(self) -> list[tuple[str, float, int]]:
+        out = []
+        try:
+            with os.scandir(self.directory) as it:
+                for e in it:
+                    if e.is_file() and e.name.endswith(self.SUFFIX):
+                        st = e.stat()
+                        out.append((e.name, st.st_mtime, st.st_size))
+        except OSError:
+            pass
+        return out
+
+    def _evict(self) -> None:
+        prefix = f"{self.version}-"
+        # 다른 버전 항목 먼저, 그다음 오래 쓰지 않은 순
+        entries = sorted(self._entries(), key=lambda e: (e[0].startswith(prefix), e[1]))
+        total = sum(size for _, _, size in entries)
+        for name, _, size in entries:
+            if total <= self.max_bytes and name.startswith(prefix):
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+                total -= size
+            except OSError:
+                pass
@@ -0,0 +1,145 @@
+# cli.py — GUI 없이 정산 통합(야간 배치/서버용). tkinter/ttkbootstrap을 import하지 않는다.
+from __future__ import annotations
+import argparse
+import glob
+import json
+import os
+import sys
+
+from utils import SUPPORTED_EXTS, timestamp
+
+# 종료 코드
+EXIT_OK = 0            # 모든 파일 처리 + 저장 완료
+EXIT_PARTIAL = 1       # 저장은 했지만 일부 파일 실패
+EXIT_USAGE = 2         # 인자 오류 / 입력 파일 없음
+EXIT_NO_DATA = 3       # 처리 가능한 데이터 없음
+EXIT_SAVE_FAILED = 4   # 결과 저장 실패
+
+def expand_inputs(items: list[str], recursive: bool = False) -> list[str]:
+    """파일/폴더/글롭 패턴 → 중복 없는 .xls/.xlsx 경로 목록(입력 순서 유지)"""
+    out: dict[str, None] = {}
+
+    def add(p: str, explicit: bool):
+        if os.path.isfile(p) and (explicit or os.path.splitext(p)[1].lower() in SUPPORTED_EXTS):
+            out.setdefault(os.path.abspath(p), None)
+
+    for item in items:
+        if os.path.isdir(item):
+            pattern = os.path.join(item, "**", "*") if recursive else os.path.join(item, "*")
+            for p in sorted(glob.glob(pattern, recursive=recursive)):
+                add(p, False)
+        elif glob.has_magic(item):
+            for p in sorted(glob.glob(item, recursive=recursive)):
+                add(p, False)
+        else:
+            add(item, True)
+    return list(out)
+
+def build_parser() -> argparse.ArgumentParser:
+    ap = argparse.ArgumentParser(
+        prog="pub-settlement",
+        description="서점 정산서(.xls/.xlsx)를 통합해 CSV/XLSX로 저장합니다.",
+    )
+    ap.add_argument("inputs", nargs="+", help="파일, 폴더 또는 글롭 패턴(예: 'data/*.xlsx')")
+    ap.add_argument("-o", "--output", help="저장 경로(.csv/.xlsx/.parquet/.feather, 기본: 통합정산_<시각>.csv)")
+    ap.add_argument("-r", "--recursive", action="store_true", help="폴더/패턴을 하위 폴더까지 탐색")
+    ap.add_argument("-j", "--workers", type=int, default=1, help="동시 처리 프로세스 수(기본 1)")
+    ap.add_argument("--json", action="store_true", help="요약을 JSON으로 표준출력에 쓴다")
+    ap.add_argument("--timings", action="store_true", help="파일/단계별 처리 시간·행 수·메모리를 출력")
+    ap.add_argument("--reconcile", metavar="PATH", help="ISBN×서점 대사 보고서(서점 간 단가/정가 불일치 표시)를 따로 저장")
+    ap.add_argument("--ledger", metavar="DB", help="처리 결과를 SQLite 정산 원장에도 누적(같은 파일은 한 번만)")
+    ap.add_argument("--period", metavar="YYYY-MM", help="원장에 기록할 정산 기간(기본: 파일명/수정 월에서 추정)")
+    return ap
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    files = expand_inputs(args.inputs, args.recursive)
+    if not files:
+        print("처리할 파일이 없습니다.", file=sys.stderr)
+        return EXIT_USAGE
+
+    # pandas 등은 입력 확인 후에 불러온다
+    from pub_settlement import BookstoreSettlementProcessor, format_summary, store_summary
+    from export import format_for_path
+
+    processor = BookstoreSettlementProcessor()
+    log = sys.stderr if args.json else sys.stdout
+
+    def on_result(fp: str, cnt: int, err: str | None):
+        name = os.path.basename(fp)
+        if err:
+            print(f"· {name}: {err}", file=log)
+        else:
+            cached = " (캐시)" if fp in processor.cache_hits else ""
+            print(f"· {name}: {cnt}건 처리{cached}", file=log)
+
+    results = processor.process_files(files, workers=max(1, args.workers), on_result=on_result)
+    df = processor.get_unified_dataframe()
+
+    report = {
+        "files": [
+            {"path": fp, "rows": cnt, "error": err, "cached": fp in processor.cache_hits}
+            for fp, cnt, err in results
+        ],
+        "total": len(df),
+        "stores": store_summary(df) if len(df) else [],
+        "output": None,
+    }
+    failed = sum(1 for _, _, err in results if err)
+
+    if len(df) == 0:
+        code = EXIT_NO_DATA
+    else:
+        out = args.output or f"통합정산_{timestamp()}.csv"
+        try:
+            saved = processor.save(out, None if format_for_path(out) else "csv")
+        except (OSError, ImportError, ValueError) as e:
+            print(f"저장 실패: {e}", file=sys.stderr)
+            saved = False
+        if saved:
+            report["output"] = os.path.abspath(out)
+            code = EXIT_PARTIAL if failed else EXIT_OK
+        else:
+            code = EXIT_SAVE_FAILED
+
+    if args.reconcile and len(df):
+        from export import export
+        agg = processor.aggregate()
+        mismatched = agg.discrepancies()
+        try:
+            export([agg.report()], args.reconcile, None if format_for_path(args.reconcile) else "csv")
+            report["reconcile"] = {
+                "path": os.path.abspath(args.reconcile),
+                "isbns": len(agg.state.index.levels[0]),
+                "unit_price_mismatch": int(mismatched["단가불일치"].sum()),
+                "list_price_mismatch": int(mismatched["정가불일치"].sum()),
+            }
+            print(f"대사 보고서: 불일치 ISBN {len(mismatched)}건 ({args.reconcile})", file=log)
+        except (OSError, ImportError, ValueError) as e:
+            print(f"대사 보고서 저장 실패: {e}", file=sys.stderr)
+            code = EXIT_SAVE_FAILED
+
+    if args.ledger and len(df):
+        from ledger import Ledger
+        with Ledger(args.ledger) as led:
+            added = led.ingest(processor, period=args.period)
+        report["ledger"] = {"path": os.path.abspath(args.ledger), "rows_added": sum(added.values())}
+        print(f"원장 누적: {report['ledger']['rows_added']}건 추가 ({args.ledger})", file=log)
+
+    report["stage_seconds"] = processor.report.stage_totals()
+    if args.timings:
+        print("\n처리 단계별 계측:\n" + processor.report.format_text(), file=log)
+
+    report["exit_code"] = code
+    if args.json:
+        json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+        sys.stdout.write("\n")
+    else:
+        if len(df):
+            print("\n정산 통합 결과:\n" + format_summary(df))
+        if report["output"]:
+            print(f"\n저장 완료:\n{report['output']}")
+    return code
+
+if __name__ == "__main__":
+    sys.exit(main())
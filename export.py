@@ -0,0 +1,123 @@
+"""통합 결과 내보내기(CSV/XLSX/Parquet/Feather)
+
+CSV/XLSX는 열 묶음(chunk)을 차례로 흘려 써서 결과 전체를 한 번 더 복사하지 않는다.
+XLSX는 openpyxl write_only로 행을 바로 내보내 통합 문서 객체 트리를 메모리에 만들지 않는다.
+Parquet/Feather는 pyarrow(기본 의존성)로 쓴다.
+"""
+from __future__ import annotations
+import math
+import os
+from collections.abc import Iterable, Sequence
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+from openpyxl.styles import Alignment, Border, Font, Side
+from openpyxl.utils import get_column_letter
+
+# 확장자 → 형식
+EXPORT_FORMATS = {
+    ".csv": "csv",
+    ".xlsx": "xlsx",
+    ".parquet": "parquet",
+    ".feather": "feather",
+    ".arrow": "feather",
+}
+
+# 저장 대화상자용 (설명, 패턴)
+FILETYPES = [
+    ("Excel files", "*.xlsx"),
+    ("CSV files", "*.csv"),
+    ("Parquet files", "*.parquet"),
+    ("Feather/Arrow files", "*.feather *.arrow"),
+]
+
+def format_for_path(path: str) -> str | None:
+    return EXPORT_FORMATS.get(os.path.splitext(path)[1].lower())
+
+def write_csv(chunks: Iterable[pd.DataFrame], path: str) -> None:
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        for i, chunk in enumerate(chunks):
+            chunk.to_csv(f, index=False, header=(i == 0))
+
+# 시트 한도(DataFrame.to_excel과 같이 넘으면 ValueError)
+XLSX_MAX_ROWS = 1_048_576
+XLSX_MAX_COLS = 16_384
+
+def write_xlsx(chunks: Sequence[pd.DataFrame], path: str, sheet_name: str = "Sheet1", header: bool = True) -> None:
+    """openpyxl write_only로 묶음을 차례로 흘려 쓴다(행을 바로 내보내 메모리 사용량이 행 수와 무관).
+
+    머리글은 DataFrame.to_excel과 같이 굵게/가운데/얇은 테두리(header=False면 쓰지 않음).
+    시트 크기(<dimension>)를 미리 알려 주어 openpyxl read-only가 시트 전체를 훑지 않게 하고,
+    시트 한도를 넘으면 아무것도 쓰기 전에 ValueError를 낸다.
+    """
+    chunks = list(chunks)
+    nrows = sum(len(c) for c in chunks) + (1 if header and chunks else 0)
+    ncols = max((len(c.columns) for c in chunks), default=0)
+    if nrows > XLSX_MAX_ROWS or ncols > XLSX_MAX_COLS:
+        raise ValueError(
+            f"시트가 너무 큽니다: {nrows}행 × {ncols}열 (XLSX 한도 {XLSX_MAX_ROWS}행 × {XLSX_MAX_COLS}열)"
+        )
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(sheet_name)
+    ref = f"A1:{get_column_letter(ncols)}{nrows}" if nrows and ncols else "A1"
+    ws.calculate_dimension = lambda: ref  # 시트 머리(첫 append 때 씀)의 <dimension>
+    if header and chunks:
+        ws.append([_header_cell(ws, c) for c in chunks[0].columns])
+    for chunk in chunks:
+        for row in zip(*(_cell_values(chunk[c], ws) for c in chunk.columns)):
+            ws.append(row)
+    wb.save(path)
+
+def _header_cell(ws, name) -> WriteOnlyCell:
+    cell = WriteOnlyCell(ws, _text_cell(str(name), ws))
+    thin = Side(style="thin")
+    cell.font = Font(bold=True)
+    cell.alignment = Alignment(horizontal="center", vertical="top")
+    cell.border = Border(left=thin, right=thin, top=thin, bottom=thin)
+    return cell
+
+def _cell_values(s: pd.Series, ws) -> list:
+    """열 → 셀 값 목록. 결측/NaN/inf는 빈 셀, 숫자 열은 숫자, 나머지는 문자열(섞인 열의 숫자 값은 숫자)"""
+    if pd.api.types.is_bool_dtype(s) or pd.api.types.is_numeric_dtype(s):
+        ok = s.notna()
+        if not pd.api.types.is_bool_dtype(s):
+            ok &= np.isfinite(s.astype("float64"))
+        return s.astype(object).where(ok, None).tolist()
+    return [
+        None if v is None
+        else _text_cell(v, ws) if isinstance(v, str)
+        else v if isinstance(v, bool)
+        else (v if math.isfinite(v) else None) if isinstance(v, (int, float, np.number))
+        else _text_cell(str(v), ws)
+        for v in s.astype(object).where(s.notna(), None).tolist()
+    ]
+
+def _text_cell(v: str, ws) -> str | WriteOnlyCell:
+    v = ILLEGAL_CHARACTERS_RE.sub("", v)
+    if not v.startswith("="):
+        return v
+    cell = WriteOnlyCell(ws, v)  # openpyxl은 "="로 시작하는 문자열을 수식으로 쓴다 → 문자열 셀로 고정
+    cell.data_type = "s"
+    return cell
+
+def write_parquet(df: pd.DataFrame, path: str) -> None:
+    df.to_parquet(path, index=False)
+
+def write_feather(df: pd.DataFrame, path: str) -> None:
+    df.reset_index(drop=True).to_feather(path)
+
+def export(chunks: list[pd.DataFrame], path: str, fmt: str | None = None) -> None:
+    """확장자(또는 fmt)에 맞는 형식으로 저장. 열형 형식은 묶음을 한 번 합쳐 쓴다."""
+    fmt = fmt or format_for_path(path) or "xlsx"
+    if fmt == "csv":
+        write_csv(chunks, path)
+    elif fmt == "xlsx":
+        write_xlsx(chunks, path)
+    elif fmt in ("parquet", "feather"):
+        df = chunks[0] if len(chunks) == 1 else pd.concat(chunks, ignore_index=True)
+        (write_parquet if fmt == "parquet" else write_feather)(df, path)
+    else:
+        raise ValueError(f"지원하지 않는 저장 형식: {fmt}")
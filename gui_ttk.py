@@ -1,17 +1,18 @@
 from __future__ import annotations
+import importlib
 import os
 import threading
 import queue
+from collections import deque
 import tkinter as tk
 from tkinter import filedialog, messagebox
 import ttkbootstrap as tb
 from ttkbootstrap.constants import (
-    LEFT, RIGHT, X, Y, BOTH, END, W, CENTER,
-    PRIMARY, WARNING, SECONDARY, SUCCESS, INFO, VERTICAL, ROUND, STRIPED,
+    LEFT, RIGHT, BOTTOM, X, Y, BOTH, END, W, CENTER,
+    PRIMARY, WARNING, SECONDARY, SUCCESS, INFO, DANGER, VERTICAL, ROUND, STRIPED,
 )
-from ttkbootstrap.toast import ToastNotification
 
-from pub_settlement import BookstoreSettlementProcessor
+# pandas/openpyxl/xlrd를 끌어오는 pub_settlement는 창을 띄운 뒤에 불러온다(_load_backend)
 from utils import timestamp, detect_bookstore
 
 # Optional Drag & Drop (tkinterdnd2)
@@ -22,6 +23,70 @@ except Exception:
     _DND_AVAILABLE = False
 
 
+def _load_backend():
+    """처리 모듈(pub_settlement + pandas/엑셀 엔진)을 불러온다. 이미 불러왔으면 즉시 반환."""
+    import pub_settlement
+    return pub_settlement
+
+# 설정하면(예: http://127.0.0.1:8765) 처리를 로컬 정산 서비스(service.py)에 맡기고 결과만 받는다
+SERVICE_URL = os.environ.get("PUB_SETTLEMENT_SERVICE_URL") or None
+
+def _new_processor():
+    """처리마다 새 프로세서. 서비스 주소가 있으면 같은 인터페이스의 얇은 클라이언트."""
+    if SERVICE_URL:
+        from service import RemoteProcessor
+        return RemoteProcessor(SERVICE_URL)
+    return _load_backend().BookstoreSettlementProcessor()
+
+def _warm_up_backend():
+    # 파일을 고르는 동안 백그라운드에서 미리 import(실패해도 처리 시점에 다시 시도)
+    try:
+        _load_backend()
+        for engine in ("openpyxl", "xlrd"):
+            importlib.import_module(engine)
+    except Exception:
+        pass
+
+
+# 파일 목록에 한 번(after 한 틱)에 넣는 행 수. 수천 개를 드롭해도 창이 멈추지 않게 나눠 넣는다.
+INSERT_BATCH = 300
+
+def _detect_worker(paths: queue.Queue, results: queue.Queue):
+    # 서점 감지(파일 머리 읽기)는 UI 스레드 밖에서 하고 결과만 큐로 넘긴다
+    while True:
+        p = paths.get()
+        try:
+            store = detect_bookstore(p) or "-"
+        except Exception:
+            store = "-"
+        results.put((p, store))
+
+
+# 처리 중 진행 표시 갱신 주기(ms). 작업 속도와 관계없이 초당 4번만 그린다.
+PROGRESS_INTERVAL_MS = 250
+_PROGRESS_STEPS = 1000
+
+def _format_eta(seconds: float | None) -> str:
+    if seconds is None:
+        return "계산 중"
+    m, s = divmod(int(seconds + 0.5), 60)
+    return f"{m}분 {s:02d}초" if m else f"{s}초"
+
+def _format_progress(snap: dict) -> str:
+    return (
+        f"처리 중 {snap['files_done']}/{snap['files']} 파일 · {snap['rows']:,}행"
+        f" · {snap['rows_per_sec']:,.0f}행/s · 남은 시간 {_format_eta(snap['eta_seconds'])}"
+    )
+
+
+def _default_workers() -> int:
+    """PUB_SETTLEMENT_WORKERS 환경변수 또는 CPU 수(최대 4)"""
+    try:
+        return max(1, int(os.environ["PUB_SETTLEMENT_WORKERS"]))
+    except (KeyError, ValueError):
+        return max(1, min(4, os.cpu_count() or 1))
+
+
 class SettlementGUI_ttk:
     def __init__(self, root: tk.Tk):
         self.root = root
@@ -29,15 +94,30 @@ class SettlementGUI_ttk:
         # Honor theme from the created root (main.py). Avoid re-setting here.
         self.root.geometry("880x640")
 
-        self.processor = BookstoreSettlementProcessor()
-        self.files: list[str] = []
+        self.processor = None  # 처리 시작 시 생성(_process_worker)
+        self._warmed_up = False
+        # 경로 → Treeview iid(아직 안 넣었으면 None). dict라 중복 확인/제거가 O(1)이고 추가 순서가 유지된다.
+        self.files: dict[str, str | None] = {}
+        self.stores: dict[str, str] = {}  # 경로 → 감지된 서점
+        self._pending: deque[str] = deque()  # Treeview에 넣을 경로
+        self._detect_in: queue.Queue = queue.Queue()
+        self._detect_out: queue.Queue = queue.Queue()
+        self._detect_left = 0
+        self._detect_thread: threading.Thread | None = None
+        self._pumping = False
         self.q: queue.Queue = queue.Queue()
+        self._cancel = threading.Event()
+        self._tracker = None  # metrics.ProgressTracker(처리 중에만)
+        self.workers_var = tk.IntVar(value=_default_workers())
 
         # Keep references for enable/disable during processing
         self.btn_add: tb.Button | None = None
         self.btn_remove: tb.Button | None = None
         self.btn_clear: tb.Button | None = None
         self.btn_process: tb.Button | None = None
+        self.btn_preview: tb.Button | None = None
+        self.btn_cancel: tb.Button | None = None
+        self.spin_workers: tb.Spinbox | None = None
         self.menu: tk.Menu | None = None
         self.drop_frame: tk.Widget | None = None
 
@@ -66,6 +146,10 @@ class SettlementGUI_ttk:
         self.btn_clear.pack(side=LEFT, padx=4)
         self.btn_process = tb.Button(btns, text="정산 통합 처리", bootstyle=SUCCESS, command=self._process_async)
         self.btn_process.pack(side=LEFT, padx=4)
+        self.btn_preview = tb.Button(
+            btns, text="결과 미리보기", bootstyle=INFO, command=self._open_preview, state=tk.DISABLED,
+        )
+        self.btn_preview.pack(side=LEFT, padx=4)
 
         # Drop zone / 안내
         dz = tb.Labelframe(self.root, text="드래그앤드롭", padding=10, bootstyle=INFO)
@@ -121,6 +205,17 @@ class SettlementGUI_ttk:
         self.status_var = tk.StringVar(value="파일을 추가해주세요")
         tb.Label(statusbar, textvariable=self.status_var).pack(side=LEFT)
 
+        self.spin_workers = tb.Spinbox(
+            statusbar, from_=1, to=os.cpu_count() or 1, width=3, textvariable=self.workers_var,
+        )
+        self.spin_workers.pack(side=RIGHT)
+        tb.Label(statusbar, text="동시 처리").pack(side=RIGHT, padx=(10, 4))
+
+        self.btn_cancel = tb.Button(
+            statusbar, text="취소", bootstyle=DANGER, command=self._cancel_processing, state=tk.DISABLED,
+        )
+        self.btn_cancel.pack(side=RIGHT, padx=(10, 0))
+
         self.prog = tb.Progressbar(statusbar, mode="determinate", bootstyle=STRIPED)
         self.prog.pack(side=RIGHT, fill=X, expand=True, padx=10)
 
@@ -140,6 +235,7 @@ class SettlementGUI_ttk:
         self.root.clipboard_clear()
         self.root.clipboard_append(path)
         try:
+            from ttkbootstrap.toast import ToastNotification
             ToastNotification(title="복사됨", message="경로가 클립보드에 복사되었습니다", duration=2000).show_toast()
         except Exception:
             pass
@@ -163,13 +259,52 @@ class SettlementGUI_ttk:
         added = 0
         for p in paths:
             p = str(p).strip("{}")
-            if os.path.isfile(p) and p not in self.files:
-                self.files.append(p)
-                store = detect_bookstore(p) or "-"
-                self.tree.insert("", END, values=(os.path.basename(p), p, store))
+            if p not in self.files and os.path.isfile(p):
+                self.files[p] = None
+                self._pending.append(p)
+                self._detect_in.put(p)
+                self._detect_left += 1
                 added += 1
         if added:
+            if self._detect_thread is None:
+                self._detect_thread = threading.Thread(
+                    target=_detect_worker, args=(self._detect_in, self._detect_out), daemon=True,
+                )
+                self._detect_thread.start()
+            self._start_pump()
             self.status_var.set(f"{len(self.files)}개 파일 준비됨")
+            if not self._warmed_up:
+                self._warmed_up = True
+                threading.Thread(target=_warm_up_backend, daemon=True).start()
+
+    def _start_pump(self):
+        if not self._pumping:
+            self._pumping = True
+            self.root.after(0, self._pump_file_list)
+
+    def _pump_file_list(self):
+        """대기 중인 행을 INSERT_BATCH개씩 넣고 감지 결과를 반영한 뒤 다음 틱으로 넘긴다"""
+        for _ in range(min(INSERT_BATCH, len(self._pending))):
+            p = self._pending.popleft()
+            if p in self.files and self.files[p] is None:
+                store = self.stores.get(p, "…")
+                self.files[p] = self.tree.insert("", END, values=(os.path.basename(p), p, store))
+        for _ in range(INSERT_BATCH):
+            try:
+                p, store = self._detect_out.get_nowait()
+            except queue.Empty:
+                break
+            self._detect_left -= 1
+            if p not in self.files:  # 감지 중에 제거됨
+                continue
+            self.stores[p] = store
+            iid = self.files[p]
+            if iid is not None:
+                self.tree.set(iid, "store", store)
+        if self._pending or self._detect_left:
+            self.root.after(15, self._pump_file_list)
+        else:
+            self._pumping = False
 
     def _remove_selected(self):
         sel = self.tree.selection()
@@ -177,22 +312,28 @@ class SettlementGUI_ttk:
             return
         for iid in sel:
             path = self.tree.set(iid, "path")
-            if path in self.files:
-                self.files.remove(path)
-            self.tree.delete(iid)
+            self.files.pop(path, None)
+            self.stores.pop(path, None)
+        self.tree.delete(*sel)
         self.status_var.set(f"{len(self.files)}개 파일 준비됨")
 
     def _clear_all(self):
         self.files.clear()
-        for iid in self.tree.get_children():
-            self.tree.delete(iid)
+        self.stores.clear()
+        self._pending.clear()
+        self.tree.delete(*self.tree.get_children())
         self.status_var.set("목록이 초기화되었습니다.")
 
     def _set_busy(self, busy: bool):
         state = tk.DISABLED if busy else tk.NORMAL
-        for btn in (self.btn_add, self.btn_remove, self.btn_clear, self.btn_process):
+        for btn in (self.btn_add, self.btn_remove, self.btn_clear, self.btn_process, self.spin_workers):
             if btn is not None:
                 btn.configure(state=state)
+        if self.btn_preview is not None:
+            has_result = not busy and self.processor is not None and any(n for _, n in self.processor.file_rows)
+            self.btn_preview.configure(state=tk.NORMAL if has_result else tk.DISABLED)
+        if self.btn_cancel is not None:
+            self.btn_cancel.configure(state=tk.NORMAL if busy else tk.DISABLED)
         if self.menu is not None:
             try:
                 # Disable/enable menu entries by index
@@ -208,47 +349,76 @@ class SettlementGUI_ttk:
         if not self.files:
             messagebox.showwarning("경고", "처리할 파일이 없습니다.")
             return
+        from metrics import ProgressTracker
+        paths = list(self.files)
+        self.processor = None
+        self._cancel = threading.Event()
+        self._tracker = ProgressTracker(paths)
         self._set_busy(True)
-        self.status_var.set("처리 중…")
-        self.prog.configure(maximum=len(self.files), value=0)
-        t = threading.Thread(target=self._process_worker, daemon=True)
+        self.status_var.set("처리 중… (정산 서비스)" if SERVICE_URL else "처리 중…")
+        self.prog.configure(maximum=_PROGRESS_STEPS, value=0)
+        try:
+            workers = max(1, int(self.workers_var.get()))
+        except (tk.TclError, ValueError):
+            workers = 1
+        t = threading.Thread(target=self._process_worker, args=(paths, workers), daemon=True)
         t.start()
-        self.root.after(100, self._poll_queue)
+        self.root.after(PROGRESS_INTERVAL_MS, self._poll_queue)
+
+    def _cancel_processing(self):
+        self._cancel.set()
+        if self.btn_cancel is not None:
+            self.btn_cancel.configure(state=tk.DISABLED)
+        self.status_var.set("취소 중… (지금 읽는 묶음이 끝나면 멈춥니다)")
 
-    def _process_worker(self):
+    def _process_worker(self, paths: list[str], workers: int = 1):
         # 각 처리마다 프로세서를 초기화(중복 처리 방지)
-        self.processor = BookstoreSettlementProcessor()
+        processor = _new_processor()
+        tracker = self._tracker
         results: list[str] = []
         errors: list[str] = []
-        done = 0
-        for fp in list(self.files):
-            cnt, err = self.processor.process_file(fp)
+
+        def on_result(fp: str, cnt: int, err: str | None):
             name = os.path.basename(fp)
             if err:
                 errors.append(f"· {name}: {err}")
             else:
-                results.append(f"· {name}: {cnt}건 처리")
-            done += 1
-            self.q.put(("progress", done))
+                cached = " (캐시)" if fp in processor.cache_hits else ""
+                results.append(f"· {name}: {cnt}건 처리{cached}")
+            tracker.finish(fp, cnt)
+
+        # 진행 이벤트는 tracker에 최신 값만 남기고, 화면은 _poll_queue가 주기적으로 읽는다
+        processor.process_files(
+            paths, workers=workers, on_result=on_result, on_progress=tracker.update, cancel=self._cancel,
+        )
 
         # 메인 스레드에서 후처리
-        self.q.put(("finished", (results, errors)))
+        self.q.put(("finished", (processor, results, errors)))
 
     def _poll_queue(self):
-        drained = False
-        while not self.q.empty():
+        try:
             kind, payload = self.q.get_nowait()
-            if kind == "progress":
-                self.prog.configure(value=payload)
-            elif kind == "finished":
-                drained = True
-                results, errors = payload
-                self._on_finished(results, errors)
-        if not drained:
-            self.root.after(100, self._poll_queue)
-
-    def _on_finished(self, results: list[str], errors: list[str]):
+        except queue.Empty:
+            kind = None
+        if kind == "finished":
+            self.processor, results, errors = payload
+            self._on_finished(results, errors, cancelled=self.processor.cancelled)
+            return
+        if self._tracker is not None:
+            snap = self._tracker.snapshot()
+            self.prog.configure(value=int(snap["fraction"] * _PROGRESS_STEPS))
+            if not self._cancel.is_set():
+                self.status_var.set(_format_progress(snap))
+        self.root.after(PROGRESS_INTERVAL_MS, self._poll_queue)
+
+    def _on_finished(self, results: list[str], errors: list[str], cancelled: bool = False):
+        self._tracker = None
         try:
+            if cancelled and not self._keep_partial(len(results)):
+                self.processor = None
+                self.status_var.set("취소됨 — 결과를 버렸습니다")
+                return
+
             df = self.processor.get_unified_dataframe()
             total = len(df)
             if total == 0:
@@ -257,35 +427,33 @@ class SettlementGUI_ttk:
                 self.status_var.set("처리 실패")
                 return
 
+            from export import FILETYPES  # 처리 중 백엔드와 함께 이미 불러와져 있다
             default_name = f"Settlement_{timestamp()}.xlsx"
             save_path = filedialog.asksaveasfilename(
                 title="저장 위치 선택",
                 defaultextension=".xlsx",
-                filetypes=[("Excel files", "*.xlsx"), ("CSV files", "*.csv"), ("All files", "*.*")],
+                filetypes=[*FILETYPES, ("All files", "*.*")],
                 initialfile=default_name,
             )
             if not save_path:
                 self.status_var.set("저장 취소됨")
                 return
 
-            saved = False
-            if save_path.lower().endswith(".csv"):
-                saved = self.processor.save_to_csv(save_path)
-            else:
-                saved = self.processor.save_to_excel(save_path)
+            # 요약과 저장이 같은 통합 DataFrame(df)을 쓴다
+            saved = self.processor.save(save_path)
 
             # 요약 만들기 (가능하면 서점/수량/정산금액 기준)
             summary = "\n\n정산 통합 결과:\n"
             try:
-                store_col, qty_col, amt_col = "서점명", "입고수량", "정산액"
-                grp = df.groupby(store_col, dropna=False).agg({qty_col: "sum", amt_col: "sum"}).reset_index()
-                lines = [f"- {r[store_col]}: 수량 {int(r[qty_col])} / 금액 {int(r[amt_col]):,}원"
-                        for _, r in grp.iterrows()]
-                summary += f"총 {len(df)}건 처리\n" + "\n".join(lines)
+                summary += _load_backend().format_summary(df)
+                # ISBN 집계는 이번 처리 결과로만 만든다(처리마다 새 processor라 이전 처리 결과는 섞이지 않는다)
+                mismatched = self.processor.aggregate().discrepancies()
+                if len(mismatched):
+                    summary += f"\n- 서점 간 단가/정가 불일치 ISBN: {len(mismatched)}건"
             except Exception as e:
                 summary += f"총 {len(df)}건 처리 (요약 계산 실패: {e})"
 
-            msg = ""
+            msg = "취소됨: 끝까지 처리된 파일만 포함합니다.\n\n" if cancelled else ""
             if results:
                 msg += "\n".join(results)
             if errors:
@@ -294,7 +462,7 @@ class SettlementGUI_ttk:
 
             if saved:
                 msg += f"\n\n저장 완료:\n{save_path}"
-                messagebox.showinfo("처리 완료", msg)
+                self._show_result("처리 완료", msg, self.processor.report.format_text())
                 self.status_var.set(f"처리 완료: {total}건")
             else:
                 messagebox.showerror("오류", "파일 저장에 실패했습니다.")
@@ -302,6 +470,68 @@ class SettlementGUI_ttk:
         except PermissionError:
             messagebox.showerror("오류", "파일이 열려 있어 저장할 수 없습니다. 닫은 뒤 다시 시도하세요.")
             self.status_var.set("저장 실패")
+        except ImportError:
+            messagebox.showerror("오류", "Parquet/Feather 저장에는 pyarrow 패키지가 필요합니다.")
+            self.status_var.set("저장 실패")
         finally:
             self._set_busy(False)
 
+    def _keep_partial(self, files_done: int) -> bool:
+        """취소 후 이미 끝난 파일의 결과를 유지할지 묻는다(없으면 False)"""
+        if files_done == 0 or not any(n for _, n in self.processor.file_rows):
+            return False
+        return messagebox.askyesno(
+            "처리 취소됨",
+            f"취소 전에 {files_done}개 파일 처리가 끝났습니다.\n"
+            "이 결과를 유지하고 저장할까요? (아니오: 결과 버림)",
+        )
+
+    def _open_preview(self):
+        """통합 결과를 가상 스크롤 표로 보여준다(보이는 행만 그림)"""
+        if self.processor is None:
+            return
+        df = self.processor.get_unified_dataframe()
+        if df.empty:
+            messagebox.showinfo("미리보기", "표시할 데이터가 없습니다.")
+            return
+        from preview import PreviewWindow
+        PreviewWindow(self.root, df)
+
+    def _show_result(self, title: str, msg: str, details: str = ""):
+        """처리 결과 대화상자. details(파일/단계별 계측)는 접힌 상태로 붙인다."""
+        dlg = tb.Toplevel(self.root)
+        dlg.title(title)
+        dlg.transient(self.root)
+        body = tb.Frame(dlg, padding=12)
+        body.pack(fill=BOTH, expand=True)
+
+        tb.Button(body, text="확인", bootstyle=PRIMARY, command=dlg.destroy).pack(side=BOTTOM, anchor="e", pady=(10, 0))
+        tb.Label(body, text=msg, justify=LEFT, wraplength=620).pack(anchor=W)
+
+        if details:
+            box = tb.Frame(body)
+            text = tk.Text(box, height=14, width=96, wrap="none", font=("Consolas", 9))
+            text.insert("1.0", details)
+            text.configure(state=tk.DISABLED)
+            yscroll = tb.Scrollbar(box, orient=VERTICAL, command=text.yview, bootstyle=ROUND)
+            text.configure(yscrollcommand=yscroll.set)
+            text.pack(side=LEFT, fill=BOTH, expand=True)
+            yscroll.pack(side=RIGHT, fill=Y)
+
+            label = tk.StringVar(value="▸ 처리 단계별 시간/메모리")
+
+            def toggle():
+                if box.winfo_ismapped():
+                    box.pack_forget()
+                    label.set("▸ 처리 단계별 시간/메모리")
+                else:
+                    box.pack(fill=BOTH, expand=True, pady=(6, 0), after=toggle_btn)
+                    label.set("▾ 처리 단계별 시간/메모리")
+
+            toggle_btn = tb.Button(body, textvariable=label, bootstyle=(SECONDARY, "link"), command=toggle)
+            toggle_btn.pack(anchor=W, pady=(10, 0))
+
+        dlg.bind("<Escape>", lambda _e: dlg.destroy())
+        dlg.grab_set()
+        self.root.wait_window(dlg)
+
@@ -0,0 +1,108 @@
+"""ISBN 정규화/검증(열 단위 벡터 연산)
+
+서점마다 ISBN이 "9791198788900"(문자열), "9791198788900.0"(숫자로 읽힘), "nan", ISBN-10 등
+제각각이라 같은 도서가 서점 간에 맞춰지지 않는다. normalize_isbn은 열 전체를 한 번에
+
+- 공백/하이픈, 숫자로 읽혀 붙은 ".0"을 지우고 빈 값("nan", "None" 등)은 ""로,
+- 9자리 SBN/앞자리 0이 빠진 ISBN-10은 0을 채워 10자리로,
+- 검사 숫자가 맞는 ISBN-10은 978을 붙인 ISBN-13으로 바꾸고,
+- ISBN-13 검사 숫자와 978/979 접두어를 NumPy 자릿수 행렬 연산으로 검증한다.
+
+고유값만 계산해 행으로 펼치므로 같은 ISBN이 반복되는 정산서에서는 행 수와 거의 무관하다.
+상태(ISBN상태): 정상 / 변환(ISBN-10→13) / 없음 / 무효(형식·검사 숫자 오류, 값은 정리만 해서 남김)
+"""
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+
+# pyarrow 확인은 여기 한 곳에서만 한다(통합 스키마 문자열 dtype, 파싱 캐시, 서비스 결과 형식이 함께 쓴다)
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except Exception:
+    HAS_PYARROW = False
+STR_DTYPE = "string[pyarrow]" if HAS_PYARROW else "string"  # Arrow면 문자열 연산이 Arrow 커널로 돈다
+
+STATUS_OK = "정상"
+STATUS_CONVERTED = "변환"
+STATUS_MISSING = "없음"
+STATUS_INVALID = "무효"
+ISBN_STATUSES = [STATUS_OK, STATUS_CONVERTED, STATUS_MISSING, STATUS_INVALID]
+ISBN_STATUS_DTYPE = pd.CategoricalDtype(ISBN_STATUSES)
+_OK, _CONVERTED, _MISSING, _INVALID = range(4)
+
+# 값이 없는 것으로 보는 문자열(소문자 비교)
+MISSING_TOKENS = frozenset({"", "nan", "none", "<na>", "null", "0"})
+
+_W13 = np.array([1, 3] * 6, dtype=np.int64)
+_W10 = np.arange(10, 0, -1, dtype=np.int64)
+_PREFIX = np.frombuffer(b"978", dtype=np.uint8) - 48
+
+
+def clean_isbn(s: pd.Series) -> pd.Series:
+    """글자 정리만: 공백/하이픈 제거, 끝의 ".0" 제거, 대문자 X. 없으면 ""(문자열 dtype)"""
+    key = (
+        s.astype(STR_DTYPE)
+        .str.replace(r"[\s\-]+|\.0+\s*$", "", regex=True)
+        .str.replace("x", "X", regex=False)
+        .fillna("")
+    )
+    return key.mask(key.str.lower().isin(MISSING_TOKENS), "")
+
+def _digits(values: np.ndarray, width: int) -> np.ndarray:
+    """ASCII 숫자 문자열 배열 → (n, width) 자릿수 행렬(X는 10)"""
+    raw = np.frombuffer(values.astype(f"S{width}").tobytes(), dtype=np.uint8).reshape(-1, width)
+    return np.where(raw == ord("X"), 10, raw.astype(np.int64) - 48)
+
+def _check13(d12: np.ndarray) -> np.ndarray:
+    return (10 - (d12 @ _W13) % 10) % 10
+
+def isbn13_valid(digits: np.ndarray) -> np.ndarray:
+    """(n, 13) 자릿수 → 검사 숫자가 맞고 978/979로 시작하는지"""
+    prefix = (digits[:, 0] == 9) & (digits[:, 1] == 7) & ((digits[:, 2] == 8) | (digits[:, 2] == 9))
+    return prefix & (_check13(digits[:, :12]) == digits[:, 12])
+
+def isbn10_valid(digits: np.ndarray) -> np.ndarray:
+    """(n, 10) 자릿수 → 가중합 mod 11 검사(X는 마지막 자리만)"""
+    x_inside = (digits[:, :9] == 10).any(axis=1)
+    return ~x_inside & ((digits @ _W10) % 11 == 0)
+
+def isbn10_to_13(digits: np.ndarray) -> np.ndarray:
+    """(n, 10) 자릿수 → (n, 13) ISBN-13 자릿수(978 + 앞 9자리 + 새 검사 숫자)"""
+    d12 = np.hstack([np.broadcast_to(_PREFIX, (len(digits), 3)), digits[:, :9]])
+    return np.hstack([d12, _check13(d12)[:, None]])
+
+def _to_text(digits: np.ndarray) -> np.ndarray:
+    return (digits + 48).astype(np.uint8).view(f"S{digits.shape[1]}").ravel().astype(str).astype(object)
+
+
+def _normalize_unique(clean: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+    """정리된 고유값 → (ISBN 키 object 배열, 상태 코드 int8 배열)"""
+    clean = clean.mask(clean.str.fullmatch(r"[0-9]{8}[0-9X]"), "0" + clean)  # 앞자리 0이 빠진 ISBN-10/9자리 SBN
+    keys = clean.to_numpy(dtype=object)
+    status = np.where(clean.to_numpy(dtype=object) == "", _MISSING, _INVALID).astype(np.int8)
+
+    is13 = clean.str.fullmatch(r"[0-9]{13}").to_numpy(dtype=bool)
+    if is13.any():
+        status[is13] = np.where(isbn13_valid(_digits(keys[is13], 13)), _OK, _INVALID)
+
+    is10 = clean.str.fullmatch(r"[0-9]{9}[0-9X]").to_numpy(dtype=bool)
+    if is10.any():
+        d10 = _digits(keys[is10], 10)
+        ok = isbn10_valid(d10)
+        idx = np.flatnonzero(is10)
+        keys[idx[ok]] = _to_text(isbn10_to_13(d10[ok]))
+        status[idx] = np.where(ok, _CONVERTED, _INVALID)
+    return keys, status
+
+def normalize_isbn(s: pd.Series) -> tuple[pd.Series, pd.Series]:
+    """ISBN 열 → (정규화 ISBN 문자열 열, ISBN상태 범주 열). 인덱스는 s를 따른다."""
+    codes, uniques = pd.factorize(s, use_na_sentinel=True)
+    keys, status = _normalize_unique(clean_isbn(pd.Series(uniques)))
+    # 결측(-1)은 맨 끝에 붙인 "없음"으로 간다
+    keys = np.append(keys, "")[codes]
+    status = np.append(status, np.int8(_MISSING))[codes]
+    return (
+        pd.Series(keys, index=s.index, dtype=object, name=s.name),
+        pd.Series(pd.Categorical.from_codes(status, dtype=ISBN_STATUS_DTYPE), index=s.index, name="ISBN상태"),
+    )
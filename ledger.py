@@ -0,0 +1,205 @@
+"""SQLite 정산 원장(ledger): 처리한 정산서를 누적 보관하고 기간/ISBN/서점별로 조회
+
+- 파일 단위로 트랜잭션을 열고 행은 묶음(batch) 단위 executemany로 넣는다.
+- 자연 키는 (파일 내용 해시, 파일 내 행 번호)이다. 같은 파일을 다시 넣으면 무시된다.
+- ISBN, 서점, 정산 기간(YYYY-MM)에 인덱스를 둔다.
+- 통합 스키마 열은 모두 보관한다. 예전 원장 파일은 열 때 새 열(ISBN상태, 시트명)을 덧붙인다.
+"""
+from __future__ import annotations
+import os
+import re
+import sqlite3
+from collections.abc import Iterable
+from datetime import datetime
+import pandas as pd
+
+from cache import file_digest
+
+BATCH_ROWS = 10_000
+
+# 통합 스키마 열 → 원장 컬럼
+_COLUMNS = {
+    "도서명": "title",
+    "저자명": "author",
+    "ISBN": "isbn",
+    "ISBN상태": "isbn_status",
+    "서점명": "store",
+    "입고수량": "qty",
+    "단가": "unit_price",
+    "정산액": "amount",
+    "정가": "list_price",
+    "입고율": "rate",
+    "시트명": "sheet",
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    file_hash   TEXT PRIMARY KEY,
+    path        TEXT NOT NULL,
+    period      TEXT NOT NULL,
+    rows        INTEGER NOT NULL,
+    imported_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS settlements (
+    file_hash  TEXT NOT NULL REFERENCES files(file_hash),
+    row_no     INTEGER NOT NULL,
+    period     TEXT NOT NULL,
+    title      TEXT,
+    author     TEXT,
+    isbn       TEXT,
+    isbn_status TEXT,
+    store      TEXT,
+    qty        INTEGER,
+    unit_price REAL,
+    amount     REAL,
+    list_price INTEGER,
+    rate       INTEGER,
+    sheet      TEXT,
+    PRIMARY KEY (file_hash, row_no)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_settlements_isbn ON settlements(isbn);
+-- 기간 합계 쿼리가 표를 읽지 않도록 수량/금액까지 포함(covering index)
+CREATE INDEX IF NOT EXISTS idx_settlements_store_period ON settlements(store, period, qty, amount);
+CREATE INDEX IF NOT EXISTS idx_settlements_period ON settlements(period, store, qty, amount);
+"""
+
+# 원장 첫 버전 뒤에 추가된 열(예전 원장 파일은 열 때 ALTER TABLE로 덧붙인다)
+_ADDED_COLUMNS = {"isbn_status": "TEXT", "sheet": "TEXT"}
+
+# 파일명 속 '2025-10', '202510', '2025년 10월' 등
+_PERIOD_RE = re.compile(r"(20\d{2})\s*[-_.년]?\s*(0[1-9]|1[0-2])(?!\d)")
+
+def guess_period(filepath: str) -> str:
+    """파일명에서 정산 기간(YYYY-MM)을 찾고, 없으면 파일 수정 월"""
+    m = _PERIOD_RE.search(os.path.basename(filepath))
+    if m:
+        return f"{m.group(1)}-{m.group(2)}"
+    try:
+        return datetime.fromtimestamp(os.path.getmtime(filepath)).strftime("%Y-%m")
+    except OSError:
+        return datetime.now().strftime("%Y-%m")
+
+
+class Ledger:
+    """정산 원장(SQLite 파일 하나)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+        self._migrate()
+
+    def _migrate(self) -> None:
+        have = {row[1] for row in self.conn.execute("PRAGMA table_info(settlements)")}
+        with self.conn:
+            for col, decl in _ADDED_COLUMNS.items():
+                if col not in have:
+                    self.conn.execute(f"ALTER TABLE settlements ADD COLUMN {col} {decl}")
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ----------------- 적재 ----------------- #
+    def has_file(self, file_hash: str) -> bool:
+        cur = self.conn.execute("SELECT 1 FROM files WHERE file_hash = ?", (file_hash,))
+        return cur.fetchone() is not None
+
+    def add_frame(self, df: pd.DataFrame, file_hash: str, path: str, period: str) -> int:
+        """파일 하나의 통합 결과를 넣는다. 이미 넣은 행은 건너뛰고 새로 들어간 행 수를 돌려준다."""
+        cols = [c for c in _COLUMNS if c in df.columns]
+        data = df[cols].astype(object).where(df[cols].notna(), None)
+        sql = (
+            f"INSERT OR IGNORE INTO settlements (file_hash, row_no, period, {', '.join(_COLUMNS[c] for c in cols)}) "
+            f"VALUES (?, ?, ?{', ?' * len(cols)})"
+        )
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO files (file_hash, path, period, rows, imported_at) VALUES (?, ?, ?, ?, ?)",
+                (file_hash, os.path.abspath(path), period, len(df), datetime.now().isoformat(timespec="seconds")),
+            )
+            before = self.conn.total_changes
+            columns = [data[c].tolist() for c in cols]
+            for start in range(0, len(df), BATCH_ROWS):
+                end = min(start + BATCH_ROWS, len(df))
+                batch = zip(range(start, end), *(col[start:end] for col in columns))
+                self.conn.executemany(sql, ((file_hash, i, period, *vals) for i, *vals in batch))
+        return self.conn.total_changes - before
+
+    def ingest(self, processor, period: str | None = None) -> dict[str, int]:
+        """BookstoreSettlementProcessor가 처리한 파일들을 원장에 넣는다.
+
+        이미 넣은 파일(내용 해시 기준)은 건너뛴다. 반환: {파일 경로: 새로 넣은 행 수}
+        """
+        added: dict[str, int] = {}
+        for fp, frame in processor.iter_file_frames():
+            file_hash = file_digest(fp)
+            if self.has_file(file_hash):
+                added[fp] = 0
+                continue
+            added[fp] = self.add_frame(frame, file_hash, fp, period or guess_period(fp))
+        return added
+
+    # ----------------- 조회 ----------------- #
+    def query(self, sql: str, params: Iterable = ()) -> pd.DataFrame:
+        return pd.read_sql_query(sql, self.conn, params=list(params))
+
+    def rows(
+        self,
+        period_from: str | None = None,
+        period_to: str | None = None,
+        isbn: str | None = None,
+        store: str | None = None,
+    ) -> pd.DataFrame:
+        """조건에 맞는 원장 행(통합 스키마 열 이름 + '정산기간')"""
+        where, params = self._where(period_from, period_to, isbn, store)
+        select = ", ".join(f'{col} AS "{name}"' for name, col in _COLUMNS.items())
+        return self.query(f'SELECT period AS "정산기간", {select} FROM settlements{where}', params)
+
+    def totals(
+        self,
+        period_from: str | None = None,
+        period_to: str | None = None,
+        isbn: str | None = None,
+        store: str | None = None,
+        by: str = "store",
+    ) -> pd.DataFrame:
+        """기간 합계(by: 'store' | 'isbn' | 'period')"""
+        if by not in ("store", "isbn", "period"):
+            raise ValueError(f"by must be store/isbn/period: {by}")
+        label = {"store": "서점명", "isbn": "ISBN", "period": "정산기간"}[by]
+        where, params = self._where(period_from, period_to, isbn, store)
+        return self.query(
+            f'SELECT {by} AS "{label}", SUM(qty) AS "입고수량", SUM(amount) AS "정산액", COUNT(*) AS "건수" '
+            f"FROM settlements{where} GROUP BY {by} ORDER BY {by}",
+            params,
+        )
+
+    def year_to_date(self, year: int | None = None, **filters) -> pd.DataFrame:
+        """해당 연도 1월부터 현재(또는 연말)까지 서점별 합계"""
+        year = year or datetime.now().year
+        return self.totals(f"{year}-01", f"{year}-12", **filters)
+
+    @staticmethod
+    def _where(period_from, period_to, isbn, store) -> tuple[str, list]:
+        conds, params = [], []
+        if period_from:
+            conds.append("period >= ?")
+            params.append(period_from)
+        if period_to:
+            conds.append("period <= ?")
+            params.append(period_to)
+        if isbn:
+            conds.append("isbn = ?")
+            params.append(isbn)
+        if store:
+            conds.append("store = ?")
+            params.append(store)
+        return (" WHERE " + " AND ".join(conds)) if conds else "", params
@@ -1,13 +1,36 @@
 # main.py
+import time
+_T0 = time.perf_counter()
+
+import multiprocessing
+import os
+import sys
 from tkinterdnd2 import TkinterDnD
 import ttkbootstrap as tb
 from gui_ttk import SettlementGUI_ttk
 
+# 창이 뜨기 전에 올라오면 안 되는 무거운 모듈(처리 시작 시 지연 로딩)
+_HEAVY_MODULES = ("pandas", "numpy", "openpyxl", "xlrd", "pub_settlement")
+
+def _report_startup(root, exit_after: bool):
+    """창이 처음 그려진 시점까지의 시간과 미리 올라온 무거운 모듈을 출력"""
+    elapsed = (time.perf_counter() - _T0) * 1000
+    loaded = [m for m in _HEAVY_MODULES if m in sys.modules]
+    print(f"startup: {elapsed:.0f} ms, heavy modules loaded: {', '.join(loaded) or 'none'}", file=sys.stderr)
+    if exit_after:
+        root.destroy()
+
 def main():
     root = TkinterDnD.Tk()
     tb.Style(theme="darkly")  # 테마 적용
     SettlementGUI_ttk(root)
+
+    # 시작 시간 측정: --startup-time(측정 후 종료) 또는 PUB_SETTLEMENT_STARTUP_TIMING=1
+    measure_only = "--startup-time" in sys.argv[1:]
+    if measure_only or os.environ.get("PUB_SETTLEMENT_STARTUP_TIMING") == "1":
+        root.after_idle(_report_startup, root, measure_only)
     root.mainloop()
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # 병렬 처리(작업 프로세스) 패키징 대비
     main()
@@ -0,0 +1,371 @@
+"""처리 단계별 시간/행 수/메모리 계측과 실행 보고서(RunReport)
+
+BookstoreSettlementProcessor가 파일마다 단계(detect, cache, header, read, filter,
+normalize, merge)별 누적 시간과 호출 수, 필터 전후 행 수, 메모리 증가량을 기록하고
+저장(export)은 실행 단위로 기록한다. ProgressTracker는 처리 중 행 단위 진행률/속도/남은 시간을
+추정한다. pandas 없이 표준 라이브러리만 쓴다.
+
+환경변수(코드 수정 없이 켜기):
+- PUB_SETTLEMENT_RUN_REPORT=경로.jsonl  파일/저장 기록을 끝날 때마다 JSON 한 줄로 덧붙임
+- PUB_SETTLEMENT_TRACE_MEMORY=1         tracemalloc으로 단계별 최대 할당량(느려짐).
+                                        끄면 단계 전후 현재 RSS 차이(리눅스/윈도, 그 밖은 None)
+- PUB_SETTLEMENT_PROFILE=디렉터리        파일마다 cProfile 결과(.prof) 저장
+- PUB_SETTLEMENT_HOOKS=모듈:함수,...     파일 처리를 감쌀 훅. 함수(경로)는 컨텍스트 관리자를 돌려준다.
+                                        훅에서 난 오류는 stderr에 남기고 처리는 계속한다.
+"""
+from __future__ import annotations
+import importlib
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections.abc import Callable, Iterator
+from contextlib import ExitStack, contextmanager
+
+RUN_REPORT_PATH = os.environ.get("PUB_SETTLEMENT_RUN_REPORT") or None
+TRACE_MEMORY = os.environ.get("PUB_SETTLEMENT_TRACE_MEMORY") == "1"
+
+# 파일 처리 훅: 함수(파일 경로) → 컨텍스트 관리자
+Hook = Callable[[str], object]
+HOOKS: list[Hook] = []
+_env_hooks: list[Hook] | None = None
+
+def register_hook(hook: Hook) -> None:
+    HOOKS.append(hook)
+
+@contextmanager
+def profile_hook(filepath: str) -> Iterator[None]:
+    """PUB_SETTLEMENT_PROFILE 디렉터리에 파일별 cProfile 결과 저장"""
+    import cProfile
+    directory = os.environ.get("PUB_SETTLEMENT_PROFILE") or "."
+    prof = cProfile.Profile()
+    try:
+        prof.enable()
+    except ValueError:  # 다른 프로파일러가 이미 켜져 있음
+        yield
+        return
+    try:
+        yield
+    finally:
+        prof.disable()
+        os.makedirs(directory, exist_ok=True)
+        stem = os.path.splitext(os.path.basename(filepath))[0]
+        prof.dump_stats(os.path.join(directory, f"{stem}-{os.getpid()}-{time.time_ns()}.prof"))
+
+@contextmanager
+def _guarded(hook: Hook, filepath: str) -> Iterator[None]:
+    """훅 하나를 감싸 들어가기/나오기 오류를 stderr에 남기고 삼킨다(파일 처리 오류는 그대로 전달)"""
+    name = getattr(hook, "__qualname__", repr(hook))
+    try:
+        ctx = hook(filepath)
+        ctx.__enter__()
+    except Exception as e:
+        print(f"훅 {name} 시작 실패({os.path.basename(filepath)}): {e!r}", file=sys.stderr)
+        yield
+        return
+    try:
+        yield
+    except BaseException:
+        try:
+            suppressed = ctx.__exit__(*sys.exc_info())
+        except Exception as e:
+            print(f"훅 {name} 종료 실패({os.path.basename(filepath)}): {e!r}", file=sys.stderr)
+            suppressed = False
+        if not suppressed:
+            raise
+    else:
+        try:
+            ctx.__exit__(None, None, None)
+        except Exception as e:
+            print(f"훅 {name} 종료 실패({os.path.basename(filepath)}): {e!r}", file=sys.stderr)
+
+def _load_env_hooks() -> list[Hook]:
+    global _env_hooks
+    if _env_hooks is None:
+        hooks: list[Hook] = []
+        if os.environ.get("PUB_SETTLEMENT_PROFILE"):
+            hooks.append(profile_hook)
+        for spec in filter(None, (s.strip() for s in os.environ.get("PUB_SETTLEMENT_HOOKS", "").split(","))):
+            module, _, attr = spec.partition(":")
+            try:
+                hooks.append(getattr(importlib.import_module(module), attr))
+            except Exception as e:
+                print(f"PUB_SETTLEMENT_HOOKS: {spec} 불러오기 실패({e})", file=sys.stderr)
+        _env_hooks = hooks
+    return _env_hooks
+
+
+# ----------------- 메모리 ----------------- #
+def _rss_mb() -> float | None:
+    """현재 RSS(MB). 리눅스는 /proc, 윈도는 GetProcessMemoryInfo, 그 밖은 None"""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    if sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+
+        class _Counters(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD)] + [
+                (name, ctypes.c_size_t) for name in (
+                    "PeakWorkingSetSize", "WorkingSetSize", "QuotaPeakPagedPoolUsage", "QuotaPagedPoolUsage",
+                    "QuotaPeakNonPagedPoolUsage", "QuotaNonPagedPoolUsage", "PagefileUsage", "PeakPagefileUsage",
+                )
+            ]
+
+        counters = _Counters(cb=ctypes.sizeof(_Counters))
+        try:
+            psapi = ctypes.WinDLL("psapi")
+            psapi.GetProcessMemoryInfo.argtypes = [wintypes.HANDLE, ctypes.POINTER(_Counters), wintypes.DWORD]
+            if psapi.GetProcessMemoryInfo(ctypes.windll.kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb):
+                return counters.WorkingSetSize / 2**20
+        except OSError:
+            pass
+    return None
+
+def _mem_start():
+    if tracemalloc.is_tracing():
+        tracemalloc.reset_peak()
+        return ("trace", tracemalloc.get_traced_memory()[0])
+    return ("rss", _rss_mb())
+
+def _mem_delta(token) -> float | None:
+    """tracemalloc: 구간 중 최고 할당량 - 시작 할당량. RSS: 끝 - 시작(줄면 음수).
+
+    최대 RSS(ru_maxrss)는 줄지 않아 앞 파일이 최고점을 찍으면 뒤 파일은 늘 0이 되므로 쓰지 않는다.
+    """
+    kind, base = token
+    if kind == "trace":
+        return (tracemalloc.get_traced_memory()[1] - base) / 2**20
+    now = _rss_mb()
+    return None if now is None or base is None else now - base
+
+
+# ----------------- 보고서 ----------------- #
+class RunReport:
+    """한 번의 처리(여러 파일 + 저장) 기록
+
+    files: 파일별 {"path", "store", "rows", "error", "cached", "seconds", "mem_mb",
+                   "stages": {단계: {"seconds", "calls", "mem_mb"[, "rows_in", "rows_out"]}},
+                   "parse_stats"}
+    exports: 저장별 {"path", "format", "rows", "seconds", "mem_mb"}
+    """
+
+    def __init__(self, jsonl_path: str | None = RUN_REPORT_PATH):
+        self.jsonl_path = jsonl_path
+        self.files: list[dict] = []
+        self.exports: list[dict] = []
+        self.run_stages: dict[str, dict] = {}  # 파일 밖에서 잰 단계
+        self._current: dict | None = None
+        if TRACE_MEMORY and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    # ----- 파일 단위 ----- #
+    @contextmanager
+    def file(self, filepath: str) -> Iterator[dict]:
+        """파일 하나의 기록. 끝나면 files에 넣고(JSON-lines 출력 포함) 등록된 훅으로 감싼다."""
+        rec = {"path": filepath, "store": None, "rows": 0, "error": None, "cached": False, "stages": {}}
+        prev, self._current = self._current, rec
+        mem = _mem_start()
+        t0 = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for hook in (*HOOKS, *_load_env_hooks()):
+                    stack.enter_context(_guarded(hook, filepath))
+                yield rec
+        finally:
+            rec["seconds"] = round(time.perf_counter() - t0, 4)
+            mem_mb = _mem_delta(mem)
+            stage_mem = [s["mem_mb"] for s in rec["stages"].values() if s.get("mem_mb") is not None]
+            # tracemalloc 최고점은 단계마다 초기화되므로 파일 전체는 단계 최댓값으로 본다
+            rec["mem_mb"] = _round(max(stage_mem, default=mem_mb) if mem[0] == "trace" else mem_mb)
+            self._current = prev
+            self.add_file(rec)
+
+    def note(self, **fields) -> None:
+        """현재 파일 기록에 값 추가(감지된 서점 등)"""
+        if self._current is not None:
+            self._current.update(fields)
+
+    def add_file(self, rec: dict) -> None:
+        """파일 기록 추가(작업 프로세스에서 받은 기록 포함)"""
+        self.files.append(rec)
+        self._emit({"type": "file", **rec})
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """현재 파일(없으면 실행 단위)의 단계 시간/메모리를 누적"""
+        mem = _mem_start()
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._add(name, time.perf_counter() - t0, _mem_delta(mem))
+
+    def timed(self, iterable, name: str) -> Iterator:
+        """반복자의 next() 시간을 단계 name으로 누적(스트리밍 읽기용)"""
+        it = iter(iterable)
+        while True:
+            mem = _mem_start()
+            t0 = time.perf_counter()
+            try:
+                item = next(it)
+            except StopIteration:
+                self._add(name, time.perf_counter() - t0, _mem_delta(mem))
+                return
+            self._add(name, time.perf_counter() - t0, _mem_delta(mem))
+            yield item
+
+    def rows(self, name: str, rows_in: int, rows_out: int) -> None:
+        """단계의 입력/출력 행 수 누적(필터 전후 등)"""
+        st = self._stage_entry(name)
+        st["rows_in"] = st.get("rows_in", 0) + rows_in
+        st["rows_out"] = st.get("rows_out", 0) + rows_out
+
+    def _stage_entry(self, name: str) -> dict:
+        stages = self._current["stages"] if self._current is not None else self.run_stages
+        return stages.setdefault(name, {"seconds": 0.0, "calls": 0, "mem_mb": None})
+
+    def _add(self, name: str, seconds: float, mem_mb: float | None) -> None:
+        st = self._stage_entry(name)
+        st["seconds"] = round(st["seconds"] + seconds, 4)
+        st["calls"] += 1
+        if mem_mb is not None:
+            st["mem_mb"] = _round(max(st["mem_mb"] or 0.0, mem_mb))
+
+    # ----- 저장 ----- #
+    @contextmanager
+    def export(self, path: str, fmt: str | None, rows: int) -> Iterator[None]:
+        mem = _mem_start()
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            rec = {
+                "path": path, "format": fmt, "rows": rows,
+                "seconds": round(time.perf_counter() - t0, 4), "mem_mb": _round(_mem_delta(mem)),
+            }
+            self.exports.append(rec)
+            self._emit({"type": "export", **rec})
+
+    # ----- 결과 ----- #
+    def stage_totals(self) -> dict[str, float]:
+        """단계별 전체 파일 합계 시간(초)"""
+        out: dict[str, float] = {}
+        for stages in (*(rec["stages"] for rec in self.files), self.run_stages):
+            for name, st in stages.items():
+                out[name] = round(out.get(name, 0.0) + st["seconds"], 4)
+        if self.exports:
+            out["export"] = round(sum(e["seconds"] for e in self.exports), 4)
+        return out
+
+    def to_dict(self) -> dict:
+        return {
+            "files": self.files, "exports": self.exports,
+            "run_stages": self.run_stages, "stage_totals": self.stage_totals(),
+        }
+
+    def format_text(self) -> str:
+        """GUI/CLI용 요약: 파일별 단계 시간, 필터 전후 행 수, 메모리"""
+        lines = []
+        for rec in self.files:
+            head = f"· {os.path.basename(rec['path'])}: {rec['seconds']:.2f}s, {rec['rows']}건"
+            if rec.get("cached"):
+                head += " (캐시)"
+            if rec.get("mem_mb") is not None:
+                head += f", 메모리 {rec['mem_mb']:+.1f}MB"
+            if rec.get("error"):
+                head += " — 오류"
+            lines.append(head)
+            parts = []
+            for name, st in rec["stages"].items():
+                part = f"{name} {st['seconds']:.3f}s"
+                if "rows_in" in st:
+                    part += f" ({st['rows_in']}→{st['rows_out']}행)"
+                parts.append(part)
+            if parts:
+                lines.append("    " + " | ".join(parts))
+        for e in self.exports:
+            lines.append(f"· 저장({e['format'] or '-'}): {e['seconds']:.2f}s, {e['rows']}건")
+        totals = self.stage_totals()
+        if totals:
+            lines.append("단계 합계: " + ", ".join(f"{k} {v:.2f}s" for k, v in totals.items()))
+        return "\n".join(lines)
+
+    def _emit(self, obj: dict) -> None:
+        if not self.jsonl_path:
+            return
+        try:
+            with open(self.jsonl_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(obj, ensure_ascii=False, default=str) + "\n")
+        except OSError as e:
+            print(f"실행 보고서 기록 실패({self.jsonl_path}): {e}", file=sys.stderr)
+
+def _round(v: float | None) -> float | None:
+    return None if v is None else round(v, 2)
+
+
+# ----------------- 진행률 ----------------- #
+class ProgressTracker:
+    """여러 파일의 행 단위 진행률과 처리 속도/남은 시간 추정
+
+    작업 스레드는 update/finish로 최신 값만 덮어쓰고, UI는 원하는 주기로 snapshot을 읽는다.
+    진행 이벤트가 아무리 잦아도 화면 갱신 횟수는 읽는 쪽 주기로 정해진다.
+    파일 진척도는 예상 행 수 대비 읽은 행 수이고(예상 행 수를 모르면 끝난 파일의 바이트당 행 수로
+    추정), 전체 진척도는 파일 크기로 가중 평균한다.
+    """
+
+    def __init__(self, filepaths):
+        self.sizes: dict[str, int] = {}
+        for fp in filepaths:
+            try:
+                self.sizes[fp] = max(1, os.path.getsize(fp))
+            except OSError:
+                self.sizes[fp] = 1
+        self._rows: dict[str, int] = {}
+        self._totals: dict[str, int] = {}
+        self._done: set[str] = set()
+        self._lock = threading.Lock()
+        self.started = time.perf_counter()
+
+    def update(self, filepath: str, rows: int, total: int | None = None) -> None:
+        with self._lock:
+            self._rows[filepath] = rows
+            if total:
+                self._totals[filepath] = total
+
+    def finish(self, filepath: str, rows: int = 0) -> None:
+        with self._lock:
+            self._done.add(filepath)
+            self._rows[filepath] = max(self._rows.get(filepath, 0), rows)
+
+    def snapshot(self) -> dict:
+        """{"files", "files_done", "rows", "rows_per_sec", "fraction", "eta_seconds"}"""
+        with self._lock:
+            elapsed = time.perf_counter() - self.started
+            rows = sum(self._rows.values())
+            weight = sum(self.sizes.values()) or 1
+            finished = [fp for fp in self._done if self._rows.get(fp)]
+            per_byte = sum(self._rows[fp] for fp in finished) / sum(self.sizes[fp] for fp in finished) if finished else None
+            done = 0.0
+            for fp, size in self.sizes.items():
+                if fp in self._done:
+                    done += size
+                    continue
+                total = self._totals.get(fp) or (size * per_byte if per_byte else None)
+                if total:
+                    done += size * min(self._rows.get(fp, 0) / total, 0.99)
+            fraction = done / weight
+            eta = elapsed * (1 - fraction) / fraction if fraction > 0 else None
+            return {
+                "files": len(self.sizes),
+                "files_done": len(self._done),
+                "rows": rows,
+                "rows_per_sec": rows / elapsed if elapsed > 0 else 0.0,
+                "fraction": fraction,
+                "eta_seconds": eta,
+            }
@@ -0,0 +1,186 @@
+"""통합 결과 미리보기(가상 스크롤 표)
+
+Treeview에는 한 화면 분량(page_rows)의 항목만 만들어 두고, 스크롤/페이지 이동 때는
+보이는 구간의 값만 바꿔 끼운다. 정렬과 서점/ISBN 필터는 위젯이 아니라
+DataFrame의 행 위치 배열(select_rows)로 처리한다.
+"""
+from __future__ import annotations
+import tkinter as tk
+import numpy as np
+import pandas as pd
+import ttkbootstrap as tb
+from ttkbootstrap.constants import LEFT, RIGHT, X, Y, BOTH, W, E, VERTICAL, INFO, SECONDARY, ROUND
+
+PAGE_ROWS = 30
+ALL_STORES = "전체"
+_NUMERIC_WIDTH = 90
+
+
+def select_rows(
+    df: pd.DataFrame,
+    store: str | None = None,
+    isbn: str | None = None,
+    sort: str | None = None,
+    ascending: bool = True,
+) -> np.ndarray:
+    """필터(서점 일치, ISBN 부분 일치)와 정렬을 적용한 df 행 위치 배열"""
+    mask = np.ones(len(df), dtype=bool)
+    if store and store != ALL_STORES:
+        mask &= (df["서점명"] == store).to_numpy(dtype=bool)
+    if isbn:
+        q = isbn.replace("-", "").replace(" ", "")
+        if q:
+            mask &= df["ISBN"].astype("string").str.contains(q, regex=False).fillna(False).to_numpy(dtype=bool)
+    pos = np.flatnonzero(mask)
+    if sort and len(pos):
+        col = df[sort].take(pos).reset_index(drop=True)
+        order = col.sort_values(kind="stable", ascending=ascending, na_position="last").index.to_numpy()
+        pos = pos[order]
+    return pos
+
+
+def _fmt(v) -> str:
+    if v is None or (isinstance(v, float) and v != v) or v is pd.NA:
+        return ""
+    if isinstance(v, (int, np.integer)):
+        return f"{v:,}"
+    if isinstance(v, (float, np.floating)):
+        return f"{v:,.0f}" if float(v).is_integer() else f"{v:,.2f}"
+    return str(v)
+
+
+class PreviewWindow:
+    """통합 DataFrame 미리보기 창(보이는 행만 렌더링)"""
+
+    def __init__(self, master: tk.Misc, df: pd.DataFrame, title: str = "통합 결과 미리보기", page_rows: int = PAGE_ROWS):
+        self.df = df.reset_index(drop=True)
+        self.columns = [str(c) for c in self.df.columns]
+        self.page_rows = page_rows
+        self.view = np.arange(len(self.df))  # 필터/정렬을 적용한 행 위치
+        self.offset = 0
+        self.sort_col: str | None = None
+        self.sort_asc = True
+
+        self.win = tb.Toplevel(master)
+        self.win.title(title)
+        self.win.geometry("1000x720")
+        self._build()
+        self._render()
+
+    # ---------------- UI ---------------- #
+    def _build(self):
+        bar = tb.Frame(self.win, padding=(10, 10, 10, 4))
+        bar.pack(fill=X)
+
+        tb.Label(bar, text="서점").pack(side=LEFT)
+        stores = [ALL_STORES]
+        if "서점명" in self.df.columns:
+            stores += sorted({str(s) for s in self.df["서점명"].dropna().unique()})
+        self.store_var = tk.StringVar(value=ALL_STORES)
+        combo = tb.Combobox(bar, textvariable=self.store_var, values=stores, width=10, state="readonly")
+        combo.pack(side=LEFT, padx=(4, 12))
+        combo.bind("<<ComboboxSelected>>", lambda _e: self._apply())
+
+        tb.Label(bar, text="ISBN").pack(side=LEFT)
+        self.isbn_var = tk.StringVar()
+        entry = tb.Entry(bar, textvariable=self.isbn_var, width=18)
+        entry.pack(side=LEFT, padx=4)
+        entry.bind("<Return>", lambda _e: self._apply())
+        tb.Button(bar, text="검색", bootstyle=INFO, command=self._apply).pack(side=LEFT, padx=4)
+        tb.Button(bar, text="초기화", bootstyle=SECONDARY, command=self._reset).pack(side=LEFT, padx=4)
+
+        nav = tb.Frame(bar)
+        nav.pack(side=RIGHT)
+        for text, cmd in (("⏮", lambda: self._goto(0)), ("◀", lambda: self._move(-self.page_rows)),
+                          ("▶", lambda: self._move(self.page_rows)), ("⏭", lambda: self._goto(len(self.view)))):
+            tb.Button(nav, text=text, width=3, bootstyle=SECONDARY, command=cmd).pack(side=LEFT, padx=1)
+        self.pos_var = tk.StringVar()
+        tb.Label(bar, textvariable=self.pos_var).pack(side=RIGHT, padx=10)
+
+        box = tb.Frame(self.win, padding=(10, 0, 10, 10))
+        box.pack(fill=BOTH, expand=True)
+        cols = ("#", *self.columns)
+        self.tree = tb.Treeview(box, columns=cols, show="headings", height=self.page_rows, bootstyle=INFO)
+        self.tree.heading("#", text="#")
+        self.tree.column("#", width=70, anchor=E, stretch=False)
+        for c in self.columns:
+            numeric = pd.api.types.is_numeric_dtype(self.df[c])
+            self.tree.heading(c, text=c, command=lambda c=c: self._sort_by(c))
+            self.tree.column(c, width=_NUMERIC_WIDTH if numeric else 160, anchor=E if numeric else W)
+        # 한 화면 분량의 항목만 만들고 값만 바꿔 끼운다
+        self._iids = [self.tree.insert("", "end", values=()) for _ in range(self.page_rows)]
+        self.tree.pack(side=LEFT, fill=BOTH, expand=True)
+
+        self.scroll = tb.Scrollbar(box, orient=VERTICAL, command=self._on_scroll, bootstyle=ROUND)
+        self.scroll.pack(side=RIGHT, fill=Y)
+
+        for seq in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.tree.bind(seq, self._on_wheel)
+        self.win.bind("<Prior>", lambda _e: self._move(-self.page_rows))
+        self.win.bind("<Next>", lambda _e: self._move(self.page_rows))
+        self.win.bind("<Home>", lambda _e: self._goto(0))
+        self.win.bind("<End>", lambda _e: self._goto(len(self.view)))
+
+    # ---------------- 데이터 ---------------- #
+    def _apply(self):
+        self.view = select_rows(self.df, self.store_var.get(), self.isbn_var.get().strip(), self.sort_col, self.sort_asc)
+        self._goto(0)
+
+    def _reset(self):
+        self.store_var.set(ALL_STORES)
+        self.isbn_var.set("")
+        self.sort_col, self.sort_asc = None, True
+        self._update_headings()
+        self._apply()
+
+    def _sort_by(self, col: str):
+        if self.sort_col == col:
+            self.sort_asc = not self.sort_asc
+        else:
+            self.sort_col, self.sort_asc = col, True
+        self._update_headings()
+        self._apply()
+
+    def _update_headings(self):
+        for c in self.columns:
+            mark = (" ▲" if self.sort_asc else " ▼") if c == self.sort_col else ""
+            self.tree.heading(c, text=c + mark)
+
+    # ---------------- 스크롤 ---------------- #
+    def _goto(self, offset: int):
+        self.offset = max(0, min(offset, len(self.view) - self.page_rows))
+        self._render()
+
+    def _move(self, delta: int):
+        self._goto(self.offset + delta)
+
+    def _on_scroll(self, action, value, unit=None):
+        if action == "moveto":
+            self._goto(int(float(value) * len(self.view)))
+        elif action == "scroll":
+            self._move(int(value) * (self.page_rows if unit == "pages" else 1))
+
+    def _on_wheel(self, event):
+        if getattr(event, "num", None) == 4 or getattr(event, "delta", 0) > 0:
+            self._move(-3)
+        else:
+            self._move(3)
+        return "break"
+
+    def _render(self):
+        """보이는 구간(offset ~ offset + page_rows)만 Treeview 항목에 채운다"""
+        total = len(self.view)
+        rows = self.view[self.offset:self.offset + self.page_rows]
+        block = self.df.iloc[rows]
+        for k, iid in enumerate(self._iids):
+            if k < len(block):
+                vals = block.iloc[k].tolist()
+                self.tree.item(iid, values=(f"{self.offset + k + 1:,}", *(_fmt(v) for v in vals)))
+            else:
+                self.tree.item(iid, values=())
+        if total:
+            self.scroll.set(self.offset / total, min(1.0, (self.offset + self.page_rows) / total))
+            self.pos_var.set(f"{self.offset + 1:,}–{self.offset + len(rows):,} / {total:,}행")
+        else:
+            self.scroll.set(0.0, 1.0)
+            self.pos_var.set("0행")
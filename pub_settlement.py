@@ -1,124 +1,365 @@
 from __future__ import annotations
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor, CancelledError, TimeoutError as FuturesTimeout
+from contextlib import closing, contextmanager
+from itertools import chain, islice
+import multiprocessing
+import queue
+import threading
 import pandas as pd
-from utils import pick_engine, safe_int, safe_float, detect_bookstore
+import numpy as np
+from utils import (
+    pick_engine, detect_bookstore_by_name, parse_int_series, parse_float_series,
+    STREAM_ENGINE, STREAM_THRESHOLD_MB, INTERACTIVE_STREAM_MB,
+)
+from streaming import iter_xlsx_rows, iter_frames, header_names, CHUNK_ROWS, INTERACTIVE_CHUNK_ROWS
+from cache import ParseCache, file_digest
+from sniff import Workbook, open_workbook, sniff_store, settlement_sheets
+from export import export, format_for_path
+from metrics import RunReport
+from isbn import normalize_isbn, ISBN_STATUS_DTYPE, STR_DTYPE
+
+# 정규화 결과가 달라지는 파서 수정 시 올린다(파싱 캐시 무효화)
+PARSER_VERSION = "4"
+
+# 진행 콜백: (파일 경로, 지금까지 읽은 원본 행 수, 예상 전체 행 수 또는 None)
+ProgressCallback = Callable[[str, int, "int | None"], None]
+
+
+class ProcessingCancelled(BaseException):
+    """취소 요청으로 처리 중단(asyncio.CancelledError처럼 파서의 except Exception에 잡히지 않는다)"""
+
+
+STORE_NAMES = ["예스24", "교보문고", "알라딘"]
+UNIFIED_COLUMNS = ["도서명", "저자명", "ISBN", "ISBN상태", "서점명", "입고수량", "단가", "정산액", "정가", "입고율", "시트명"]
+# 통합 결과 고정 스키마(서점명/ISBN상태는 범주형, 도서명/ISBN/시트명은 Arrow 문자열)
+UNIFIED_SCHEMA = {
+    "도서명": STR_DTYPE,
+    "저자명": STR_DTYPE,
+    "ISBN": STR_DTYPE,
+    "ISBN상태": ISBN_STATUS_DTYPE,  # 정상/변환(ISBN-10→13)/없음/무효
+    "서점명": pd.CategoricalDtype(STORE_NAMES),
+    "입고수량": "int64",  # int32면 astype이 2**31 이상을 조용히 음수로 감는다
+    "단가": "float64",
+    "정산액": "float64",
+    "정가": "int64",
+    "입고율": "int64",
+    "시트명": STR_DTYPE,
+}
+
+
+# ----------------- 열 단위 변환 ----------------- #
+def _col(df: pd.DataFrame, name: str) -> pd.Series:
+    """열이 없으면 NaN 열(→ 기본값)로 대체"""
+    if name in df.columns:
+        return df[name]
+    return pd.Series(np.nan, index=df.index, name=name)
+
+def _text_col(s: pd.Series) -> pd.Series:
+    return s.astype(str).str.strip()
+
+def _unit_price(total: pd.Series, qty: pd.Series) -> pd.Series:
+    """합계금액/수량을 소수점 2자리로 반올림(수량 0 이하 → 0.0)"""
+    pos = qty > 0
+    ratio = total.where(pos, 0) / qty.where(pos, 1)
+    unit = ratio.round(2)
+    # np.round는 배율 연산 오차로 .5 경계에서 round()와 다를 수 있어 해당 값만 재계산
+    scaled = ratio * 100
+    edge = (scaled - np.floor(scaled) - 0.5).abs() < 1e-6
+    if edge.any():
+        unit[edge] = [round(v, 2) for v in ratio[edge]]
+    return unit.where(pos, 0.0)
+
+
+# ----------------- 교보 머리글 탐지 ----------------- #
+_KYOBO_KEYS = ("상품명", "상품코드", "수량", "합계금액", "정가", "공급율")
+_KYOBO_ALIASES = {"공급률": "공급율", "합계": "합계금액"}
+_HEADER_PROBE_ROWS = 20
+_KYOBO_NO_HEADER = "교보 형식 해석 실패: 머리글 행(상품명/수량/합계금액 등)을 찾지 못했습니다"
+
+def _norm_header(v) -> str:
+    return str(v).replace("\n", "").replace(" ", "")
+
+def _find_kyobo_header(probe: pd.DataFrame) -> int | None:
+    """알려진 컬럼명과 가장 많이 일치하는 행 번호(2개 미만 일치 시 None)"""
+    best_row, best_score = None, 1
+    for i, row in enumerate(probe.itertuples(index=False)):
+        names = {_KYOBO_ALIASES.get(n, n) for n in (_norm_header(v) for v in row if pd.notna(v))}
+        score = len(names.intersection(_KYOBO_KEYS))
+        if score > best_score:
+            best_row, best_score = i, score
+    return best_row
+
+
+def _sheet_rows(wb: Workbook, index: int = 0) -> int | None:
+    """index번째 시트의 행 수(xlsx는 dimension 태그 값이라 없으면 None). 진행률 추정용."""
+    try:
+        if wb.engine == "openpyxl":
+            return wb.book.worksheets[index].max_row
+        return wb.book.sheet_by_index(index).nrows
+    except Exception:
+        return None
+
+@contextmanager
+def _workbook(filepath: str, wb: Workbook | None) -> Iterator[Workbook]:
+    """받은 wb는 그대로 쓰고(닫지 않음), 없으면 열었다가 닫는다"""
+    if wb is not None:
+        yield wb
+        return
+    own = Workbook(filepath)
+    try:
+        yield own
+    finally:
+        own.close()
+
+
+# ----------------- 서점별 정규화(원본 열 → 통합 스키마) ----------------- #
+def _yes24_missing(columns) -> list[str]:
+    return [c for c in ("상품명", "입고번호") if c not in columns]
+
+def _filter_yes24(df: pd.DataFrame) -> pd.DataFrame:
+    """상품명/입고번호가 있는 행만"""
+    return df[df["상품명"].notna() & df["입고번호"].notna()]
+
+def _normalize_yes24(df: pd.DataFrame, stats: dict | None = None, sheet_name: str = "") -> pd.DataFrame:
+    isbn, isbn_status = normalize_isbn(_col(df, "ISBN13"))
+    return pd.DataFrame({
+        "도서명": _text_col(df["상품명"]),
+        "저자명": "",
+        "ISBN": isbn,
+        "ISBN상태": isbn_status,
+        "서점명": "예스24",
+        "입고수량": parse_int_series(_col(df, "입고수량"), stats=stats),
+        "단가": parse_float_series(_col(df, "원가"), stats=stats),
+        "정산액": parse_float_series(_col(df, "조정입고금액"), stats=stats),
+        "정가": parse_int_series(_col(df, "정가"), stats=stats),
+        "입고율": parse_int_series(_col(df, "입고율"), stats=stats),
+        "시트명": sheet_name,
+    }, index=df.index)
+
+def _kyobo_key_map(columns) -> dict[str, str | None]:
+    key_map: dict[str, str | None] = dict.fromkeys(_KYOBO_KEYS)
+    for c in columns:
+        key = _KYOBO_ALIASES.get(c, c)
+        if key in key_map:
+            key_map[key] = c
+    return key_map
+
+def _kyobo_missing(key_map: dict[str, str | None]) -> list[str]:
+    return [k for k in ("상품명", "수량", "합계금액") if not key_map.get(k)]
+
+def _filter_kyobo(df: pd.DataFrame, key_map: dict[str, str | None]) -> pd.DataFrame:
+    """합계/NaN 행 제거(수량과 합계금액이 숫자인 행만)"""
+    return df[
+        pd.to_numeric(df[key_map["수량"]], errors="coerce").notna()
+        & pd.to_numeric(df[key_map["합계금액"]], errors="coerce").notna()
+    ]
+
+def _normalize_kyobo(
+    df: pd.DataFrame, key_map: dict[str, str | None], stats: dict | None = None, sheet_name: str = "",
+) -> pd.DataFrame:
+    q = parse_int_series(df[key_map["수량"]], stats=stats)
+    total_amt = parse_int_series(df[key_map["합계금액"]], stats=stats)
+    # 상품코드는 숫자로 읽혀 "….0"이 되거나 ISBN-10일 수 있어 ISBN-13으로 정규화한다
+    isbn, isbn_status = normalize_isbn(_col(df, key_map.get("상품코드") or "상품코드"))
+    return pd.DataFrame({
+        "도서명": _text_col(df[key_map["상품명"]]),
+        "저자명": "",
+        "ISBN": isbn,
+        "ISBN상태": isbn_status,
+        "서점명": "교보문고",
+        "입고수량": q,
+        "단가": _unit_price(total_amt, q),  # 소수점 2자리
+        "정산액": total_amt,
+        "정가": parse_int_series(df[key_map["정가"]], stats=stats) if key_map.get("정가") else 0,
+        "입고율": parse_int_series(df[key_map["공급율"]], stats=stats) if key_map.get("공급율") else 0,
+        "시트명": sheet_name,
+    }, index=df.index)
+
 
 class BookstoreSettlementProcessor:
     """서점별 정산서 처리/통합"""
 
-    def __init__(self):
-        self.unified_data: list[dict] = []
+    def __init__(
+        self,
+        cache: ParseCache | None = None,
+        report: RunReport | None = None,
+        cancel: threading.Event | None = None,
+        on_progress: ProgressCallback | None = None,
+    ):
+        # 파일별 열 묶음을 모아 두었다가 결과 요청 시 한 번만 합친다
+        self._chunks: list[pd.DataFrame] = []
+        self._frame: pd.DataFrame | None = None
+        self.cache = cache if cache is not None else ParseCache(version=PARSER_VERSION)
+        self.cache_hits: set[str] = set()  # 캐시에서 읽은 파일 경로
+        self.parse_stats: dict[str, dict] = {}  # 파일 경로 → 열별 {"coerced", "invalid"} 건수
+        self.file_rows: list[tuple[str, int]] = []  # 통합 결과에 들어간 순서대로 (파일 경로, 행 수)
+        self._aggregate = None  # aggregate.SettlementAggregate(앞에서부터 _aggregated_rows행까지 반영)
+        self._aggregated_rows = 0
+        self.report = report if report is not None else RunReport()  # 파일/단계별 시간·행 수·메모리
+        self.cancel = cancel  # set()되면 다음 묶음 전에 ProcessingCancelled
+        self.on_progress = on_progress
+        self.cancelled = False  # 마지막 process_files가 취소로 끝났는지
+        self._progress_file: str | None = None
+        self._rows_read = 0
+        self._rows_expected: int | None = None
+
+    def _append(self, out: pd.DataFrame) -> None:
+        self._chunks.append(out[UNIFIED_COLUMNS].astype(UNIFIED_SCHEMA).reset_index(drop=True))
+        self._frame = None
+
+    def _stats_for(self, filepath: str) -> dict:
+        # 시트가 여럿이면 한 파일의 건수를 합친다(process_file에서 파일마다 초기화)
+        return self.parse_stats.setdefault(filepath, {})
+
+    @property
+    def _interactive(self) -> bool:
+        # 취소/진행 콜백이 있으면 작은 파일도 작은 묶음으로 스트리밍해 묶음 사이에서 멈추고 진행을 알린다
+        return self.cancel is not None or self.on_progress is not None
+
+    def _pick_engine(self, filepath: str) -> str | None:
+        if not self._interactive:
+            return pick_engine(filepath)
+        return pick_engine(filepath, min(STREAM_THRESHOLD_MB, INTERACTIVE_STREAM_MB))  # 0이면 스트리밍 끔
+
+    def _iter_frames(self, rows, columns: list[str]) -> Iterator[pd.DataFrame]:
+        chunk_rows = min(CHUNK_ROWS, INTERACTIVE_CHUNK_ROWS) if self._interactive else CHUNK_ROWS
+        return self.report.timed(iter_frames(rows, columns, chunk_rows), "read")
+
+    def _check_cancel(self) -> None:
+        if self.cancel is not None and self.cancel.is_set():
+            raise ProcessingCancelled
+
+    def _progress(self, rows: int = 0) -> None:
+        self._rows_read += rows
+        if self.on_progress is not None and self._progress_file is not None:
+            self.on_progress(self._progress_file, self._rows_read, self._rows_expected)
+
+    def _ingest(self, df: pd.DataFrame, filter_fn, normalize_fn) -> int:
+        """원본 묶음 → 필터 → 정규화 → 병합(단계별 계측). 반환: 추가된 행 수
+
+        묶음마다 취소 여부를 확인하고 읽은 원본 행 수를 진행 콜백으로 알린다.
+        """
+        self._check_cancel()
+        with self.report.stage("filter"):
+            kept = filter_fn(df)
+        self.report.rows("filter", len(df), len(kept))
+        with self.report.stage("normalize"):
+            out = normalize_fn(kept)
+        with self.report.stage("merge"):
+            self._append(out)
+        self._progress(len(df))
+        return len(out)
+
+    # ----------------- 시트 ----------------- #
+    def _each_sheet(self, wb: Workbook, store: str, parse_sheet) -> tuple[int, str | None]:
+        """store 정산 시트(머리글 시그니처가 맞는 시트)를 차례로 처리한다. parse_sheet(번호, 이름) → (건수, 오류)
+
+        시그니처가 맞는 시트가 없으면(파일명으로만 감지) 첫 시트만 처리한다. 오류가 나면 그 시트 이름을 붙여 멈춘다.
+        """
+        sheets = [(i, name) for i, name, _ in settlement_sheets(wb, store)] or [(0, wb.sheet_names[0])]
+        rows = [_sheet_rows(wb, i) for i, _ in sheets]
+        self._rows_expected = None if None in rows else sum(rows)
+        cnt = 0
+        for i, name in sheets:
+            n, err = parse_sheet(i, name)
+            if err is not None:
+                return cnt, err if len(sheets) == 1 else f"[{name}] {err}"
+            cnt += n
+        return cnt, None
 
     # ----------------- YES24 ----------------- #
-    def process_yes24(self, filepath: str) -> tuple[int, str | None]:
+    def process_yes24(self, filepath: str, wb: Workbook | None = None) -> tuple[int, str | None]:
         try:
-            engine = pick_engine(filepath)
+            engine = self._pick_engine(filepath)
             if engine is None:
                 return 0, "지원하지 않는 파일 형식입니다(.xls/.xlsx)"
+            with _workbook(filepath, wb) as wb:
+                if engine == STREAM_ENGINE:
+                    return self._each_sheet(wb, "yes24", lambda i, name: self._stream_yes24(filepath, wb, i, name))
+                xf = pd.ExcelFile(wb.book, engine=engine)  # 닫기는 wb.close()가 한다
+                return self._each_sheet(wb, "yes24", lambda i, name: self._read_yes24(filepath, xf, i, name))
+        except Exception as e:
+            return 0, f"예스24 처리 오류: {e}"
+
+    def _read_yes24(self, filepath: str, xf: pd.ExcelFile, sheet: int = 0, sheet_name: str = "") -> tuple[int, str | None]:
+        with self.report.stage("read"):
+            df = xf.parse(sheet, dtype={"ISBN13": str})
+        miss = _yes24_missing(df.columns)
+        if miss:
+            return 0, f"예스24 형식 누락 컬럼: {', '.join(miss)}"
 
-            df = pd.read_excel(filepath, engine=engine, dtype={"ISBN13": str})
-            required = {"상품명", "입고번호"}
-            miss = [c for c in required if c not in df.columns]
+        stats = self._stats_for(filepath)
+        return self._ingest(df, _filter_yes24, lambda d: _normalize_yes24(d, stats, sheet_name)), None
+
+    def _stream_yes24(self, filepath: str, wb: Workbook | None = None, sheet: int = 0, sheet_name: str = "") -> tuple[int, str | None]:
+        with closing(iter_xlsx_rows(filepath, wb.book if wb is not None else None, sheet)) as rows:
+            with self.report.stage("read"):
+                columns = header_names(next(rows, ()))
+            miss = _yes24_missing(columns)
             if miss:
                 return 0, f"예스24 형식 누락 컬럼: {', '.join(miss)}"
-
-            df = df[df["상품명"].notna()]
-            df = df[df["입고번호"].notna()]
-
-            for _, row in df.iterrows():
-                record = {
-                    "도서명": str(row.get("상품명", "")).strip(),
-                    "저자명": "",
-                    "ISBN": ("" if pd.isna(row.get("ISBN13")) else str(row.get("ISBN13")).strip()),
-                    "서점명": "예스24",
-                    "입고수량": safe_int(row.get("입고수량", 0)),
-                    "단가": safe_float(row.get("원가", 0)),
-                    "정산액": safe_float(row.get("조정입고금액", 0)),
-                    "정가": safe_int(row.get("정가", 0)),
-                    "입고율": safe_int(row.get("입고율", 0)),
-                }
-                self.unified_data.append(record)
-            return len(df), None
-        except Exception as e:
-            return 0, f"예스24 처리 오류: {e}"
+            stats = self._stats_for(filepath)
+            cnt = 0
+            for chunk in self._iter_frames(rows, columns):
+                cnt += self._ingest(chunk, _filter_yes24, lambda d: _normalize_yes24(d, stats, sheet_name))
+        return cnt, None
 
     # ----------------- 교보문고 ----------------- #
-    def process_kyobo(self, filepath: str) -> tuple[int, str | None]:
+    def process_kyobo(self, filepath: str, wb: Workbook | None = None) -> tuple[int, str | None]:
         try:
-            engine = pick_engine(filepath)
+            engine = self._pick_engine(filepath)
             if engine is None:
                 return 0, "지원하지 않는 파일 형식입니다(.xls/.xlsx)"
+            with _workbook(filepath, wb) as wb:
+                if engine == STREAM_ENGINE:
+                    return self._each_sheet(wb, "kyobo", lambda i, name: self._stream_kyobo(filepath, wb, i, name))
+                xf = pd.ExcelFile(wb.book, engine=engine)  # 닫기는 wb.close()가 한다
+                return self._each_sheet(wb, "kyobo", lambda i, name: self._read_kyobo(filepath, xf, i, name))
+        except Exception as e:
+            return 0, f"교보 처리 오류: {e}"
 
-            header_candidates = [3, 2, 0]
-            last_err = None
-            df = None
-            for h in header_candidates:
-                try:
-                    tmp = pd.read_excel(filepath, engine=engine, header=h)
-                    if tmp is not None and len(tmp.columns) > 3:
-                        df = tmp
-                        break
-                except Exception as he:
-                    last_err = he
-            if df is None:
-                return 0, f"교보 형식 해석 실패: {last_err}"
-
-            # 컬럼 정규화(개행/공백 제거)
-            norm_cols = [str(c).replace("\n", "").replace(" ", "") for c in df.columns]
-            df.columns = norm_cols
-
-            key_map = {
-                "상품명": None,
-                "상품코드": None,
-                "수량": None,
-                "합계금액": None,
-                "정가": None,
-                "공급율": None,
-            }
-            for c in df.columns:
-                if c in key_map:
-                    key_map[c] = c
-                elif c in ("공급률",):
-                    key_map["공급율"] = c
-                elif c in ("합계",):
-                    key_map["합계금액"] = c
-
-            required = ["상품명", "수량", "합계금액"]
-            miss = [k for k in required if not key_map.get(k)]
-            if miss:
-                return 0, f"교보 형식 컬럼 누락: {', '.join(miss)}"
+    def _read_kyobo(self, filepath: str, xf: pd.ExcelFile, sheet: int = 0, sheet_name: str = "") -> tuple[int, str | None]:
+        # 앞 20행만 읽어 머리글 행을 찾은 뒤 본문은 한 번만 읽는다
+        with self.report.stage("header"):
+            h = _find_kyobo_header(xf.parse(sheet, header=None, nrows=_HEADER_PROBE_ROWS))
+        if h is None:
+            return 0, _KYOBO_NO_HEADER
+        with self.report.stage("read"):
+            df = xf.parse(sheet, header=h)
+
+        # 컬럼 정규화(개행/공백 제거)
+        df.columns = [_norm_header(c) for c in df.columns]
+        key_map = _kyobo_key_map(df.columns)
+        miss = _kyobo_missing(key_map)
+        if miss:
+            return 0, f"교보 형식 컬럼 누락: {', '.join(miss)}"
 
-            # 합계/NaN 행 제거
-            df = df[pd.to_numeric(df[key_map["수량"]], errors="coerce").notna()]
-            df = df[pd.to_numeric(df[key_map["합계금액"]], errors="coerce").notna()]
+        stats = self._stats_for(filepath)
+        return self._ingest(
+            df, lambda d: _filter_kyobo(d, key_map), lambda d: _normalize_kyobo(d, key_map, stats, sheet_name),
+        ), None
 
+    def _stream_kyobo(self, filepath: str, wb: Workbook | None = None, sheet: int = 0, sheet_name: str = "") -> tuple[int, str | None]:
+        with closing(iter_xlsx_rows(filepath, wb.book if wb is not None else None, sheet)) as rows:
+            with self.report.stage("header"):
+                probe = list(islice(rows, _HEADER_PROBE_ROWS))
+                h = _find_kyobo_header(pd.DataFrame(probe))
+            if h is None:
+                return 0, _KYOBO_NO_HEADER
+            columns = [_norm_header(c) for c in header_names(probe[h])]
+            key_map = _kyobo_key_map(columns)
+            miss = _kyobo_missing(key_map)
+            if miss:
+                return 0, f"교보 형식 컬럼 누락: {', '.join(miss)}"
+            stats = self._stats_for(filepath)
             cnt = 0
-            for _, row in df.iterrows():
-                q = safe_int(row.get(key_map["수량"], 0))
-                total_amt = safe_int(row.get(key_map["합계금액"], 0))
-                unit = round((total_amt / q), 2) if q > 0 else 0.0  # 소수점 2자리
-                product_code = ""
-                if key_map.get("상품코드"):
-                    product_code = str(row.get(key_map["상품코드"]))
-                    if pd.isna(product_code):
-                        product_code = ""
-                    else:
-                        product_code = product_code.strip()
-                record = {
-                    "도서명": str(row.get(key_map["상품명"], "")).strip(),
-                    "저자명": "",
-                    "ISBN": product_code,  # 문자열로 유지
-                    "서점명": "교보문고",
-                    "입고수량": q,
-                    "단가": unit,
-                    "정산액": total_amt,
-                    "정가": safe_int(row.get(key_map.get("정가", ""), 0)) if key_map.get("정가") else 0,
-                    "입고율": safe_int(row.get(key_map.get("공급율", ""), 0)) if key_map.get("공급율") else 0,
-                }
-                self.unified_data.append(record)
-                cnt += 1
-            return cnt, None
-        except Exception as e:
-            return 0, f"교보 처리 오류: {e}"
+            for chunk in self._iter_frames(chain(probe[h + 1:], rows), columns):
+                cnt += self._ingest(
+                    chunk, lambda d: _filter_kyobo(d, key_map), lambda d: _normalize_kyobo(d, key_map, stats, sheet_name),
+                )
+        return cnt, None
 
     # ----------------- 알라딘 ----------------- #
     def process_aladin(self, filepath: str) -> tuple[int, str | None]:
@@ -126,36 +367,285 @@ class BookstoreSettlementProcessor:
 
     # ----------------- 자동 라우팅 ----------------- #
     def process_file(self, filepath: str) -> tuple[int, str | None]:
-        bs = detect_bookstore(filepath)
-        if bs == "yes24":
-            return self.process_yes24(filepath)
-        if bs == "kyobo":
-            return self.process_kyobo(filepath)
-        if bs == "aladin":
-            return self.process_aladin(filepath)
-        return 0, "서점 자동 감지 실패(파일명에 '예스24'/'교보'/'알라딘' 포함 권장)."
+        """파일 하나 처리. 취소되면 그 파일의 일부 묶음을 버리고 ProcessingCancelled를 다시 올린다."""
+        start = len(self._chunks)
+        self._progress_file, self._rows_read, self._rows_expected = filepath, 0, None
+        self.parse_stats.pop(filepath, None)
+        with self.report.file(filepath) as rec:
+            try:
+                self._check_cancel()
+                cnt, err = self._process_file(filepath)
+            except ProcessingCancelled:
+                del self._chunks[start:]
+                rec.update(error="취소됨")
+                raise
+            if err is not None:
+                del self._chunks[start:]  # 스트리밍 도중 실패한 파일의 일부 묶음 제거
+            else:
+                self.file_rows.append((filepath, cnt))
+            rec.update(rows=cnt, error=err, cached=filepath in self.cache_hits, parse_stats=self.parse_stats.get(filepath))
+        return cnt, err
+
+    def _process_file(self, filepath: str) -> tuple[int, str | None]:
+        # 감지와 파싱이 같은 통합 문서 핸들을 쓴다(감지 결과가 캐시에 있으면 파싱 때 처음 연다)
+        wb = open_workbook(filepath)
+        try:
+            with self.report.stage("detect"):
+                bs = (sniff_store(filepath, wb) if wb is not None else None) or detect_bookstore_by_name(filepath)
+            self.report.note(store=bs)
+            self._progress()
+            self._check_cancel()  # 통합 문서를 여는 동안 들어온 취소
+            if bs == "yes24":
+                return self._cached(filepath, bs, lambda fp: self.process_yes24(fp, wb))
+            if bs == "kyobo":
+                return self._cached(filepath, bs, lambda fp: self.process_kyobo(fp, wb))
+            if bs == "aladin":
+                return self.process_aladin(filepath)
+            return 0, "서점 자동 감지 실패(머리글에서 예스24/교보 컬럼을 찾지 못했고, 파일명에도 '예스24'/'교보'/'알라딘'이 없습니다)."
+        finally:
+            if wb is not None:
+                wb.close()
+
+    def _cached(self, filepath: str, store: str, parse: Callable[[str], tuple[int, str | None]]) -> tuple[int, str | None]:
+        """내용이 같은 파일은 캐시된 정규화 결과를 쓰고, 새로 파싱한 결과는 캐시에 저장"""
+        if not self.cache.enabled:
+            return parse(filepath)
+        try:
+            with self.report.stage("cache"):
+                key = self.cache.key(file_digest(filepath), store)
+                df = self.cache.get(key)
+        except OSError:
+            return parse(filepath)
+        if df is not None:
+            with self.report.stage("merge"):
+                self._append(df)
+            self.cache_hits.add(filepath)
+            self._progress(self._rows_expected or len(df))
+            return len(df), None
+
+        start = len(self._chunks)
+        cnt, err = parse(filepath)
+        new = self._chunks[start:]
+        if err is None and new:
+            with self.report.stage("cache"):
+                self.cache.put(key, pd.concat(new, ignore_index=True) if len(new) > 1 else new[0])
+        return cnt, err
+
+    # ----------------- 여러 파일(병렬) ----------------- #
+    def process_files(
+        self,
+        filepaths: Iterable[str],
+        workers: int = 1,
+        on_result: Callable[[str, int, str | None], None] | None = None,
+        on_progress: ProgressCallback | None = None,
+        cancel: threading.Event | None = None,
+    ) -> list[tuple[str, int, str | None]]:
+        """여러 파일을 처리해 입력 순서대로 병합한다.
+
+        workers > 1이면 파일마다 별도 프로세스에서 파싱한다. 동시에 진행 중인
+        파일은 최대 workers개로 제한하므로 메모리 사용량도 그만큼으로 묶인다.
+        on_result는 파일 하나가 병합될 때마다 (경로, 건수, 오류) 순서로 호출된다.
+        on_progress는 읽은 묶음마다 (경로, 읽은 원본 행 수, 예상 행 수) 순서로 호출된다.
+        cancel이 set()되면 묶음 사이에서 멈추고, 끝까지 처리된 파일만 병합한 채 돌아온다
+        (self.cancelled = True).
+        """
+        paths = list(filepaths)
+        results: list[tuple[str, int, str | None]] = []
+        cancel = cancel if cancel is not None else self.cancel
+        on_progress = on_progress if on_progress is not None else self.on_progress
+        self.cancelled = False
+
+        def merge(fp: str, frame: pd.DataFrame | None, cnt: int, err: str | None, meta: dict):
+            if frame is not None:
+                self._append(frame)
+                if err is None:
+                    self.file_rows.append((fp, len(frame)))
+            if meta.get("cached"):
+                self.cache_hits.add(fp)
+            if meta.get("parse_stats") is not None:
+                self.parse_stats[fp] = meta["parse_stats"]
+            self.report.add_file(meta.get("report") or {"path": fp, "rows": cnt, "error": err, "stages": {}})
+            results.append((fp, cnt, err))
+            if on_result is not None:
+                on_result(fp, cnt, err)
+
+        if workers <= 1 or len(paths) <= 1:
+            for fp in paths:
+                try:
+                    parsed = parse_file(fp, cancel, on_progress, self.cache)
+                except ProcessingCancelled:
+                    self.cancelled = True
+                    break
+                merge(fp, *parsed)
+            return results
+
+        # 작업 프로세스와는 프로세스 간 Event/Queue로 취소와 진행을 주고받는다
+        mp_cancel = multiprocessing.Event()
+        mp_progress = multiprocessing.Queue()
+
+        def pump():
+            if cancel is not None and cancel.is_set():
+                mp_cancel.set()
+            while True:
+                try:
+                    item = mp_progress.get_nowait()
+                except queue.Empty:
+                    return
+                if on_progress is not None:
+                    on_progress(*item)
+
+        def wait(fut):
+            while True:
+                try:
+                    return fut.result(timeout=_POLL_SECONDS)
+                except FuturesTimeout:
+                    pump()
+
+        todo = iter(paths)
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(paths)), initializer=_init_worker, initargs=(mp_cancel, mp_progress, self.cache),
+        ) as ex:
+            pending = deque()
+            for fp in todo:
+                pending.append((fp, ex.submit(_parse_in_worker, fp)))
+                if len(pending) >= workers:
+                    break
+            while pending:
+                fp, fut = pending.popleft()
+                try:
+                    frame, cnt, err, meta = wait(fut)
+                except (ProcessingCancelled, CancelledError):
+                    self.cancelled = True
+                    continue
+                except Exception as e:
+                    frame, cnt, err, meta = None, 0, f"병렬 처리 오류: {e}", {}
+                pump()
+                if mp_cancel.is_set():
+                    self.cancelled = True
+                    for _, f in pending:  # 아직 시작하지 않은 파일은 건너뛴다
+                        f.cancel()
+                else:
+                    nxt = next(todo, None)
+                    if nxt is not None:
+                        pending.append((nxt, ex.submit(_parse_in_worker, nxt)))
+                merge(fp, frame, cnt, err, meta)
+        mp_progress.close()
+        return results
 
     # ----------------- 결과/저장 ----------------- #
+    def _frame_chunks(self) -> list[pd.DataFrame]:
+        if self._frame is not None:
+            return [self._frame]
+        return self._chunks
+
     def get_unified_dataframe(self) -> pd.DataFrame:
-        if not self.unified_data:
-            return pd.DataFrame()
-        df = pd.DataFrame(self.unified_data)
-        cols = ["도서명", "저자명", "ISBN", "서점명", "입고수량", "단가", "정산액", "정가", "입고율"]
-        for c in cols:
-            if c not in df.columns:
-                df[c] = None
-        return df[cols]
+        if self._frame is None:
+            if not self._chunks:
+                return pd.DataFrame(columns=UNIFIED_COLUMNS).astype(UNIFIED_SCHEMA)
+            self._frame = pd.concat(self._chunks, ignore_index=True)
+            self._chunks = [self._frame]
+        return self._frame
 
-    def save_to_csv(self, path: str) -> bool:
+    def iter_file_frames(self) -> Iterator[tuple[str, pd.DataFrame]]:
+        """(파일 경로, 그 파일의 통합 결과 구간)을 처리 순서대로"""
         df = self.get_unified_dataframe()
-        if df.empty:
-            return False
-        df.to_csv(path, index=False, encoding="utf-8-sig")
-        return True
+        off = 0
+        for fp, n in self.file_rows:
+            yield fp, df.iloc[off:off + n]
+            off += n
 
-    def save_to_excel(self, path: str) -> bool:
+    def aggregate(self):
+        """ISBN×서점 집계(aggregate.SettlementAggregate). 지난 호출 뒤 새로 들어온 행만 더한다."""
+        from aggregate import SettlementAggregate
         df = self.get_unified_dataframe()
-        if df.empty:
+        if self._aggregate is None or len(df) < self._aggregated_rows:
+            self._aggregate, self._aggregated_rows = SettlementAggregate(), 0
+        if len(df) > self._aggregated_rows:
+            self._aggregate.update(df.iloc[self._aggregated_rows:])
+            self._aggregated_rows = len(df)
+        return self._aggregate
+
+    def save(self, path: str, fmt: str | None = None) -> bool:
+        """확장자에 맞춰 CSV/XLSX/Parquet/Feather로 저장(결과가 없으면 False)"""
+        chunks = self._frame_chunks()
+        if not any(len(c) for c in chunks):
             return False
-        df.to_excel(path, index=False, engine="openpyxl")
+        with self.report.export(path, fmt or format_for_path(path) or "xlsx", sum(len(c) for c in chunks)):
+            export(chunks, path, fmt)
         return True
+
+    def save_to_csv(self, path: str) -> bool:
+        return self.save(path, "csv")
+
+    def save_to_excel(self, path: str) -> bool:
+        return self.save(path, "xlsx")
+
+    def save_to_parquet(self, path: str) -> bool:
+        return self.save(path, "parquet")
+
+    def save_to_feather(self, path: str) -> bool:
+        return self.save(path, "feather")
+
+
+# ----------------- 요약 ----------------- #
+def store_summary(df: pd.DataFrame) -> list[dict]:
+    """서점별 입고수량/정산액 합계"""
+    grp = df.groupby("서점명", dropna=False, observed=True).agg({"입고수량": "sum", "정산액": "sum"}).reset_index()
+    return [
+        {"서점명": str(r["서점명"]), "입고수량": int(r["입고수량"]), "정산액": int(r["정산액"])}
+        for r in grp.to_dict("records")
+    ]
+
+def format_summary(df: pd.DataFrame) -> str:
+    """'총 N건 처리' + 서점별 '- 서점: 수량 / 금액' 줄(GUI/CLI 공용)"""
+    lines = [f"- {s['서점명']}: 수량 {s['입고수량']} / 금액 {s['정산액']:,}원" for s in store_summary(df)]
+    if "ISBN상태" in df.columns:
+        counts = df["ISBN상태"].value_counts()
+        if counts.get("무효", 0) or counts.get("변환", 0):
+            lines.append(f"- ISBN 무효 {counts.get('무효', 0)}건 / ISBN-10→13 변환 {counts.get('변환', 0)}건")
+    return f"총 {len(df)}건 처리\n" + "\n".join(lines)
+
+
+def parse_file(
+    filepath: str,
+    cancel: threading.Event | None = None,
+    on_progress: ProgressCallback | None = None,
+    cache: ParseCache | None = None,
+) -> tuple[pd.DataFrame | None, int, str | None, dict]:
+    """파일 하나를 파싱해 (통합 스키마 열 묶음, 건수, 오류, 부가 정보)를 돌려준다(작업 프로세스용)
+
+    부가 정보: {"cached": 캐시 적중 여부, "parse_stats": 열별 숫자 변환 건수, "report": 파일 계측 기록}
+    cache는 호출한 프로세서의 캐시(위치/용량/버전)를 그대로 쓴다(없으면 기본 캐시).
+    취소되면 ProcessingCancelled를 올린다.
+    """
+    # 계측 기록은 병합하는 쪽(RunReport.add_file)에서 JSON-lines로 내보낸다
+    proc = BookstoreSettlementProcessor(
+        cache=cache, report=RunReport(jsonl_path=None), cancel=cancel, on_progress=on_progress,
+    )
+    cnt, err = proc.process_file(filepath)
+    frame = proc.get_unified_dataframe() if proc._chunks else None
+    meta = {
+        "cached": filepath in proc.cache_hits,
+        "parse_stats": proc.parse_stats.get(filepath),
+        "report": proc.report.files[-1] if proc.report.files else None,
+    }
+    return frame, cnt, err, meta
+
+
+# ----------------- 작업 프로세스 ----------------- #
+_POLL_SECONDS = 0.1  # 병렬 처리 중 취소/진행 확인 간격
+_worker_cancel = None
+_worker_progress = None
+_worker_cache = None
+
+def _init_worker(cancel, progress, cache=None) -> None:
+    global _worker_cancel, _worker_progress, _worker_cache
+    _worker_cancel, _worker_progress, _worker_cache = cancel, progress, cache
+
+def _report_from_worker(filepath: str, rows: int, total: int | None) -> None:
+    _worker_progress.put((filepath, rows, total))
+
+def _parse_in_worker(filepath: str):
+    return parse_file(
+        filepath, _worker_cancel, _report_from_worker if _worker_progress is not None else None, _worker_cache,
+    )
@@ -0,0 +1,843 @@
+"""로컬 정산 병합 작업 서비스(asyncio + 표준 라이브러리 HTTP)
+
+여러 사람이 같은 파일을 각자 파싱하지 않도록, 한 곳(기본 127.0.0.1)에서 병합 작업을 받아 처리한다.
+
+    POST   /uploads?name=파일명     본문 = 파일 내용 → {"id"} (내용 해시로 저장해 같은 파일은 한 번만 둔다)
+    POST   /jobs                    {"files": ["서버 쪽 경로" | {"upload": id}, ...]} → 작업 상태
+    GET    /jobs                    작업 목록
+    GET    /jobs/{id}               작업 상태(파일별 결과, 진행률, 요약)
+    GET    /jobs/{id}/events        진행 이벤트(text/event-stream): state / progress / file / done
+    GET    /jobs/{id}/result        통합 결과 내려받기(?format=xlsx|csv|parquet|feather, 기본 xlsx)
+    DELETE /jobs/{id}               취소(같은 작업을 기다리는 클라이언트가 모두 취소했을 때 멈춘다)
+    GET    /health
+
+- 작업은 동시에 max_jobs개까지 스레드에서 BookstoreSettlementProcessor.process_files로 처리하고,
+  대기 작업이 max_queue개를 넘으면 503으로 거절한다.
+- 입력 파일 내용(+파서 버전)이 같은 작업은 새로 만들지 않고 진행 중이거나 끝난 작업을 돌려준다.
+- 끝난 작업 결과는 최근 keep_jobs개까지 보관하고, 내려받기 형식별 파일은 처음 요청 때 만든다.
+- TestClient는 소켓 없이 같은 프로세스에서 요청을 보내고, RemoteProcessor는 GUI용 얇은 클라이언트다.
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import hashlib
+import http.client
+import json
+import os
+import queue
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+from http import HTTPStatus
+from urllib.parse import parse_qs, quote, urlsplit
+import pandas as pd
+
+from cache import CACHE_DIR, ParseCache, file_digest
+from export import EXPORT_FORMATS
+from isbn import HAS_PYARROW
+from metrics import ProgressTracker
+from pub_settlement import (
+    BookstoreSettlementProcessor, PARSER_VERSION, ProgressCallback, UNIFIED_COLUMNS, UNIFIED_SCHEMA, format_summary,
+)
+from utils import SUPPORTED_EXTS
+
+SERVICE_HOST = os.environ.get("PUB_SETTLEMENT_SERVICE_HOST", "127.0.0.1")
+SERVICE_PORT = int(os.environ.get("PUB_SETTLEMENT_SERVICE_PORT", "8765"))
+SERVICE_DIR = os.environ.get("PUB_SETTLEMENT_SERVICE_DIR", os.path.join(CACHE_DIR, "service"))
+MAX_JOBS = int(os.environ.get("PUB_SETTLEMENT_SERVICE_JOBS", "2"))  # 동시에 처리하는 작업 수
+MAX_QUEUE = int(os.environ.get("PUB_SETTLEMENT_SERVICE_QUEUE", "16"))  # 대기 작업 상한
+KEEP_JOBS = int(os.environ.get("PUB_SETTLEMENT_SERVICE_KEEP_JOBS", "20"))  # 결과를 보관할 끝난 작업 수
+MAX_UPLOAD_MB = float(os.environ.get("PUB_SETTLEMENT_SERVICE_MAX_UPLOAD_MB", "512"))
+# 보관 중인 작업이 쓰지 않는 업로드는 이 시간(초)이 지나면 지운다(올린 뒤 작업 등록까지의 여유)
+UPLOAD_GRACE_SECONDS = float(os.environ.get("PUB_SETTLEMENT_SERVICE_UPLOAD_GRACE", "3600"))
+PROGRESS_INTERVAL = 0.25  # 진행 이벤트 최소 간격(초)
+KEEPALIVE_SECONDS = 15.0
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+_FINAL = (DONE, FAILED, CANCELLED)
+_FORMATS = {fmt: ext for ext, fmt in reversed(list(EXPORT_FORMATS.items()))}  # 형식 → 대표 확장자
+_UPLOAD_ID = re.compile(r"[0-9a-f]{64}/[^/\\]+")
+_MAX_JSON = 1 << 20
+_BLOCK = 1 << 20
+
+
+class ServiceError(Exception):
+    """HTTP 상태 코드가 붙은 요청 오류(서버 응답/클라이언트 예외 공용)"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+# ----------------- 작업 ----------------- #
+class Job:
+    """병합 작업 하나. 상태는 이벤트 루프 스레드에서만 바꾸고, 작업 스레드는 post로 넘긴다."""
+
+    def __init__(self, job_id: str, key: str, files: list[str], loop: asyncio.AbstractEventLoop):
+        self.id = job_id
+        self.key = key  # 입력 내용 해시(중복 작업 판별)
+        self.files = files  # 서버 쪽 경로(입력 순서)
+        self.state = QUEUED
+        self.error: str | None = None
+        self.clients = 1  # 이 작업을 기다리는 클라이언트 수(중복 제출 포함)
+        self.created = time.time()
+        self.results: list[dict] = []  # 파일별 {"index", "name", "rows", "error", "cached"}
+        self.rows = 0
+        self.summary: str | None = None
+        self.processor: BookstoreSettlementProcessor | None = None
+        self.exports: dict[str, str] = {}  # 형식 → 내보낸 파일
+        self.cancel = threading.Event()
+        self.tracker = ProgressTracker(files)
+        self.events: list[tuple[str, dict]] = []  # state / file / done (늦게 붙은 구독자도 처음부터 읽는다)
+        self.progress: dict | None = None  # 최신 진행만 남긴다
+        self.progress_seq = 0
+        self._index = {fp: i for i, fp in reversed(list(enumerate(files)))}
+        self._loop = loop
+        self._changed = asyncio.Event()
+        self._export_lock = asyncio.Lock()
+        self._last_progress = 0.0
+
+    def status(self) -> dict:
+        return {
+            "id": self.id,
+            "state": self.state,
+            "files": [os.path.basename(fp) for fp in self.files],
+            "results": self.results,
+            "rows": self.rows,
+            "error": self.error,
+            "summary": self.summary,
+            "clients": self.clients,
+            "created": self.created,
+            "progress": self.tracker.snapshot(),
+        }
+
+    # ----- 이벤트 루프 스레드 ----- #
+    def emit(self, event: str, data: dict) -> None:
+        if event == "state":
+            self.state = data["state"]
+        elif event == "file":
+            self.results.append(data)
+        self.events.append((event, data))
+        self._wake()
+
+    def _set_progress(self, data: dict) -> None:
+        self.progress = {**data, **self.tracker.snapshot()}
+        self.progress_seq += 1
+        self._wake()
+
+    def _wake(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    # ----- 작업 스레드 ----- #
+    def post(self, event: str, data: dict) -> None:
+        self._loop.call_soon_threadsafe(self.emit, event, data)
+
+    def on_progress(self, filepath: str, rows: int, total: int | None) -> None:
+        self.tracker.update(filepath, rows, total)
+        now = time.monotonic()
+        if now - self._last_progress >= PROGRESS_INTERVAL:  # 묶음마다 오는 진행을 간격으로 솎는다
+            self._last_progress = now
+            data = {"index": self._index.get(filepath, 0), "rows": rows, "total": total}
+            self._loop.call_soon_threadsafe(self._set_progress, data)
+
+
+# ----------------- 서비스 ----------------- #
+class JobService:
+    """병합 작업 큐 + HTTP 처리기(handle). serve/start로 소켓에 붙이거나 TestClient로 직접 부른다."""
+
+    def __init__(
+        self,
+        directory: str | None = None,
+        max_jobs: int = MAX_JOBS,
+        max_queue: int = MAX_QUEUE,
+        keep_jobs: int = KEEP_JOBS,
+        workers: int = 1,
+        cache: ParseCache | None = None,
+        upload_grace: float = UPLOAD_GRACE_SECONDS,
+    ):
+        self.directory = directory or SERVICE_DIR
+        self.upload_dir = os.path.join(self.directory, "uploads")
+        self.result_dir = os.path.join(self.directory, "results")
+        os.makedirs(self.upload_dir, exist_ok=True)
+        os.makedirs(self.result_dir, exist_ok=True)
+        self.max_queue = max_queue
+        self.keep_jobs = keep_jobs
+        self.workers = workers  # 작업 하나의 파일 병렬 처리 프로세스 수
+        self.cache = cache  # 작업 프로세서의 파싱 캐시(없으면 기본 캐시)
+        self.upload_grace = upload_grace
+        self.jobs: OrderedDict[str, Job] = OrderedDict()
+        self._by_key: dict[str, Job] = {}
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_jobs), thread_name_prefix="settlement-job")
+        self._thread: threading.Thread | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._server: asyncio.Server | None = None
+        self._prune_uploads()  # 지난 실행에서 남은 업로드
+
+    # ----- 업로드/작업 ----- #
+    async def save_upload(self, reader: asyncio.StreamReader, length: int, name: str) -> dict:
+        """본문을 내용 해시 폴더에 원래 파일명으로 저장(서점 감지가 파일명도 본다)"""
+        name = os.path.basename(name.replace("\\", "/"))
+        if not name or os.path.splitext(name)[1].lower() not in SUPPORTED_EXTS:
+            raise ServiceError(400, "업로드 파일명(name)은 .xls/.xlsx여야 합니다")
+        if length > MAX_UPLOAD_MB * 1024 * 1024:
+            raise ServiceError(413, f"업로드 상한({MAX_UPLOAD_MB:g} MB)을 넘었습니다")
+        h = hashlib.sha256()
+        fd, tmp = tempfile.mkstemp(dir=self.upload_dir, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                left = length
+                while left:
+                    block = await reader.readexactly(min(_BLOCK, left))
+                    h.update(block)
+                    f.write(block)
+                    left -= len(block)
+            digest = h.hexdigest()
+            dest = os.path.join(self.upload_dir, digest, name)
+            if os.path.exists(dest):
+                os.remove(tmp)
+                os.utime(dest)  # 다시 올린 업로드는 정리 유예를 새로 시작
+            else:
+                os.makedirs(os.path.dirname(dest), exist_ok=True)
+                os.replace(tmp, dest)
+        except BaseException:
+            with suppress(OSError):
+                os.remove(tmp)
+            raise
+        return {"id": f"{digest}/{name}", "name": name, "size": length}
+
+    def _resolve(self, entries) -> tuple[list[str], list[str | None]]:
+        """작업 입력 → (서버 쪽 경로, 이미 아는 내용 해시 또는 None)"""
+        if not isinstance(entries, list) or not entries:
+            raise ServiceError(400, "files는 경로 또는 {\"upload\": id}의 목록이어야 합니다")
+        files: list[str] = []
+        digests: list[str | None] = []
+        for e in entries:
+            if isinstance(e, dict) and isinstance(e.get("upload"), str) and _UPLOAD_ID.fullmatch(e["upload"]):
+                path = os.path.join(self.upload_dir, *e["upload"].split("/"))
+                digest = e["upload"].split("/")[0]
+            elif isinstance(e, str):
+                path, digest = os.path.abspath(e), None
+            else:
+                raise ServiceError(400, f"잘못된 입력 항목: {e!r}")
+            if os.path.splitext(path)[1].lower() not in SUPPORTED_EXTS:
+                raise ServiceError(400, f"정산서(.xls/.xlsx)만 처리할 수 있습니다: {os.path.basename(path)}")
+            if not os.path.isfile(path):
+                raise ServiceError(404, f"파일이 없습니다: {e if isinstance(e, str) else e['upload']}")
+            files.append(path)
+            digests.append(digest)
+        return files, digests
+
+    async def submit(self, entries) -> tuple[Job, bool]:
+        """작업 등록. 입력 내용이 같은 작업이 있으면 그것을 (작업, True)로 돌려준다."""
+        files, known = self._resolve(entries)
+        digests = await asyncio.to_thread(lambda: [d or file_digest(fp) for fp, d in zip(files, known)])
+        key = hashlib.sha256(json.dumps([PARSER_VERSION, digests]).encode()).hexdigest()
+
+        job = self._by_key.get(key)
+        if job is not None and job.state not in (FAILED, CANCELLED):
+            job.clients += 1
+            return job, True
+        if sum(j.state == QUEUED for j in self.jobs.values()) >= self.max_queue:
+            raise ServiceError(503, "대기 중인 작업이 너무 많습니다. 잠시 후 다시 시도하세요.")
+
+        loop = asyncio.get_running_loop()
+        job = Job(uuid.uuid4().hex[:12], key, files, loop)
+        self.jobs[job.id] = self._by_key[key] = job
+        job.emit("state", {"state": QUEUED})
+        fut = loop.run_in_executor(self._executor, self._run, job)
+        fut.add_done_callback(lambda f: self._finish(job, f))
+        return job, False
+
+    def _run(self, job: Job) -> tuple[BookstoreSettlementProcessor, str, int] | None:
+        # 작업 스레드: 대기 중 취소됐으면 시작하지 않는다
+        if job.cancel.is_set():
+            return None
+        job.post("state", {"state": RUNNING})
+        processor = BookstoreSettlementProcessor(cache=self.cache)
+
+        def on_result(fp: str, cnt: int, err: str | None):
+            # index는 작업 입력에서의 위치(병렬이면 끝난 순서가 다르고 취소/실패한 파일은 건너뛴다)
+            job.tracker.finish(fp, cnt)
+            job.post("file", {
+                "index": job._index[fp], "name": os.path.basename(fp), "rows": cnt, "error": err,
+                "cached": fp in processor.cache_hits,
+            })
+
+        processor.process_files(
+            job.files, workers=self.workers, on_result=on_result, on_progress=job.on_progress, cancel=job.cancel,
+        )
+        df = processor.get_unified_dataframe()  # 병합(concat)은 이벤트 루프가 아니라 여기서
+        return processor, format_summary(df), len(df)
+
+    def _finish(self, job: Job, fut: asyncio.Future) -> None:
+        try:
+            out = fut.result()
+        except Exception as e:
+            job.error, state = f"{type(e).__name__}: {e}", FAILED
+        else:
+            if out is not None:
+                job.processor, job.summary, job.rows = out
+            state = CANCELLED if out is None or job.processor.cancelled else DONE
+        if state != DONE and self._by_key.get(job.key) is job:
+            del self._by_key[job.key]  # 실패/취소된 작업은 중복 제출에 다시 쓰지 않는다
+        job.emit("state", {"state": state})
+        job.emit("done", job.status())
+        self._evict()
+
+    def cancel(self, job: Job) -> None:
+        job.clients -= 1
+        if job.clients <= 0 and job.state not in _FINAL:
+            job.cancel.set()
+
+    def _evict(self) -> None:
+        finished = [j for j in self.jobs.values() if j.state in _FINAL]
+        for job in finished[:max(0, len(finished) - self.keep_jobs)]:
+            del self.jobs[job.id]
+            if self._by_key.get(job.key) is job:
+                del self._by_key[job.key]
+            for path in job.exports.values():
+                with suppress(OSError):
+                    os.remove(path)
+        # 폴더 훑기는 작업 스레드에서(참조 목록만 이벤트 루프에서 떠 둔다)
+        asyncio.get_running_loop().run_in_executor(None, self._prune_uploads, self._referenced())
+
+    def _referenced(self) -> set[str]:
+        return {fp for job in self.jobs.values() for fp in job.files}
+
+    def _prune_uploads(self, used: set[str] | None = None) -> None:
+        """보관 중인 작업(used)이 쓰지 않고 유예 시간이 지난 업로드(와 끊긴 .part)를 지운다"""
+        used = self._referenced() if used is None else used
+        cutoff = time.time() - self.upload_grace
+        try:
+            entries = list(os.scandir(self.upload_dir))
+        except OSError:
+            return
+        for e in entries:
+            try:
+                if e.is_file():
+                    if e.name.endswith(".part") and e.stat().st_mtime < cutoff:
+                        os.remove(e.path)
+                    continue
+                for f in list(os.scandir(e.path)):
+                    if f.path not in used and f.stat().st_mtime < cutoff:
+                        os.remove(f.path)
+                if not os.listdir(e.path):
+                    os.rmdir(e.path)
+            except OSError:  # 정리 도중 다시 올라오거나 지워진 항목
+                continue
+
+    async def export(self, job: Job, fmt: str) -> str:
+        """작업 결과를 fmt 형식 파일로(처음 요청 때 한 번 만든다)"""
+        if job.state not in (DONE, CANCELLED) or job.processor is None:
+            raise ServiceError(409, f"결과가 아직 없습니다(상태: {job.state})")
+        if not job.rows:
+            raise ServiceError(404, "처리된 행이 없습니다")
+        async with job._export_lock:
+            if fmt not in job.exports:
+                path = os.path.join(self.result_dir, f"{job.id}{_FORMATS[fmt]}")
+                try:
+                    await asyncio.to_thread(job.processor.save, path, fmt)
+                except ImportError as e:
+                    raise ServiceError(400, f"{fmt} 저장에 필요한 모듈이 없습니다: {e}") from e
+                job.exports[fmt] = path
+        return job.exports[fmt]
+
+    # ----- HTTP ----- #
+    async def handle(self, reader: asyncio.StreamReader, writer) -> None:
+        """연결 하나(요청 하나 처리 후 닫는다)"""
+        try:
+            req = await _read_request(reader)
+            if req is not None:
+                await self._dispatch(req, reader, writer)
+        except ServiceError as e:
+            with suppress(ConnectionError):
+                await _send_json(writer, e.status, {"error": e.message})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except Exception as e:
+            with suppress(ConnectionError):
+                await _send_json(writer, 500, {"error": f"{type(e).__name__}: {e}"})
+        finally:
+            writer.close()
+            with suppress(Exception):
+                await writer.wait_closed()
+
+    def _job(self, job_id: str) -> Job:
+        job = self.jobs.get(job_id)
+        if job is None:
+            raise ServiceError(404, f"작업이 없습니다: {job_id}")
+        return job
+
+    async def _dispatch(self, req: dict, reader: asyncio.StreamReader, writer) -> None:
+        method, parts, query = req["method"], req["parts"], req["query"]
+        route = (method, *parts[:1], *(["*"] if len(parts) > 1 else []), *parts[2:])
+        if route == ("GET", "health"):
+            running = sum(j.state == RUNNING for j in self.jobs.values())
+            await _send_json(writer, 200, {"ok": True, "parser_version": PARSER_VERSION, "running": running})
+        elif route == ("POST", "uploads"):
+            name = query.get("name", [""])[0]
+            await _send_json(writer, 201, await self.save_upload(reader, req["length"], name))
+        elif route == ("GET", "jobs"):
+            await _send_json(writer, 200, {"jobs": [j.status() for j in self.jobs.values()]})
+        elif route == ("POST", "jobs"):
+            body = await _read_json(reader, req["length"])
+            job, dedup = await self.submit(body.get("files") if isinstance(body, dict) else None)
+            await _send_json(writer, 200 if dedup else 202, {**job.status(), "deduplicated": dedup})
+        elif route == ("GET", "jobs", "*"):
+            await _send_json(writer, 200, self._job(parts[1]).status())
+        elif route == ("DELETE", "jobs", "*"):
+            job = self._job(parts[1])
+            self.cancel(job)
+            await _send_json(writer, 200, job.status())
+        elif route == ("GET", "jobs", "*", "events"):
+            await self._stream_events(self._job(parts[1]), writer)
+        elif route == ("GET", "jobs", "*", "result"):
+            job = self._job(parts[1])
+            fmt = query.get("format", ["xlsx"])[0]
+            if fmt not in _FORMATS:
+                raise ServiceError(400, f"지원하지 않는 형식: {fmt}")
+            await _send_file(writer, await self.export(job, fmt), f"통합정산_{job.id}{_FORMATS[fmt]}")
+        else:
+            raise ServiceError(404, f"없는 경로: {method} /{'/'.join(parts)}")
+
+    async def _stream_events(self, job: Job, writer) -> None:
+        """state/file/done은 빠짐없이, progress는 최신 값만 보낸다. done 뒤에 닫는다."""
+        writer.write(_head(200, "text/event-stream", None, ["Cache-Control: no-cache"]))
+        sent, seq = 0, -1
+        while True:
+            changed = job._changed
+            while sent < len(job.events):
+                event, data = job.events[sent]
+                writer.write(_sse(event, data))
+                sent += 1
+            if job.progress is not None and job.progress_seq != seq and job.state == RUNNING:
+                seq = job.progress_seq
+                writer.write(_sse("progress", job.progress))
+            await writer.drain()
+            if job.state in _FINAL and sent == len(job.events):
+                return
+            try:
+                await asyncio.wait_for(changed.wait(), KEEPALIVE_SECONDS)
+            except TimeoutError:
+                writer.write(b": keepalive\n\n")
+
+    # ----- 실행 ----- #
+    async def serve(self, host: str = SERVICE_HOST, port: int = SERVICE_PORT) -> asyncio.Server:
+        return await asyncio.start_server(self.handle, host, port)
+
+    def start(self, host: str = SERVICE_HOST, port: int = 0) -> str:
+        """백그라운드 스레드의 이벤트 루프에서 서비스를 띄우고 기본 URL을 돌려준다(port 0이면 빈 포트)"""
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="settlement-service", daemon=True)
+        self._thread.start()
+        self._server = asyncio.run_coroutine_threadsafe(self.serve(host, port), self._loop).result()
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    def stop(self) -> None:
+        """진행 중인 작업을 취소하고 서버/루프/작업 스레드를 멈춘다"""
+        for job in self.jobs.values():
+            job.cancel.set()
+        if self._loop is not None:
+            if self._server is not None:
+                self._loop.call_soon_threadsafe(self._server.close)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+            self._loop = self._server = self._thread = None
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+# ----------------- HTTP 보조 ----------------- #
+async def _read_request(reader: asyncio.StreamReader) -> dict | None:
+    line = await reader.readline()
+    if not line.strip():
+        return None
+    try:
+        method, target, _ = line.decode("latin-1").split(" ", 2)
+    except ValueError:
+        raise ServiceError(400, "잘못된 요청 줄") from None
+    headers: dict[str, str] = {}
+    for _ in range(100):
+        h = await reader.readline()
+        if h in (b"\r\n", b"\n", b""):
+            break
+        k, _, v = h.decode("latin-1").partition(":")
+        headers[k.strip().lower()] = v.strip()
+    else:
+        raise ServiceError(431, "머리글이 너무 많습니다")
+    if "chunked" in headers.get("transfer-encoding", "").lower():
+        raise ServiceError(411, "Content-Length가 필요합니다")
+    url = urlsplit(target)
+    return {
+        "method": method.upper(),
+        "parts": [p for p in url.path.split("/") if p],
+        "query": parse_qs(url.query),
+        "headers": headers,
+        "length": int(headers.get("content-length") or 0),
+    }
+
+async def _read_json(reader: asyncio.StreamReader, length: int):
+    if length > _MAX_JSON:
+        raise ServiceError(413, "요청 본문이 너무 큽니다")
+    try:
+        return json.loads(await reader.readexactly(length)) if length else {}
+    except ValueError:
+        raise ServiceError(400, "JSON 본문을 읽을 수 없습니다") from None
+
+def _head(status: int, content_type: str, length: int | None, extra: Iterable[str] = ()) -> bytes:
+    lines = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}", f"Content-Type: {content_type}", "Connection: close"]
+    if length is not None:
+        lines.append(f"Content-Length: {length}")
+    return ("\r\n".join([*lines, *extra]) + "\r\n\r\n").encode("latin-1")
+
+async def _send_json(writer, status: int, obj) -> None:
+    body = json.dumps(obj, ensure_ascii=False, default=str).encode("utf-8")
+    writer.write(_head(status, "application/json; charset=utf-8", len(body)) + body)
+    await writer.drain()
+
+async def _send_file(writer, path: str, filename: str) -> None:
+    size = os.path.getsize(path)
+    writer.write(_head(200, "application/octet-stream", size, [f"Content-Disposition: attachment; filename*=UTF-8''{quote(filename)}"]))
+    with open(path, "rb") as f:
+        while block := await asyncio.to_thread(f.read, _BLOCK):
+            writer.write(block)
+            await writer.drain()
+
+def _sse(event: str, data: dict) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n".encode("utf-8")
+
+def parse_sse(lines: Iterable[str]) -> Iterator[tuple[str, dict]]:
+    """text/event-stream 줄 → (이벤트 이름, JSON 데이터). 주석(:)은 건너뛴다."""
+    event, data = "message", []
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if not line:
+            if data:
+                yield event, json.loads("\n".join(data))
+            event, data = "message", []
+        elif line.startswith("event:"):
+            event = line[6:].strip()
+        elif line.startswith("data:"):
+            data.append(line[5:].lstrip())
+
+
+# ----------------- 테스트 클라이언트 ----------------- #
+class Response:
+    def __init__(self, raw: bytes):
+        head, _, self.body = raw.partition(b"\r\n\r\n")
+        status_line, *lines = head.decode("latin-1").split("\r\n")
+        self.status = int(status_line.split(" ")[1])
+        self.headers = {k.strip().lower(): v.strip() for k, _, v in (h.partition(":") for h in lines)}
+
+    def json(self):
+        return json.loads(self.body)
+
+    def events(self) -> list[tuple[str, dict]]:
+        return list(parse_sse(self.body.decode("utf-8").splitlines(keepends=True)))
+
+
+class _BufferWriter:
+    """asyncio.StreamWriter 대신 응답 바이트를 모은다"""
+
+    def __init__(self):
+        self.buffer = bytearray()
+
+    def write(self, data: bytes) -> None:
+        self.buffer += data
+
+    async def drain(self) -> None:
+        await asyncio.sleep(0)
+
+    def close(self) -> None:
+        pass
+
+    async def wait_closed(self) -> None:
+        pass
+
+
+class TestClient:
+    """소켓 없이 같은 프로세스에서 JobService.handle을 부른다(서비스 루프는 백그라운드 스레드).
+
+    이벤트 스트림(/events)은 작업이 끝날 때까지 기다렸다가 한 번에 돌려준다.
+    """
+
+    __test__ = False  # pytest 수집 대상 아님
+
+    def __init__(self, service: JobService, timeout: float = 120.0):
+        self.service = service
+        self.timeout = timeout
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+
+    def __enter__(self) -> TestClient:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        for job in self.service.jobs.values():
+            job.cancel.set()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def request(self, method: str, path: str, body: bytes | dict | list | None = None) -> Response:
+        if body is not None and not isinstance(body, bytes):
+            body = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        body = body or b""
+        raw = f"{method} {path} HTTP/1.1\r\nHost: test\r\nContent-Length: {len(body)}\r\n\r\n".encode("latin-1") + body
+        fut = asyncio.run_coroutine_threadsafe(self._roundtrip(raw), self._loop)
+        return Response(fut.result(self.timeout))
+
+    async def _roundtrip(self, raw: bytes) -> bytes:
+        reader = asyncio.StreamReader()
+        reader.feed_data(raw)
+        reader.feed_eof()
+        writer = _BufferWriter()
+        await self.service.handle(reader, writer)
+        return bytes(writer.buffer)
+
+    def get(self, path: str) -> Response:
+        return self.request("GET", path)
+
+    def post(self, path: str, body=None) -> Response:
+        return self.request("POST", path, body)
+
+    def delete(self, path: str) -> Response:
+        return self.request("DELETE", path)
+
+    def upload(self, filepath: str) -> str:
+        with open(filepath, "rb") as f:
+            r = self.post(f"/uploads?name={quote(os.path.basename(filepath))}", f.read())
+        return r.json()["id"]
+
+
+# ----------------- 원격 클라이언트(GUI) ----------------- #
+class ServiceClient:
+    """표준 라이브러리 http.client로 서비스 API를 부른다"""
+
+    def __init__(self, url: str, timeout: float = 60.0):
+        u = urlsplit(url if "//" in url else f"http://{url}")
+        self.host, self.port = u.hostname or SERVICE_HOST, u.port or SERVICE_PORT
+        self.timeout = timeout
+
+    def _open(self, method: str, path: str, body=None, headers: dict | None = None, timeout: float | None = -1.0):
+        conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout if timeout == -1.0 else timeout)
+        conn.request(method, path, body=body, headers=headers or {})
+        resp = conn.getresponse()
+        if resp.status >= 400:
+            try:
+                message = json.loads(resp.read()).get("error", resp.reason)
+            except ValueError:
+                message = resp.reason
+            finally:
+                conn.close()
+            raise ServiceError(resp.status, message)
+        return conn, resp
+
+    def _json(self, method: str, path: str, obj=None) -> dict:
+        body = None if obj is None else json.dumps(obj, ensure_ascii=False).encode("utf-8")
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        conn, resp = self._open(method, path, body, headers)
+        try:
+            return json.loads(resp.read())
+        finally:
+            conn.close()
+
+    def health(self) -> dict:
+        return self._json("GET", "/health")
+
+    def upload(self, filepath: str) -> str:
+        with open(filepath, "rb") as f:
+            headers = {"Content-Length": str(os.fstat(f.fileno()).st_size), "Content-Type": "application/octet-stream"}
+            conn, resp = self._open("POST", f"/uploads?name={quote(os.path.basename(filepath))}", f, headers)
+        try:
+            return json.loads(resp.read())["id"]
+        finally:
+            conn.close()
+
+    def submit(self, files: list) -> dict:
+        return self._json("POST", "/jobs", {"files": files})
+
+    def status(self, job_id: str) -> dict:
+        return self._json("GET", f"/jobs/{job_id}")
+
+    def cancel(self, job_id: str) -> dict:
+        return self._json("DELETE", f"/jobs/{job_id}")
+
+    def events(self, job_id: str) -> Iterator[tuple[str, dict]]:
+        conn, resp = self._open("GET", f"/jobs/{job_id}/events", timeout=None)
+        try:
+            yield from parse_sse(line.decode("utf-8") for line in resp)
+        finally:
+            conn.close()
+
+    def download(self, job_id: str, path: str, fmt: str = "xlsx") -> None:
+        conn, resp = self._open("GET", f"/jobs/{job_id}/result?format={fmt}")
+        try:
+            with open(path, "wb") as f:
+                shutil.copyfileobj(resp, f, _BLOCK)
+        finally:
+            conn.close()
+
+    def result_frame(self, job_id: str) -> pd.DataFrame:
+        """결과를 Feather(pyarrow 없으면 CSV)로 받아 통합 스키마 DataFrame으로"""
+        fmt = "feather" if HAS_PYARROW else "csv"
+        fd, tmp = tempfile.mkstemp(suffix=_FORMATS[fmt])
+        os.close(fd)
+        try:
+            self.download(job_id, tmp, fmt)
+            if fmt == "feather":
+                df = pd.read_feather(tmp)
+            else:
+                text = [c for c, t in UNIFIED_SCHEMA.items() if not pd.api.types.is_numeric_dtype(t)]
+                df = pd.read_csv(tmp, dtype={c: str for c in text}, encoding="utf-8-sig")
+        finally:
+            os.remove(tmp)
+        return df[UNIFIED_COLUMNS].astype(UNIFIED_SCHEMA)
+
+
+class RemoteProcessor(BookstoreSettlementProcessor):
+    """process_files를 서비스에 맡기는 프로세서(GUI 얇은 클라이언트).
+
+    파일은 내용 그대로 올리고(upload=False면 서비스와 같은 경로를 본다고 보고 경로만 보낸다),
+    진행/파일 결과 이벤트를 로컬 콜백으로 옮긴 뒤 통합 결과를 내려받아 채운다.
+    미리보기/집계/저장은 로컬 프로세서와 같다.
+    """
+
+    def __init__(self, url: str, upload: bool = True, **kwargs):
+        super().__init__(**kwargs)
+        self.client = ServiceClient(url)
+        self.upload = upload
+        self.job_id: str | None = None
+
+    def process_file(self, filepath: str) -> tuple[int, str | None]:
+        _, cnt, err = self.process_files([filepath])[0]
+        return cnt, err
+
+    def process_files(
+        self,
+        filepaths: Iterable[str],
+        workers: int = 1,
+        on_result: Callable[[str, int, str | None], None] | None = None,
+        on_progress: ProgressCallback | None = None,
+        cancel: threading.Event | None = None,
+    ) -> list[tuple[str, int, str | None]]:
+        paths = list(filepaths)
+        cancel = cancel if cancel is not None else self.cancel
+        on_progress = on_progress if on_progress is not None else self.on_progress
+        self.cancelled = False
+        results: list[tuple[str, int, str | None]] = []
+
+        def report(fp: str, cnt: int, err: str | None):
+            results.append((fp, cnt, err))
+            if on_result is not None:
+                on_result(fp, cnt, err)
+
+        try:
+            files = [{"upload": self.client.upload(fp)} if self.upload else os.path.abspath(fp) for fp in paths]
+            job = self.client.submit(files)
+            self.job_id = job["id"]
+            final = self._follow(job["id"], paths, report, on_progress, cancel)
+            if final.get("rows"):
+                self._append(self.client.result_frame(job["id"]))
+        except (OSError, ServiceError, http.client.HTTPException) as e:
+            for fp in self._unreported(paths, results):
+                report(fp, 0, f"정산 서비스 오류: {e}")
+            return results
+
+        if final["state"] == FAILED:
+            for fp in self._unreported(paths, results):
+                report(fp, 0, f"정산 서비스 작업 실패: {final.get('error')}")
+        self.cancelled = final["state"] == CANCELLED
+        self.file_rows += [(fp, cnt) for fp, cnt, err in results if err is None and cnt]
+        return results
+
+    @staticmethod
+    def _unreported(paths: list[str], results: list[tuple[str, int, str | None]]) -> list[str]:
+        # 병렬 처리면 결과가 입력 순서로 오지 않는다
+        done = {fp for fp, _, _ in results}
+        return [fp for fp in paths if fp not in done]
+
+    def _follow(self, job_id: str, paths: list[str], report, on_progress, cancel) -> dict:
+        """이벤트 스트림을 별도 스레드에서 읽고, 여기서는 취소를 살피며 콜백을 부른다"""
+        events: queue.Queue = queue.Queue()
+
+        def reader():
+            try:
+                for item in self.client.events(job_id):
+                    events.put(item)
+            except Exception as e:
+                events.put(("error", {"error": str(e)}))
+            events.put(None)
+
+        threading.Thread(target=reader, daemon=True).start()
+        final: dict = {"state": FAILED, "error": "이벤트 스트림이 끊겼습니다"}
+        cancel_sent = False
+        while True:
+            if cancel is not None and cancel.is_set() and not cancel_sent:
+                cancel_sent = True
+                self.client.cancel(job_id)
+            try:
+                item = events.get(timeout=PROGRESS_INTERVAL)
+            except queue.Empty:
+                continue
+            if item is None:
+                return final
+            event, data = item
+            if event == "progress" and on_progress is not None:
+                on_progress(paths[data["index"]], data["rows"], data["total"])
+            elif event == "file":
+                fp = paths[data["index"]]
+                if data.get("cached"):
+                    self.cache_hits.add(fp)
+                report(fp, data["rows"], data["error"])
+            elif event == "done":
+                final = data
+            elif event == "error":
+                final = {"state": FAILED, "error": data["error"]}
+
+
+# ----------------- 명령줄 ----------------- #
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(prog="pub-settlement-service", description="로컬 정산 병합 작업 서비스(HTTP)")
+    ap.add_argument("--host", default=SERVICE_HOST, help=f"바인딩 주소(기본 {SERVICE_HOST})")
+    ap.add_argument("--port", type=int, default=SERVICE_PORT, help=f"포트(기본 {SERVICE_PORT})")
+    ap.add_argument("--jobs", type=int, default=MAX_JOBS, help=f"동시에 처리할 작업 수(기본 {MAX_JOBS})")
+    ap.add_argument("--queue", type=int, default=MAX_QUEUE, help=f"대기 작업 상한(기본 {MAX_QUEUE})")
+    ap.add_argument("-j", "--workers", type=int, default=1, help="작업 하나의 파일 병렬 처리 프로세스 수")
+    ap.add_argument("--dir", default=SERVICE_DIR, help=f"업로드/결과 보관 폴더(기본 {SERVICE_DIR})")
+    args = ap.parse_args(argv)
+
+    service = JobService(args.dir, max_jobs=args.jobs, max_queue=args.queue, workers=args.workers)
+
+    async def run():
+        server = await service.serve(args.host, args.port)
+        print(f"정산 서비스: http://{args.host}:{args.port} (작업 {args.jobs}개 동시 처리)", file=sys.stderr)
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
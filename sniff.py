@@ -0,0 +1,180 @@
+"""정산서 내용(시트 앞부분 머리글)으로 서점 감지
+
+파일명이 아니라 각 시트의 앞 몇 행만 읽어 등록된 컬럼 시그니처와 비교한다.
+pandas 없이 openpyxl(read-only)/xlrd(on_demand)로 직접 읽으며, 결과는
+(경로, 크기, 수정 시각) 단위로 캐시해 목록 표시와 실제 처리에서 다시 열지 않는다.
+"""
+from __future__ import annotations
+import os
+from collections import OrderedDict
+
+# 시그니처를 찾을 머리글 행 범위(0~3행)
+SIGNATURE_ROWS = 4
+
+# 서점 → (대표 컬럼명, 최소 일치 수). 컬럼명은 개행/공백을 뺀 형태로 비교한다.
+SIGNATURES: dict[str, tuple[frozenset[str], int]] = {}
+
+def _norm(v) -> str:
+    return str(v).replace("\n", "").replace(" ", "")
+
+def register_signature(store: str, columns, min_matches: int = 2) -> None:
+    SIGNATURES[store] = (frozenset(_norm(c) for c in columns), min_matches)
+
+register_signature("yes24", ("상품명", "입고번호", "ISBN13", "입고수량", "조정입고금액", "원가"), 3)
+register_signature("kyobo", ("상품코드", "합계금액", "공급율", "공급률", "상품명", "수량"), 3)
+
+def match_signature(rows) -> str | None:
+    """머리글 후보 행들 중 시그니처와 가장 많이 겹치는 서점(최소 일치 수 미달 시 None)"""
+    best, best_score = None, 0
+    for row in rows:
+        names = {_norm(v) for v in row if v is not None and v == v}
+        for store, (cols, need) in SIGNATURES.items():
+            score = len(names & cols)
+            if score >= need and score > best_score:
+                best, best_score = store, score
+    return best
+
+
+class Workbook:
+    """한 번만 여는 통합 문서(openpyxl read-only 또는 xlrd on_demand).
+
+    파일은 .book에 처음 접근할 때 연다. pandas.ExcelFile(wb.book, engine=wb.engine)로
+    그대로 넘길 수 있어 서점 감지와 본 처리가 같은 파일 핸들을 쓴다.
+    """
+
+    def __init__(self, filepath: str):
+        self.filepath = filepath
+        ext = os.path.splitext(filepath)[1].lower()
+        if ext == ".xlsx":
+            self.engine = "openpyxl"
+        elif ext == ".xls":
+            self.engine = "xlrd"
+        else:
+            raise ValueError(f"지원하지 않는 파일 형식: {ext}")
+        self._book = None
+        self._heads: dict[tuple[int, int], list[tuple]] = {}  # (시트 번호, 행 수) → 앞부분 행(감지/시트 선별 공용)
+
+    @property
+    def book(self):
+        if self._book is None:
+            if self.engine == "openpyxl":
+                from openpyxl import load_workbook
+                # pandas의 openpyxl 리더와 같은 옵션
+                self._book = load_workbook(self.filepath, read_only=True, data_only=True, keep_links=False)
+            else:
+                import xlrd
+                self._book = xlrd.open_workbook(self.filepath, on_demand=True)
+        return self._book
+
+    @property
+    def is_open(self) -> bool:
+        return self._book is not None
+
+    @property
+    def sheet_names(self) -> list[str]:
+        if self.engine == "openpyxl":
+            return list(self.book.sheetnames)
+        return list(self.book.sheet_names())
+
+    def head(self, index: int = 0, n: int = SIGNATURE_ROWS) -> list[tuple]:
+        """index번째 시트의 앞 n행 값(한 번 읽은 값은 다시 읽지 않는다)"""
+        key = (index, n)
+        if key not in self._heads:
+            if self.engine == "openpyxl":
+                ws = self.book.worksheets[index]
+                self._heads[key] = list(ws.iter_rows(values_only=True, max_row=n))
+            else:
+                sh = self.book.sheet_by_index(index)
+                self._heads[key] = [tuple(sh.row_values(r)) for r in range(min(n, sh.nrows))]
+        return self._heads[key]
+
+    def unload(self, index: int) -> None:
+        """쓰지 않을 시트를 메모리에서 내린다(xlrd on_demand만 해당)"""
+        if self._book is not None and self.engine == "xlrd":
+            try:
+                self._book.unload_sheet(index)
+            except Exception:
+                pass
+
+    def close(self) -> None:
+        if self._book is None:
+            return
+        try:
+            if self.engine == "openpyxl":
+                self._book.close()
+            else:
+                self._book.release_resources()
+        except Exception:
+            pass
+        self._book = None
+        self._heads.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_workbook(filepath: str) -> Workbook | None:
+    """지원 형식이면 Workbook(아직 열지 않음), 아니면 None"""
+    try:
+        return Workbook(filepath)
+    except ValueError:
+        return None
+
+
+# (절대경로, 크기, 수정 시각) → 감지된 서점(None 포함)
+_CACHE: OrderedDict[tuple, str | None] = OrderedDict()
+_CACHE_MAX = 4096
+
+def _key(filepath: str) -> tuple | None:
+    try:
+        st = os.stat(filepath)
+    except OSError:
+        return None
+    return os.path.abspath(filepath), st.st_size, st.st_mtime_ns
+
+def settlement_sheets(wb: Workbook, store: str | None = None) -> list[tuple[int, str, str]]:
+    """정산 데이터가 있는 시트의 (번호, 이름, 서점). store를 주면 그 서점 시트만.
+
+    시트마다 앞 SIGNATURE_ROWS행만 보고 고르므로, 빈 시트나 요약 시트는 본문을 읽지 않고 건너뛴다.
+    """
+    out = []
+    for i, name in enumerate(wb.sheet_names):
+        found = match_signature(wb.head(i))
+        if found and (store is None or found == store):
+            out.append((i, name, found))
+        else:
+            wb.unload(i)
+    return out
+
+def sniff_store(filepath: str, wb: Workbook | None = None) -> str | None:
+    """시트별 앞 SIGNATURE_ROWS행으로 서점 감지. wb를 주면 그 핸들을 쓰고 닫지 않는다."""
+    key = _key(filepath)
+    if key is not None and key in _CACHE:
+        _CACHE.move_to_end(key)
+        return _CACHE[key]
+
+    own = wb is None
+    if own:
+        wb = open_workbook(filepath)
+    if wb is None:
+        return None
+    try:
+        store = None
+        for i in range(len(wb.sheet_names)):
+            store = match_signature(wb.head(i))
+            if store:
+                break
+    except Exception:
+        store = None
+    finally:
+        if own:
+            wb.close()
+
+    if key is not None:
+        _CACHE[key] = store
+        if len(_CACHE) > _CACHE_MAX:
+            _CACHE.popitem(last=False)
+    return store
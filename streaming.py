@@ -0,0 +1,44 @@
+"""대용량 .xlsx 스트리밍 읽기(openpyxl read-only 행 반복 → 고정 크기 DataFrame 묶음)"""
+from __future__ import annotations
+from collections.abc import Iterable, Iterator
+from itertools import islice
+import os
+import pandas as pd
+
+# 한 번에 정규화할 행 수(PUB_SETTLEMENT_CHUNK_ROWS로 조정)
+CHUNK_ROWS = int(os.environ.get("PUB_SETTLEMENT_CHUNK_ROWS", "50000"))
+# 취소/진행 표시가 필요한 처리(GUI)의 묶음 크기(PUB_SETTLEMENT_INTERACTIVE_CHUNK_ROWS)
+INTERACTIVE_CHUNK_ROWS = int(os.environ.get("PUB_SETTLEMENT_INTERACTIVE_CHUNK_ROWS", "10000"))
+
+def iter_xlsx_rows(filepath: str, book=None, sheet: int = 0) -> Iterator[tuple]:
+    """sheet번째(기본 첫 번째) 시트의 행 값을 위에서부터 하나씩 돌려준다(시트 전체를 올리지 않음).
+
+    이미 연 read-only 통합 문서(book)를 주면 그것을 쓰고 닫지 않는다.
+    """
+    if book is not None:
+        yield from book.worksheets[sheet].iter_rows(values_only=True)
+        return
+
+    from openpyxl import load_workbook
+
+    wb = load_workbook(filepath, read_only=True, data_only=True)
+    try:
+        yield from wb.worksheets[sheet].iter_rows(values_only=True)
+    finally:
+        wb.close()
+
+def header_names(row: Iterable) -> list[str]:
+    """머리글 행 값 → 컬럼명(빈 칸은 pandas와 같이 'Unnamed: n')"""
+    return [f"Unnamed: {i}" if v is None else str(v) for i, v in enumerate(row)]
+
+def iter_frames(rows: Iterable[tuple], columns: list[str], chunk_rows: int = CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """행 반복자를 chunk_rows 크기의 object DataFrame으로 끊어 돌려준다(빈 칸은 NaN)"""
+    rows = iter(rows)
+    width = len(columns)
+    pad = (None,) * width
+    while True:
+        block = [(tuple(r) + pad)[:width] for r in islice(rows, chunk_rows)]
+        if not block:
+            return
+        frame = pd.DataFrame(block, columns=columns, dtype=object)
+        yield frame.mask(frame.isna())
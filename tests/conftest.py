@@ -0,0 +1,41 @@
+"""테스트용 작은 정산서(.xlsx) 생성"""
+from __future__ import annotations
+import pytest
+from openpyxl import Workbook
+
+YES24_COLUMNS = ["입고번호", "상품명", "ISBN13", "입고수량", "원가", "조정입고금액", "정가", "입고율"]
+KYOBO_COLUMNS = ["상품명", "상품코드", "수량", "합계금액", "정가", "공급율"]
+
+
+def write_workbook(path, columns: list[str], rows: list[list], title_rows: int = 0) -> str:
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Sheet1")
+    for i in range(title_rows):  # 교보처럼 머리글 위에 제목 줄이 있는 파일
+        ws.append([f"정산서 {i + 1}"])
+    ws.append(columns)
+    for r in rows:
+        ws.append(r)
+    wb.save(path)
+    return str(path)
+
+def yes24_rows(n: int, seed: int = 0) -> list[list]:
+    return [
+        [f"R{seed}-{i}", f"도서 {i}", f"979119878{(seed * 31 + i) % 10000:04d}", i % 7 + 1, 9000, 9000 * (i % 7 + 1), 15000, 60]
+        for i in range(n)
+    ]
+
+def kyobo_rows(n: int, seed: int = 0) -> list[list]:
+    return [[f"책 {i}", f"978893746{(seed * 17 + i) % 10000:04d}", i % 5 + 1, 10000 * (i % 5 + 1), 16000, 65] for i in range(n)]
+
+
+@pytest.fixture
+def yes24_xlsx(tmp_path):
+    return write_workbook(tmp_path / "예스24_정산.xlsx", YES24_COLUMNS, yes24_rows(40))
+
+@pytest.fixture
+def kyobo_xlsx(tmp_path):
+    return write_workbook(tmp_path / "교보_정산.xlsx", KYOBO_COLUMNS, kyobo_rows(30), title_rows=2)
+
+@pytest.fixture
+def yes24_small_xlsx(tmp_path):
+    return write_workbook(tmp_path / "예스24_추가.xlsx", YES24_COLUMNS, yes24_rows(5, seed=1))
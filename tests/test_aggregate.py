@@ -0,0 +1,114 @@
+"""ISBN×서점 집계: 묶음 누적(from_chunks/update)이 한 번에 집계한 것과 같은지, pivot, 서점 간 불일치"""
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+import pytest
+
+from aggregate import SettlementAggregate
+from cache import ParseCache
+from pub_settlement import UNIFIED_COLUMNS, UNIFIED_SCHEMA, BookstoreSettlementProcessor
+
+A, B, C = "9791198788900", "9788937460449", "9780306406157"
+
+
+def _frame(rows: list[tuple]) -> pd.DataFrame:
+    """(도서명, ISBN, 서점명, 입고수량, 단가, 정산액, 정가) 행 → 통합 스키마"""
+    df = pd.DataFrame(rows, columns=["도서명", "ISBN", "서점명", "입고수량", "단가", "정산액", "정가"])
+    df = df.assign(저자명="", ISBN상태="정상", 입고율=0, 시트명="")
+    return df[UNIFIED_COLUMNS].astype(UNIFIED_SCHEMA)
+
+def _sample() -> pd.DataFrame:
+    return _frame([
+        ("책 A", A, "예스24", 3, 600.0, 1500.0, 1000),
+        ("책 A", A, "교보문고", 2, 600.0, 1300.0, 1000),
+        ("책 B", B, "예스24", 1, 100.0, 100.0, 0),
+        ("책 B", B, "예스24", 1, 90.0, 90.0, 0),           # 한 서점 안의 단가 차이
+        ("책 C", "0306406152", "교보문고", 4, 50.0, 200.0, 0),  # ISBN-10 → C
+        ("", C, "예스24", 1, 55.0, 55.0, 0),                # 서점 간 단가 차이
+        ("ISBN 없음", "", "예스24", 9, 1.0, 9.0, 0),
+    ])
+
+def _random_frame(n: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    pool = np.array([A, B, C, "0306406152", "978-0-306-40615-7", "9788954682152", "9791161571188", "", "무효"], dtype=object)
+    return _frame(list(zip(
+        [f"책 {i % 13}" if i % 11 else "" for i in range(n)],
+        rng.choice(pool, n),
+        rng.choice(["예스24", "교보문고", "알라딘"], n),
+        rng.integers(-2, 20, n),
+        np.round(rng.uniform(0, 20000, n), 2) * (rng.random(n) > 0.1),
+        np.round(rng.uniform(-5000, 200000, n), 2),
+        rng.choice([0, 12000, 15000, 18000], n),
+    )))
+
+def _chunks(df: pd.DataFrame, sizes: list[int]) -> list[pd.DataFrame]:
+    bounds = np.cumsum([0, *sizes])
+    return [df.iloc[a:b] for a, b in zip(bounds[:-1], bounds[1:])] + [df.iloc[bounds[-1]:]]
+
+def _assert_same(got: SettlementAggregate, want: SettlementAggregate) -> None:
+    assert got.missing_isbn == want.missing_isbn
+    pd.testing.assert_frame_equal(got.state.sort_index(), want.state.sort_index(), check_exact=False)
+    pd.testing.assert_frame_equal(got.by_title_store(), want.by_title_store(), check_exact=False)
+    for value in ("입고수량", "정산액", "실효입고율"):
+        pd.testing.assert_frame_equal(got.pivot(value), want.pivot(value), check_exact=False)
+    for cross in (True, False):
+        pd.testing.assert_frame_equal(got.discrepancies(cross_store_only=cross), want.discrepancies(cross_store_only=cross))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_from_chunks_matches_from_frame(seed):
+    df = _random_frame(3000, seed)
+    sizes = list(np.random.default_rng(seed).integers(0, 700, 6))  # 빈 묶음 포함
+    _assert_same(SettlementAggregate.from_chunks(_chunks(df, sizes)), SettlementAggregate.from_frame(df))
+
+def test_merge_matches_from_frame():
+    df = _random_frame(2000, 42)
+    left = SettlementAggregate.from_frame(df.iloc[:700])
+    _assert_same(left.merge(SettlementAggregate.from_frame(df.iloc[700:])), SettlementAggregate.from_frame(df))
+
+def test_processor_aggregate_adds_only_new_rows():
+    df = _random_frame(2400, 7)
+    proc = BookstoreSettlementProcessor(cache=ParseCache(max_mb=0))
+    for part in _chunks(df, [500, 900]):
+        proc._append(part)
+        agg = proc.aggregate()  # 지난 호출 뒤 새 묶음만 더한다
+    _assert_same(agg, SettlementAggregate.from_frame(proc.get_unified_dataframe()))
+
+
+def test_pivot_by_store():
+    agg = SettlementAggregate.from_frame(_sample())
+    assert agg.missing_isbn == 1
+    qty = agg.pivot()
+    assert qty.columns.tolist() == ["ISBN", "도서명", "예스24", "교보문고", "합계"]
+    assert qty.values.tolist() == [
+        [C, "책 C", 1, 4, 5],
+        [B, "책 B", 2, 0, 2],
+        [A, "책 A", 3, 2, 5],
+    ]
+    rate = agg.pivot("실효입고율").set_index("ISBN")
+    assert rate.loc[A, ["예스24", "교보문고"]].tolist() == [50.0, 65.0]
+    assert rate.loc[B].isna()[["예스24", "교보문고"]].all()  # 정가 없음
+    with pytest.raises(ValueError):
+        agg.pivot("정가")
+
+def test_discrepancies_are_cross_store_by_default():
+    agg = SettlementAggregate.from_frame(_sample())
+    cross = agg.discrepancies()
+    assert cross[["ISBN", "서점", "서점수", "단가최소", "단가최대"]].values.tolist() == [[C, "예스24, 교보문고", 2, 50.0, 55.0]]
+    assert cross["단가불일치"].tolist() == [True] and cross["정가불일치"].tolist() == [False]
+    # 한 서점 안의 단가 차이(B: 100 / 90)는 cross_store_only=False일 때만
+    assert agg.discrepancies(cross_store_only=False)["ISBN"].tolist() == [C, B]
+    report = agg.report().set_index(["ISBN", "서점명"])
+    assert report["단가불일치"].to_dict() == {
+        (C, "예스24"): True, (C, "교보문고"): True, (B, "예스24"): False, (A, "예스24"): False, (A, "교보문고"): False,
+    }
+
+def test_discrepancy_tolerance_and_list_price():
+    df = _frame([
+        ("책", A, "예스24", 1, 100.0, 100.0, 15000),
+        ("책", A, "교보문고", 1, 100.005, 100.005, 16000),
+    ])
+    agg = SettlementAggregate.from_frame(df)
+    out = agg.discrepancies()
+    assert out["단가불일치"].tolist() == [False] and out["정가불일치"].tolist() == [True]
+    assert agg.discrepancies(tolerance=0.001)["단가불일치"].tolist() == [True]
@@ -0,0 +1,96 @@
+"""내보내기: XLSX 왕복(문자 이스케이프, NaN/inf, 섞인 열, 시트 한도)과 형식별 저장"""
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+import pytest
+from openpyxl import load_workbook
+
+import export
+from export import export as export_chunks, write_xlsx
+
+
+def _read(path) -> list[list]:
+    wb = load_workbook(path, read_only=True)
+    try:
+        return [list(r) for r in wb.active.iter_rows(values_only=True)]
+    finally:
+        wb.close()
+
+
+def test_text_is_escaped_and_never_a_formula(tmp_path):
+    texts = ["a & b", "<tag>", 'say "hi"', "it's", "탭\t줄\n바꿈", "제어\x00\x07문자", "=SUM(A1:A2)", "  공백  ", ""]
+    path = tmp_path / "t.xlsx"
+    write_xlsx([pd.DataFrame({"값 <&>": pd.Series(texts, dtype="string")})], path)
+    rows = _read(path)
+    assert rows[0] == ["값 <&>"]
+    assert [r[0] for r in rows[1:]] == [
+        "a & b", "<tag>", 'say "hi"', "it's", "탭\t줄\n바꿈", "제어문자", "=SUM(A1:A2)", "  공백  ", None,
+    ]
+    ws = load_workbook(path).active
+    assert ws["A8"].data_type == "s"  # 수식이 아니라 문자열
+
+def test_missing_and_non_finite_numbers_are_empty(tmp_path):
+    df = pd.DataFrame({
+        "f": [1.5, np.nan, np.inf, -np.inf, 0.0],
+        "i": pd.array([1, None, 3, 4, 2 ** 40], dtype="Int64"),
+        "b": [True, False, True, False, True],
+        "s": pd.Series(["x", None, "z", pd.NA, "w"], dtype="string"),
+    })
+    path = tmp_path / "n.xlsx"
+    write_xlsx([df], path)
+    assert _read(path)[1:] == [
+        [1.5, 1, True, "x"],
+        [None, None, False, None],
+        [None, 3, True, "z"],
+        [None, 4, False, None],
+        [0, 2 ** 40, True, "w"],
+    ]
+
+def test_mixed_object_column_keeps_numbers_numeric(tmp_path):
+    s = pd.Series([1, "2", 3.5, None, np.nan, float("inf"), np.int64(7), True, "=1+1", pd.Timestamp("2025-01-02"), 2 ** 70], dtype=object)
+    path = tmp_path / "m.xlsx"
+    write_xlsx([pd.DataFrame({"m": s})], path)
+    values = [r[0] for r in _read(path)[1:]]
+    assert values[:-1] == [1, "2", 3.5, None, None, None, 7, True, "=1+1", "2025-01-02 00:00:00"]
+    assert values[-1] == pytest.approx(2 ** 70)  # int64 밖의 정수도 숫자 셀(엑셀 숫자는 double)
+
+def test_chunks_header_dimension_and_style(tmp_path):
+    chunks = [pd.DataFrame({"a": range(i, i + 3), "b": list("xyz")}) for i in (0, 3, 6)]
+    path = tmp_path / "c.xlsx"
+    write_xlsx(chunks + [chunks[0].iloc[0:0]], path)
+    wb = load_workbook(path, read_only=True)
+    assert wb.active.calculate_dimension() == "A1:B10"  # <dimension>이 있어 시트를 훑지 않는다
+    wb.close()
+    assert _read(path) == [["a", "b"]] + [[i, "xyz"[i % 3]] for i in range(9)]
+    head = load_workbook(path).active["A1"]
+    assert head.font.b and head.alignment.horizontal == "center" and head.border.left.style == "thin"
+
+def test_without_header_and_empty(tmp_path):
+    path = tmp_path / "h.xlsx"
+    write_xlsx([pd.DataFrame({"a": [1, 2]})], path, header=False)
+    assert _read(path) == [[1], [2]]
+    write_xlsx([], path)
+    assert _read(path) == []
+
+def test_sheet_size_limit_writes_nothing(tmp_path, monkeypatch):
+    monkeypatch.setattr(export, "XLSX_MAX_ROWS", 10)
+    path = tmp_path / "big.xlsx"
+    with pytest.raises(ValueError, match="시트가 너무 큽니다"):
+        write_xlsx([pd.DataFrame({"a": range(6)}), pd.DataFrame({"a": range(4)})], path)  # 머리글 포함 11행
+    assert not path.exists()
+    write_xlsx([pd.DataFrame({"a": range(9)})], path)  # 정확히 10행은 된다
+    assert len(_read(path)) == 10
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".xlsx", ".parquet", ".feather"])
+def test_export_round_trip(tmp_path, suffix):
+    df = pd.DataFrame({"도서명": ["가", "나 & 다", "라"], "입고수량": [1, 2, 3], "정산액": [10.5, 0.0, 7.25]})
+    path = tmp_path / f"out{suffix}"
+    export_chunks([df.iloc[:2], df.iloc[2:]], str(path))
+    read = {".csv": lambda p: pd.read_csv(p, encoding="utf-8-sig"), ".xlsx": pd.read_excel,
+            ".parquet": pd.read_parquet, ".feather": pd.read_feather}[suffix]
+    pd.testing.assert_frame_equal(read(path), df, check_dtype=False)
+
+def test_unknown_format():
+    with pytest.raises(ValueError):
+        export_chunks([pd.DataFrame()], "out.txt", "txt")
@@ -0,0 +1,72 @@
+"""ISBN 정규화: 검사 숫자, ISBN-10→13 변환, ".0"/하이픈 정리, Arrow 없는 문자열 dtype"""
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+import pytest
+
+import isbn
+from isbn import STATUS_CONVERTED, STATUS_INVALID, STATUS_MISSING, STATUS_OK, normalize_isbn
+
+CASES = [
+    ("9791198788900", "9791198788900", STATUS_OK),
+    ("979-11-987889-0-0", "9791198788900", STATUS_OK),
+    (" 9791198788900.0 ", "9791198788900", STATUS_OK),  # 숫자로 읽혀 붙은 .0
+    (9791198788900.0, "9791198788900", STATUS_OK),
+    (9788937460449, "9788937460449", STATUS_OK),
+    ("9791198788901", "9791198788901", STATUS_INVALID),  # 검사 숫자 오류
+    ("9771198788902", "9771198788902", STATUS_INVALID),  # 978/979가 아닌 접두어
+    ("0306406152", "9780306406157", STATUS_CONVERTED),
+    ("0-306-40615-2", "9780306406157", STATUS_CONVERTED),
+    ("306406152", "9780306406157", STATUS_CONVERTED),  # 앞자리 0이 빠진 ISBN-10
+    ("080442957X", "9780804429573", STATUS_CONVERTED),
+    ("080442957x", "9780804429573", STATUS_CONVERTED),
+    ("0306406153", "0306406153", STATUS_INVALID),
+    ("03064X6152", "03064X6152", STATUS_INVALID),  # X는 마지막 자리만
+    ("12345", "12345", STATUS_INVALID),
+    ("abc", "abc", STATUS_INVALID),
+    ("", "", STATUS_MISSING),
+    ("nan", "", STATUS_MISSING),
+    ("0", "", STATUS_MISSING),
+    (None, "", STATUS_MISSING),
+    (np.nan, "", STATUS_MISSING),
+]
+
+
+def _normalize(values: list) -> tuple[list, list]:
+    keys, status = normalize_isbn(pd.Series(values, dtype=object, name="ISBN"))
+    return keys.tolist(), status.astype(str).tolist()
+
+def test_normalize_isbn_cases():
+    keys, status = _normalize([v for v, _, _ in CASES])
+    assert list(zip(keys, status)) == [(k, s) for _, k, s in CASES]
+
+def test_repeated_values_and_index_are_kept():
+    s = pd.Series(["0306406152", None, "0306406152", "9791198788900"], index=[10, 11, 12, 13])
+    keys, status = normalize_isbn(s)
+    assert keys.index.tolist() == [10, 11, 12, 13]
+    assert keys.tolist() == ["9780306406157", "", "9780306406157", "9791198788900"]
+    assert status.dtype == isbn.ISBN_STATUS_DTYPE
+
+def test_check_digits_match_reference():
+    rng = np.random.default_rng(3)
+    d12 = np.hstack([np.tile([9, 7, 9], (500, 1)), rng.integers(0, 10, (500, 9))])
+    ref = [(10 - sum(d * (1 if i % 2 == 0 else 3) for i, d in enumerate(row)) % 10) % 10 for row in d12.tolist()]
+    full = np.hstack([d12, np.array(ref)[:, None]])
+    assert isbn.isbn13_valid(full).all()
+    full[:, 12] = (full[:, 12] + 1) % 10
+    assert not isbn.isbn13_valid(full).any()
+
+@pytest.mark.parametrize("str_dtype", ["string", "string[pyarrow]"])
+def test_non_ascii_digits_are_invalid_not_errors(monkeypatch, str_dtype):
+    # pyarrow가 없으면 STR_DTYPE이 "string"(파이썬 re: \d가 유니코드 숫자와도 맞는다)
+    if str_dtype == "string[pyarrow]" and not isbn.HAS_PYARROW:
+        pytest.skip("pyarrow 없음")
+    monkeypatch.setattr(isbn, "STR_DTYPE", str_dtype)
+    keys, status = _normalize(["３０６４０６１５２", "٩٧٩١١٩٨٧٨٨٩٠٠", "0306406152", "9791198788900"])
+    assert status == [STATUS_INVALID, STATUS_INVALID, STATUS_CONVERTED, STATUS_OK]
+    assert keys[2:] == ["9780306406157", "9791198788900"]
+
+def test_cases_without_arrow_strings(monkeypatch):
+    monkeypatch.setattr(isbn, "STR_DTYPE", "string")
+    keys, status = _normalize([v for v, _, _ in CASES])
+    assert list(zip(keys, status)) == [(k, s) for _, k, s in CASES]
@@ -0,0 +1,101 @@
+"""정산 원장: 같은 파일 재적재는 행을 늘리지 않고, 기간/ISBN/서점 조회가 맞는지"""
+from __future__ import annotations
+import os
+import shutil
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from cache import ParseCache
+from ledger import Ledger, guess_period
+from pub_settlement import UNIFIED_COLUMNS, UNIFIED_SCHEMA, BookstoreSettlementProcessor
+
+A, B = "9791198788900", "9788937460449"
+
+
+def _frame(rows: list[tuple]) -> pd.DataFrame:
+    """(ISBN, 서점명, 입고수량, 정산액) 행 → 통합 스키마"""
+    df = pd.DataFrame(rows, columns=["ISBN", "서점명", "입고수량", "정산액"])
+    df = df.assign(도서명="책", 저자명="", ISBN상태="정상", 단가=0.0, 정가=0, 입고율=0, 시트명="Sheet1")
+    return df[UNIFIED_COLUMNS].astype(UNIFIED_SCHEMA)
+
+def _processed(*paths: str) -> BookstoreSettlementProcessor:
+    proc = BookstoreSettlementProcessor(cache=ParseCache(max_mb=0))
+    proc.process_files(paths)
+    return proc
+
+def _count(led: Ledger) -> int:
+    return led.conn.execute("SELECT COUNT(*) FROM settlements").fetchone()[0]
+
+
+def test_reimporting_the_same_file_adds_no_rows(tmp_path, yes24_xlsx, kyobo_xlsx):
+    with Ledger(str(tmp_path / "ledger.db")) as led:
+        first = led.ingest(_processed(yes24_xlsx, kyobo_xlsx), period="2025-10")
+        assert first == {yes24_xlsx: 40, kyobo_xlsx: 30}
+        assert _count(led) == 70
+
+        assert led.ingest(_processed(yes24_xlsx, kyobo_xlsx), period="2025-10") == {yes24_xlsx: 0, kyobo_xlsx: 0}
+        # 경로가 달라도 내용이 같으면 같은 파일
+        copy = str(tmp_path / "예스24_사본.xlsx")
+        shutil.copyfile(yes24_xlsx, copy)
+        assert led.ingest(_processed(copy)) == {copy: 0}
+        # 파일 확인을 건너뛰고 직접 넣어도 (파일 해시, 행 번호)가 같으면 무시된다
+        digest = led.conn.execute("SELECT file_hash FROM files WHERE rows = 40").fetchone()[0]
+        assert led.add_frame(_processed(yes24_xlsx).get_unified_dataframe(), digest, yes24_xlsx, "2025-10") == 0
+        assert _count(led) == 70
+
+    with Ledger(str(tmp_path / "ledger.db")) as led:  # 다시 열어도 그대로
+        assert _count(led) == 70
+        assert led.totals(by="store").set_index("서점명")["건수"].to_dict() == {"교보문고": 30, "예스24": 40}
+
+def test_period_queries(tmp_path):
+    with Ledger(str(tmp_path / "ledger.db")) as led:
+        led.add_frame(_frame([(A, "예스24", 2, 100.0), (B, "교보문고", 1, 50.0)]), "h1", "a.xlsx", "2024-12")
+        led.add_frame(_frame([(A, "예스24", 3, 150.0), (A, "교보문고", 4, 200.0)]), "h2", "b.xlsx", "2025-01")
+        led.add_frame(_frame([(B, "예스24", 5, 250.0)]), "h3", "c.xlsx", "2025-03")
+
+        by_period = led.totals(by="period")
+        assert by_period.values.tolist() == [["2024-12", 3, 150.0, 2], ["2025-01", 7, 350.0, 2], ["2025-03", 5, 250.0, 1]]
+        assert led.totals("2025-01", "2025-02").values.tolist() == [["교보문고", 4, 200.0, 1], ["예스24", 3, 150.0, 1]]
+        assert led.year_to_date(2025).values.tolist() == [["교보문고", 4, 200.0, 1], ["예스24", 8, 400.0, 2]]
+        assert led.totals(period_to="2025-01", store="예스24", by="isbn").values.tolist() == [[A, 5, 250.0, 2]]
+
+        rows = led.rows("2025-01", isbn=A).sort_values("입고수량")
+        assert rows[["정산기간", "서점명", "입고수량"]].values.tolist() == [["2025-01", "예스24", 3], ["2025-01", "교보문고", 4]]
+        assert rows.columns.tolist() == ["정산기간", "도서명", "저자명", "ISBN", "ISBN상태", "서점명", "입고수량",
+                                         "단가", "정산액", "정가", "입고율", "시트명"]
+        assert rows[["ISBN상태", "시트명"]].drop_duplicates().values.tolist() == [["정상", "Sheet1"]]
+        with pytest.raises(ValueError):
+            led.totals(by="title")
+
+def test_old_ledger_files_get_the_new_columns(tmp_path):
+    path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE files (file_hash TEXT PRIMARY KEY, path TEXT NOT NULL, period TEXT NOT NULL,
+                            rows INTEGER NOT NULL, imported_at TEXT NOT NULL);
+        CREATE TABLE settlements (file_hash TEXT NOT NULL, row_no INTEGER NOT NULL, period TEXT NOT NULL,
+            title TEXT, author TEXT, isbn TEXT, store TEXT, qty INTEGER, unit_price REAL, amount REAL,
+            list_price INTEGER, rate INTEGER, PRIMARY KEY (file_hash, row_no)) WITHOUT ROWID;
+        INSERT INTO files VALUES ('old', 'old.xlsx', '2024-01', 1, '2024-02-01T00:00:00');
+        INSERT INTO settlements VALUES ('old', 0, '2024-01', '책', '', '9791198788900', '예스24', 1, 1.0, 1.0, 0, 0);
+    """)
+    conn.close()
+    with Ledger(path) as led:
+        led.add_frame(_frame([(B, "교보문고", 2, 20.0)]), "new", "new.xlsx", "2024-02")
+        rows = led.rows().sort_values("정산기간")
+        assert rows[["ISBN", "ISBN상태", "시트명"]].values.tolist() == [[A, None, None], [B, "정상", "Sheet1"]]
+
+@pytest.mark.parametrize("name, period", [
+    ("예스24_2025-10.xlsx", "2025-10"),
+    ("교보_202503_정산.xlsx", "2025-03"),
+    ("정산 2024년 07월.xlsx", "2024-07"),
+    ("2025_12.xls", "2025-12"),
+    ("20251301.xlsx", None),
+])
+def test_guess_period(tmp_path, name, period):
+    path = tmp_path / name
+    path.write_bytes(b"")
+    os.utime(path, (0, pd.Timestamp("2023-05-15").timestamp()))
+    assert guess_period(str(path)) == (period or "2023-05")
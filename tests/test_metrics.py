@@ -0,0 +1,95 @@
+"""실행 보고서: 파일마다 메모리 증가량을 따로 재는지, 실패하는 훅이 처리를 멈추지 않는지"""
+from __future__ import annotations
+from contextlib import contextmanager
+
+import pytest
+
+import metrics
+from cache import ParseCache
+from metrics import RunReport
+from pub_settlement import BookstoreSettlementProcessor
+
+
+@pytest.fixture
+def hooks(monkeypatch):
+    monkeypatch.setattr(metrics, "HOOKS", [])
+    monkeypatch.setattr(metrics, "_env_hooks", [])
+    return metrics.HOOKS
+
+
+def test_memory_is_measured_per_file_not_against_the_process_peak(monkeypatch):
+    rss = iter([100.0, 500.0, 500.0, 520.0, 520.0, 480.0])  # 첫 파일이 최고점을 찍어도 뒤 파일은 따로
+    monkeypatch.setattr(metrics, "_rss_mb", lambda: next(rss))
+    report = RunReport(jsonl_path=None)
+    for name in ("a.xlsx", "b.xlsx", "c.xlsx"):
+        with report.file(name):
+            pass
+    assert [rec["mem_mb"] for rec in report.files] == [400.0, 20.0, -40.0]
+    assert "메모리 +20.0MB" in report.format_text() and "메모리 -40.0MB" in report.format_text()
+
+def test_current_rss_is_readable():
+    mb = metrics._rss_mb()
+    assert mb is None or mb > 0
+
+def test_tracemalloc_measures_each_stage():
+    metrics.tracemalloc.start()
+    try:
+        report = RunReport(jsonl_path=None)
+        with report.file("a.xlsx"):
+            with report.stage("read"):
+                block = bytearray(8 * 2**20)
+                del block
+            with report.stage("merge"):
+                pass
+    finally:
+        metrics.tracemalloc.stop()
+    stages = report.files[0]["stages"]
+    assert stages["read"]["mem_mb"] >= 8 and stages["merge"]["mem_mb"] < 1
+    assert report.files[0]["mem_mb"] == stages["read"]["mem_mb"]
+
+
+def test_failing_hooks_are_logged_and_skipped(hooks, capsys, yes24_xlsx, kyobo_xlsx):
+    entered = []
+
+    def broken_call(path):
+        raise RuntimeError("call")
+
+    @contextmanager
+    def broken_enter(path):
+        raise RuntimeError("enter")
+        yield
+
+    @contextmanager
+    def broken_exit(path):
+        yield
+        raise RuntimeError("exit")
+
+    @contextmanager
+    def working(path):
+        entered.append(path)
+        yield
+
+    hooks += [broken_call, broken_enter, broken_exit, working]
+    proc = BookstoreSettlementProcessor(cache=ParseCache(max_mb=0), report=RunReport(jsonl_path=None))
+    results = proc.process_files([yes24_xlsx, kyobo_xlsx])
+    assert [(cnt, err) for _, cnt, err in results] == [(40, None), (30, None)]
+    assert entered == [yes24_xlsx, kyobo_xlsx]
+    assert len(proc.report.files) == 2
+    err = capsys.readouterr().err
+    for name in ("broken_call", "broken_enter", "broken_exit"):
+        assert err.count(f"{name} ") == 2
+
+def test_hook_errors_do_not_replace_processing_errors(hooks, capsys):
+    @contextmanager
+    def broken_exit(path):
+        try:
+            yield
+        finally:
+            raise RuntimeError("exit")
+
+    hooks.append(broken_exit)
+    report = RunReport(jsonl_path=None)
+    with pytest.raises(KeyError):
+        with report.file("a.xlsx"):
+            raise KeyError("parse")
+    assert len(report.files) == 1 and "broken_exit" in capsys.readouterr().err
@@ -0,0 +1,209 @@
+"""열 단위 정규화(_normalize_yes24/_normalize_kyobo)가 예전 행 단위(iterrows) 출력과 같은지
+
+_ref_* 는 벡터화 이전 구현(safe_int/safe_float 포함)을 그대로 얼려 둔 사본이다.
+ISBN은 이후 ISBN-13 정규화로 의도적으로 달라졌으므로 유효한 ISBN-13만 넣어 비교한다.
+"""
+from __future__ import annotations
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from cache import ParseCache
+from pub_settlement import (
+    BookstoreSettlementProcessor, _filter_kyobo, _filter_yes24, _kyobo_key_map, _kyobo_missing, _normalize_kyobo, _normalize_yes24,
+    _unit_price, _yes24_missing,
+)
+
+COMPARED = ["도서명", "저자명", "ISBN", "서점명", "입고수량", "단가", "정산액", "정가", "입고율"]
+ISBNS = ["9791198788900", "9788937460449", "9791161571188", "9788954682152"]
+
+
+# ----------------- 얼려 둔 행 단위 구현 ----------------- #
+_CURRENCY = re.compile(r"[₩$,]")
+_WS = re.compile(r"\s+")
+
+def _ref_number_text(s: str) -> str:
+    s = s.strip()
+    s = s.replace("−", "-")
+    s = _CURRENCY.sub("", s)
+    s = s.replace("%", "")
+    s = _WS.sub("", s)
+    if s.startswith("(") and s.endswith(")"):
+        s = "-" + s[1:-1]
+    s = s.replace(",", "")
+    return s
+
+def _ref_safe_int(v, default: int = 0) -> int:
+    try:
+        if pd.isna(v): return default
+        if isinstance(v, str): v = _ref_number_text(v)
+        return int(float(v))
+    except Exception:
+        return default
+
+def _ref_safe_float(v, default: float = 0.0) -> float:
+    try:
+        if pd.isna(v): return default
+        if isinstance(v, str): v = _ref_number_text(v)
+        return float(v)
+    except Exception:
+        return default
+
+def _ref_yes24(df: pd.DataFrame) -> pd.DataFrame:
+    df = df[df["상품명"].notna()]
+    df = df[df["입고번호"].notna()]
+    rows = []
+    for _, row in df.iterrows():
+        rows.append({
+            "도서명": str(row.get("상품명", "")).strip(),
+            "저자명": "",
+            "ISBN": ("" if pd.isna(row.get("ISBN13")) else str(row.get("ISBN13")).strip()),
+            "서점명": "예스24",
+            "입고수량": _ref_safe_int(row.get("입고수량", 0)),
+            "단가": _ref_safe_float(row.get("원가", 0)),
+            "정산액": _ref_safe_float(row.get("조정입고금액", 0)),
+            "정가": _ref_safe_int(row.get("정가", 0)),
+            "입고율": _ref_safe_int(row.get("입고율", 0)),
+        })
+    return pd.DataFrame(rows, columns=COMPARED)
+
+def _ref_kyobo(df: pd.DataFrame, key_map: dict) -> pd.DataFrame:
+    df = df[pd.to_numeric(df[key_map["수량"]], errors="coerce").notna()]
+    df = df[pd.to_numeric(df[key_map["합계금액"]], errors="coerce").notna()]
+    rows = []
+    for _, row in df.iterrows():
+        q = _ref_safe_int(row.get(key_map["수량"], 0))
+        total_amt = _ref_safe_int(row.get(key_map["합계금액"], 0))
+        unit = round((total_amt / q), 2) if q > 0 else 0.0
+        product_code = ""
+        if key_map.get("상품코드"):
+            product_code = str(row.get(key_map["상품코드"]))
+            product_code = "" if pd.isna(product_code) else product_code.strip()
+        rows.append({
+            "도서명": str(row.get(key_map["상품명"], "")).strip(),
+            "저자명": "",
+            "ISBN": product_code,
+            "서점명": "교보문고",
+            "입고수량": q,
+            "단가": unit,
+            "정산액": total_amt,
+            "정가": _ref_safe_int(row.get(key_map.get("정가", ""), 0)) if key_map.get("정가") else 0,
+            "입고율": _ref_safe_int(row.get(key_map.get("공급율", ""), 0)) if key_map.get("공급율") else 0,
+        })
+    return pd.DataFrame(rows, columns=COMPARED)
+
+
+# ----------------- 비교 ----------------- #
+def _assert_same(new: pd.DataFrame, ref: pd.DataFrame) -> None:
+    new = new[COMPARED].reset_index(drop=True)
+    assert len(new) == len(ref)
+    for c in COMPARED:
+        got = new[c].astype(object).tolist()
+        want = ref[c].astype(object).tolist()
+        if c in ("단가", "정산액"):
+            assert np.array_equal(np.asarray(got, dtype=float), np.asarray(want, dtype=float), equal_nan=True), c
+        elif c in ("입고수량", "정가", "입고율"):
+            assert [int(v) for v in got] == [int(v) for v in want], c
+        else:
+            assert [str(v) for v in got] == [str(v) for v in want], c
+
+MESSY = [
+    "1,234", "₩5,000", "$12.5", "(300)", "(1,234)", "−12", "12%", " 7 ", "3.9", "-3.9", "1e3", "1_000",
+    "abc", "", "nan", None, np.nan, 3.9, -3.9, 0, 42, float("inf"), "  1 2 3 ",
+]
+
+def _yes24_frame(values: list) -> pd.DataFrame:
+    n = len(values)
+    return pd.DataFrame({
+        "입고번호": [f"R{i}" if i % 7 else None for i in range(n)],
+        "상품명": [f"  도서 {i} " if i % 5 else ("" if i % 2 else None) for i in range(n)],
+        "ISBN13": [ISBNS[i % len(ISBNS)] if i % 3 else None for i in range(n)],
+        "입고수량": values,
+        "원가": list(reversed(values)),
+        "조정입고금액": values[3:] + values[:3],
+        "정가": values[5:] + values[:5],
+        "입고율": values[1:] + values[:1],
+    }, dtype=object)
+
+
+def test_yes24_messy_numbers_match_rowwise():
+    df = _yes24_frame(MESSY)
+    _assert_same(_normalize_yes24(_filter_yes24(df)), _ref_yes24(df))
+
+def test_yes24_optional_columns_missing_default_to_zero():
+    df = _yes24_frame(MESSY).drop(columns=["원가", "정가", "입고율", "ISBN13"])
+    _assert_same(_normalize_yes24(_filter_yes24(df)), _ref_yes24(df))
+
+def test_yes24_required_columns_missing():
+    assert _yes24_missing(["상품명", "ISBN13"]) == ["입고번호"]
+    assert _yes24_missing(["입고번호"]) == ["상품명"]
+    assert _yes24_missing(["상품명", "입고번호"]) == []
+
+
+def _kyobo_frame(qty: list, total: list, columns: dict | None = None) -> pd.DataFrame:
+    n = len(qty)
+    df = pd.DataFrame({
+        "상품명": [f"책 {i}" for i in range(n)],
+        "상품코드": [ISBNS[i % len(ISBNS)] for i in range(n)],
+        "수량": qty,
+        "합계금액": total,
+        "정가": [15000 + i for i in range(n)],
+        "공급률": ["60%" if i % 2 else 65 for i in range(n)],
+    }, dtype=object)
+    return df.rename(columns=columns or {})
+
+def _run_kyobo(df: pd.DataFrame) -> None:
+    key_map = _kyobo_key_map(df.columns)
+    _assert_same(_normalize_kyobo(_filter_kyobo(df, key_map), key_map), _ref_kyobo(df, key_map))
+
+def test_kyobo_messy_numbers_match_rowwise():
+    qty = [3, "4", 2.9, "합계", None, 7, "x", 10, -2, 0, "12"]
+    total = [30000, 41000, "1,000", 999, 5, np.nan, 10, "123", 500, 700, 1.5]
+    _run_kyobo(_kyobo_frame(qty, total))
+
+def test_kyobo_qty_zero_or_negative_gives_zero_unit_price():
+    df = _kyobo_frame([0, -1, -5, 0], [1000, 1000, -250, 0])
+    _run_kyobo(df)
+    out = _normalize_kyobo(df, _kyobo_key_map(df.columns))
+    assert out["단가"].tolist() == [0.0, 0.0, 0.0, 0.0]
+
+def test_kyobo_half_cent_rounding_edges_match_round():
+    # 합계/수량이 소수 셋째 자리 5에 걸리는 값(2.675, 0.125, 1.005 …)
+    qty = [8, 8, 8, 40, 200, 200, 400, 1000, 1000, 1000, 16, 80]
+    total = [1, 3, 5, 1, 201, 1, 1, 2675, 1005, 4445, 2, 1]
+    _run_kyobo(_kyobo_frame(qty, total))
+
+def test_unit_price_matches_builtin_round_on_grid():
+    rng = np.random.default_rng(20251104)
+    qty = rng.integers(1, 2000, 5000)
+    total = rng.integers(0, 10_000_000, 5000)
+    got = _unit_price(pd.Series(total), pd.Series(qty)).tolist()
+    assert got == [round(int(t) / int(q), 2) for t, q in zip(total, qty)]
+
+def test_kyobo_aliases_and_optional_columns():
+    df = _kyobo_frame([1, 2, 3], [100, 250, 333], columns={"합계금액": "합계"}).drop(columns=["정가", "상품코드"])
+    _run_kyobo(df)
+
+@pytest.mark.parametrize("drop, missing", [
+    (["상품명"], ["상품명"]),
+    (["수량", "합계금액"], ["수량", "합계금액"]),
+    ([], []),
+])
+def test_kyobo_required_columns_missing(drop, missing):
+    df = _kyobo_frame([1], [100]).drop(columns=drop)
+    assert _kyobo_missing(_kyobo_key_map(df.columns)) == missing
+
+
+def test_large_counts_survive_unified_schema():
+    # int32 스키마였을 때 2**31+5 → -2147483643으로 조용히 감겼다
+    big = 2 ** 31 + 5
+    df = _kyobo_frame([big, 3], [big * 10, 300])
+    df["공급률"] = [big, 60]
+    proc = BookstoreSettlementProcessor(cache=ParseCache(max_mb=0))
+    proc._append(_normalize_kyobo(df, _kyobo_key_map(df.columns)))
+    out = proc.get_unified_dataframe()
+    assert out["입고수량"].tolist() == [big, 3]
+    assert out["입고율"].tolist() == [big, 60]
+    assert out["단가"].tolist() == [10.0, 100.0]
@@ -0,0 +1,99 @@
+"""parse_int_series/parse_float_series가 값마다 safe_int/safe_float와 같은지(시드 고정 무작위 비교)
+
+의도한 차이 하나: int64 범위를 벗어나는 값은 열 dtype(int64)에 담을 수 없어 default가 된다
+(safe_int는 파이썬 큰 정수를 그대로 돌려준다).
+"""
+from __future__ import annotations
+import math
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import parse_float_series, parse_int_series, safe_float, safe_int
+
+INT64_MIN, INT64_MAX = -(2 ** 63), 2 ** 63 - 1
+
+
+def _number(rng: random.Random) -> float | int:
+    kind = rng.random()
+    if kind < 0.4:
+        return rng.randint(-10 ** 7, 10 ** 7)
+    if kind < 0.8:
+        return round(rng.uniform(-1e6, 1e6), rng.randint(0, 4))
+    return rng.choice([0, -0.0, 0.5, -0.5, 0.999, 1e15, 2 ** 53 + 1, 9.2e18, 9.3e18, -9.3e18, 1e300])
+
+def _text(rng: random.Random, v) -> str:
+    neg = isinstance(v, (int, float)) and v < 0
+    s = f"{abs(v):,}" if rng.random() < 0.4 else str(abs(v))
+    if neg:
+        s = rng.choice([f"-{s}", f"−{s}", f"({s})"])
+    if rng.random() < 0.3:
+        s = rng.choice(["₩", "$"]) + s
+    if rng.random() < 0.2:
+        s += "%"
+    if rng.random() < 0.3:
+        s = rng.choice([" ", "  ", "\t"]) + s + rng.choice(["", " ", "\n"])
+    return s
+
+def _value(rng: random.Random):
+    kind = rng.random()
+    v = _number(rng)
+    if kind < 0.35:
+        return _text(rng, v)
+    if kind < 0.6:
+        return v
+    if kind < 0.7:
+        return rng.choice([np.int64(rng.randint(-1000, 1000)), np.float64(v), np.float32(1.5)])
+    return rng.choice([
+        None, np.nan, float("inf"), float("-inf"), "", " ", "abc", "nan", "inf", "-", "1_000", "1e3",
+        "12abc", "1.2.3", "(", "()", "₩", "1 000", "０", "  42  ", "3.", ".5", "+7",
+    ])
+
+def _column(seed: int, n: int = 400) -> pd.Series:
+    rng = random.Random(seed)
+    return pd.Series([_value(rng) for _ in range(n)], dtype=object, name="값")
+
+
+def _expected_int(v, default: int = 0) -> int:
+    want = safe_int(v, default)
+    return want if INT64_MIN <= want <= INT64_MAX else default  # 의도한 차이: int64 밖 → default
+
+def _same_float(a: float, b: float) -> bool:
+    return (math.isnan(a) and math.isnan(b)) or a == b
+
+@pytest.mark.parametrize("seed", range(25))
+def test_parse_float_series_matches_safe_float(seed):
+    s = _column(seed)
+    got = parse_float_series(s)
+    assert got.dtype == "float64"
+    for v, g in zip(s, got):
+        assert _same_float(g, safe_float(v)), repr(v)
+
+@pytest.mark.parametrize("seed", range(25))
+def test_parse_int_series_matches_safe_int(seed):
+    s = _column(seed)
+    got = parse_int_series(s, default=-1)
+    assert got.dtype == "int64"
+    for v, g in zip(s, got):
+        assert g == _expected_int(v, -1), repr(v)
+
+def test_int64_overflow_becomes_default_unlike_safe_int():
+    s = pd.Series([9.3e18, "-9,300,000,000,000,000,000", 2 ** 70, 9.2e18], dtype=object, name="값")
+    assert [safe_int(v) for v in s][:3] == [int(9.3e18), int(-9.3e18), 2 ** 70]
+    stats: dict = {}
+    assert parse_int_series(s, stats=stats).tolist() == [0, 0, 0, int(9.2e18)]
+    assert stats["값"]["invalid"] == 3
+
+@pytest.mark.parametrize("dtype", ["float64", "int64", "string"])
+def test_typed_columns_match_scalars(dtype):
+    rng = random.Random(7)
+    if dtype == "string":
+        s = pd.Series([_text(rng, _number(rng)) for _ in range(200)] + [None], dtype="string", name="값")
+        values = [None if v is pd.NA else v for v in s]
+    else:
+        s = pd.Series([rng.randint(-10 ** 6, 10 ** 6) for _ in range(200)], name="값").astype(dtype)
+        values = s.tolist()
+    assert parse_float_series(s).tolist() == pytest.approx([safe_float(v) for v in values], nan_ok=True)
+    assert parse_int_series(s).tolist() == [_expected_int(v) for v in values]
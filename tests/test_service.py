@@ -0,0 +1,165 @@
+"""정산 작업 서비스: TestClient로 업로드 → 제출 → 중복 → 이벤트 → 결과 → 취소"""
+from __future__ import annotations
+import io
+import os
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+import service as service_mod
+from cache import ParseCache
+from pub_settlement import PARSER_VERSION, BookstoreSettlementProcessor
+from service import JobService, RemoteProcessor, TestClient
+
+
+@pytest.fixture
+def service(tmp_path):
+    svc = JobService(tmp_path / "service", max_jobs=1, cache=ParseCache(directory=str(tmp_path / "cache"), version=PARSER_VERSION))
+    yield svc
+    svc.stop()
+
+@pytest.fixture
+def client(service):
+    with TestClient(service, timeout=60) as c:
+        yield c
+
+def _block_worker(service: JobService) -> threading.Event:
+    """작업 스레드(max_jobs=1)를 붙잡아 다음 작업이 대기 상태로 남게 한다"""
+    gate = threading.Event()
+    service._executor.submit(gate.wait)
+    return gate
+
+def _wait_for(cond, timeout: float = 10.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while not cond():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.02)
+    return True
+
+class _SkipFirstReverse(BookstoreSettlementProcessor):
+    """병렬 처리처럼 첫 파일은 (취소로) 건너뛰고 나머지는 입력과 다른 순서로 끝난다"""
+
+    def process_files(self, filepaths, workers=1, on_result=None, **kwargs):
+        results = []
+        for fp in reversed(list(filepaths)[1:]):
+            cnt, err = self.process_file(fp)
+            results.append((fp, cnt, err))
+            on_result(fp, cnt, err)
+        return results
+
+
+def test_upload_submit_events_result(client, yes24_xlsx, kyobo_xlsx):
+    ids = [client.upload(yes24_xlsx), client.upload(kyobo_xlsx)]
+    assert client.upload(yes24_xlsx) == ids[0]  # 같은 내용은 같은 id
+
+    r = client.post("/jobs", {"files": [{"upload": i} for i in ids]})
+    assert r.status == 202
+    job = r.json()
+    assert not job["deduplicated"]
+
+    events = client.get(f"/jobs/{job['id']}/events").events()
+    kinds = [e for e, _ in events]
+    assert kinds[0] == "state" and kinds[-1] == "done"
+    files = [d for e, d in events if e == "file"]
+    assert [(f["index"], f["name"], f["rows"], f["error"]) for f in files] == [
+        (0, "예스24_정산.xlsx", 40, None), (1, "교보_정산.xlsx", 30, None),
+    ]
+    done = events[-1][1]
+    assert done["state"] == "done" and done["rows"] == 70
+
+    res = client.get(f"/jobs/{job['id']}/result?format=csv")
+    assert res.status == 200
+    df = pd.read_csv(io.BytesIO(res.body), encoding="utf-8-sig")
+    assert len(df) == 70 and df["서점명"].value_counts().to_dict() == {"예스24": 40, "교보문고": 30}
+    assert client.get(f"/jobs/{job['id']}/result?format=bogus").status == 400
+
+
+def test_identical_inputs_are_deduplicated(client, yes24_xlsx):
+    first = client.post("/jobs", {"files": [yes24_xlsx]}).json()
+    client.get(f"/jobs/{first['id']}/events")
+    # 경로로 내도, 같은 내용을 올려서 내도 같은 작업
+    by_path = client.post("/jobs", {"files": [yes24_xlsx]})
+    by_upload = client.post("/jobs", {"files": [{"upload": client.upload(yes24_xlsx)}]})
+    assert by_path.status == 200 and by_path.json()["deduplicated"]
+    assert by_upload.json()["id"] == first["id"]
+    assert by_upload.json()["clients"] == 3
+
+
+def test_cancel_waits_for_every_client(client, service, yes24_xlsx):
+    gate = _block_worker(service)
+    try:
+        job = client.post("/jobs", {"files": [yes24_xlsx]}).json()
+        assert client.post("/jobs", {"files": [yes24_xlsx]}).json()["deduplicated"]
+        assert client.delete(f"/jobs/{job['id']}").json()["state"] == "queued"
+        assert not service.jobs[job["id"]].cancel.is_set()  # 다른 클라이언트가 아직 기다린다
+        client.delete(f"/jobs/{job['id']}")
+        assert service.jobs[job["id"]].cancel.is_set()
+    finally:
+        gate.set()
+    events = client.get(f"/jobs/{job['id']}/events").events()
+    assert events[-1][1]["state"] == "cancelled"
+    assert not [e for e, _ in events if e == "file"]
+    assert client.get(f"/jobs/{job['id']}/result").status == 409
+    # 취소된 작업은 중복 제출에 다시 쓰지 않는다
+    assert not client.post("/jobs", {"files": [yes24_xlsx]}).json()["deduplicated"]
+
+
+def test_queue_limit(tmp_path, yes24_xlsx, kyobo_xlsx):
+    svc = JobService(tmp_path / "svc", max_jobs=1, max_queue=1, cache=ParseCache(max_mb=0))
+    gate = _block_worker(svc)
+    try:
+        with TestClient(svc) as c:
+            assert c.post("/jobs", {"files": [yes24_xlsx]}).status == 202
+            r = c.post("/jobs", {"files": [kyobo_xlsx]})
+            assert r.status == 503
+    finally:
+        gate.set()
+        svc.stop()
+
+
+def test_rejects_non_settlement_inputs(client, tmp_path):
+    notes = tmp_path / "notes.txt"
+    notes.write_text("secret")
+    assert client.post("/jobs", {"files": [str(notes)]}).status == 400
+    assert client.post("/jobs", {"files": [str(tmp_path / "없음.xlsx")]}).status == 404
+    assert client.post("/jobs", {"files": [{"upload": "../../etc/passwd"}]}).status == 400
+    assert client.post("/uploads?name=notes.txt", b"x").status == 400
+    assert client.post("/jobs", b"{bad").status == 400
+    assert client.get("/jobs/nope").status == 404
+
+
+def test_unreferenced_uploads_are_pruned(tmp_path, yes24_xlsx):
+    svc = JobService(tmp_path / "svc", keep_jobs=0, upload_grace=0, cache=ParseCache(max_mb=0))
+    try:
+        with TestClient(svc) as c:
+            upload = c.upload(yes24_xlsx)
+            stored = os.path.join(svc.upload_dir, *upload.split("/"))
+            assert os.path.isfile(stored)
+            job = c.post("/jobs", {"files": [{"upload": upload}]}).json()
+            c.get(f"/jobs/{job['id']}/events")
+            assert job["id"] not in svc.jobs  # keep_jobs=0: 끝나자마자 정리
+            assert _wait_for(lambda: not os.path.exists(stored) and not os.listdir(svc.upload_dir))
+    finally:
+        svc.stop()
+
+
+def test_file_events_carry_input_position(monkeypatch, client, yes24_xlsx, kyobo_xlsx, yes24_small_xlsx):
+    monkeypatch.setattr(service_mod, "BookstoreSettlementProcessor", _SkipFirstReverse)
+    job = client.post("/jobs", {"files": [yes24_xlsx, kyobo_xlsx, yes24_small_xlsx]}).json()
+    files = [d for e, d in client.get(f"/jobs/{job['id']}/events").events() if e == "file"]
+    assert [(f["index"], f["name"], f["rows"]) for f in files] == [(2, "예스24_추가.xlsx", 5), (1, "교보_정산.xlsx", 30)]
+
+def test_remote_processor_maps_results_to_files(monkeypatch, tmp_path, yes24_xlsx, kyobo_xlsx, yes24_small_xlsx):
+    monkeypatch.setattr(service_mod, "BookstoreSettlementProcessor", _SkipFirstReverse)
+    svc = JobService(tmp_path / "svc", cache=ParseCache(max_mb=0))
+    try:
+        proc = RemoteProcessor(svc.start(port=0))
+        results = proc.process_files([yes24_xlsx, kyobo_xlsx, yes24_small_xlsx])
+    finally:
+        svc.stop()
+    assert results == [(yes24_small_xlsx, 5, None), (kyobo_xlsx, 30, None)]
+    assert proc.file_rows == [(yes24_small_xlsx, 5), (kyobo_xlsx, 30)]
+    assert len(proc.get_unified_dataframe()) == 35
@@ -0,0 +1,40 @@
+"""감시 폴더: 재시작 직후에도 쓰는 중인 파일은 debounce가 끝날 때까지 건드리지 않는지"""
+from __future__ import annotations
+import os
+
+from cache import ParseCache
+from conftest import KYOBO_COLUMNS, YES24_COLUMNS, kyobo_rows, write_workbook, yes24_rows
+from pub_settlement import PARSER_VERSION
+from watch import WatchFolder
+
+
+def _watch(folder, tmp_path, events: list | None = None) -> WatchFolder:
+    wf = WatchFolder(str(folder), str(tmp_path / "out.csv"), debounce=1.0,
+                     on_event=None if events is None else lambda kind, path, detail: events.append((kind, path)))
+    wf.cache = ParseCache(directory=str(tmp_path / "cache"), version=PARSER_VERSION)
+    return wf
+
+
+def test_restart_leaves_files_being_written_to_the_debounce(tmp_path):
+    folder = tmp_path / "in"
+    folder.mkdir()
+    a = write_workbook(folder / "예스24_10월.xlsx", YES24_COLUMNS, yes24_rows(10))
+    b = write_workbook(folder / "교보_10월.xlsx", KYOBO_COLUMNS, kyobo_rows(8), title_rows=2)
+    wf = _watch(folder, tmp_path)
+    wf.poll(now=0.0)
+    assert sorted(wf.poll(now=2.0)["added"]) == sorted([a, b])
+
+    # 멈춘 사이에 b를 다시 쓰기 시작했다
+    write_workbook(b, KYOBO_COLUMNS, kyobo_rows(12, seed=1), title_rows=2)
+    events: list = []
+    wf = _watch(folder, tmp_path, events)
+    changes = wf.poll(now=10.0)
+    assert not any(changes.values()) and not events
+    assert list(wf.frames) == [a]  # a는 캐시에서, b는 옛 결과도 다시 파싱도 없이 대기
+    assert len(wf.frames[a]) == 10
+
+    assert wf.poll(now=10.5) == {k: [] for k in changes}  # 아직 debounce 안
+    assert wf.poll(now=11.0)["modified"] == [b]
+    assert events[0] == ("modified", b)
+    assert len(wf.frames[b]) == 12
+    assert os.path.isfile(wf.output)
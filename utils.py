@@ -1,11 +1,17 @@
 from __future__ import annotations
 import os, re
 from datetime import datetime
-import pandas as pd
+from numbers import Real
 
 VERSION = "1.0.0"
 SUPPORTED_EXTS = {".xlsx", ".xls"}
 
+# 이 크기(MB)를 넘는 .xlsx는 행 단위 스트리밍으로 읽는다(PUB_SETTLEMENT_STREAM_MB, 0이면 끔)
+STREAM_ENGINE = "openpyxl-stream"
+STREAM_THRESHOLD_MB = float(os.environ.get("PUB_SETTLEMENT_STREAM_MB", "50"))
+# 취소/진행 표시가 필요한 처리(GUI)에서는 이 크기(MB)부터 스트리밍(PUB_SETTLEMENT_INTERACTIVE_STREAM_MB)
+INTERACTIVE_STREAM_MB = float(os.environ.get("PUB_SETTLEMENT_INTERACTIVE_STREAM_MB", "1"))
+
 _CURRENCY = re.compile(r"[₩$,]")
 _WS = re.compile(r"\s+")
 def _normalize_number_text(s: str) -> str:
@@ -20,9 +26,13 @@ def _normalize_number_text(s: str) -> str:
     s = s.replace(",", "")
     return s
 
+def _is_missing(v) -> bool:
+    # pandas 없이 None/NaN 판별(pd.NA·NaT 등은 아래 변환에서 실패 → 기본값)
+    return v is None or (isinstance(v, Real) and v != v)
+
 def safe_int(v, default: int = 0) -> int:
     try:
-        if pd.isna(v): return default
+        if _is_missing(v): return default
         if isinstance(v, str): v = _normalize_number_text(v)
         return int(float(v))
     except Exception:
@@ -30,25 +40,107 @@ def safe_int(v, default: int = 0) -> int:
 
 def safe_float(v, default: float = 0.0) -> float:
     try:
-        if pd.isna(v): return default
+        if _is_missing(v): return default
         if isinstance(v, str): v = _normalize_number_text(v)
         return float(v)
     except Exception:
         return default
-    
+
+# ----------------- 열 단위 숫자 변환 ----------------- #
+# safe_int/safe_float와 같은 규칙을 Series 전체에 문자열 연산으로 적용한다.
+# pandas는 호출 시점에 불러온다(utils는 GUI 시작 경로에서 pandas 없이 import됨).
+_PAREN_NEG = r"^\((.*)\)$"
+
+def _parse_numeric_series(s):
+    """Series → (float64 값, 결측 마스크, 변환 실패 마스크, 문자열 변환 마스크)"""
+    import numpy as np
+    import pandas as pd
+
+    missing = s.isna()
+    if s.dtype != object and not pd.api.types.is_string_dtype(s):
+        num = pd.to_numeric(s, errors="coerce").astype("float64")
+        none = pd.Series(False, index=s.index)
+        return num, missing, ~missing & num.isna(), none
+
+    num = pd.Series(np.nan, index=s.index, dtype="float64")
+    is_text = s.map(type).eq(str) & ~missing
+    other = ~missing & ~is_text
+    if other.any():
+        num[other] = pd.to_numeric(s[other], errors="coerce").astype("float64")
+    if is_text.any():
+        # _normalize_number_text와 같은 순서로 정리
+        txt = (s[is_text].str.strip()
+               .str.replace("−", "-", regex=False)
+               .str.replace(_CURRENCY.pattern, "", regex=True)
+               .str.replace("%", "", regex=False)
+               .str.replace(_WS.pattern, "", regex=True)
+               .str.replace(_PAREN_NEG, r"-\1", regex=True))
+        num[is_text] = pd.to_numeric(txt, errors="coerce").astype("float64")
+
+    invalid = pd.Series(False, index=s.index)
+    # to_numeric이 거절한 값(예: '1_000', 'nan')만 스칼라 규칙으로 다시 확인
+    retry = ~missing & num.isna()
+    if retry.any():
+        fb = [safe_float(v, None) for v in s[retry]]
+        num[retry] = [np.nan if x is None else x for x in fb]
+        invalid[retry] = [x is None for x in fb]
+    return num, missing, invalid, is_text & ~invalid
+
+def _count(stats: dict | None, name, coerced, invalid) -> None:
+    if stats is None:
+        return
+    c = stats.setdefault(name, {"coerced": 0, "invalid": 0})
+    c["coerced"] += int(coerced.sum())
+    c["invalid"] += int(invalid.sum())
+
+def parse_float_series(s, default: float = 0.0, stats: dict | None = None):
+    """열 단위 safe_float. stats를 주면 stats[열 이름]에 coerced(문자열→숫자)/invalid(기본값 대체) 건수를 더한다."""
+    num, missing, invalid, coerced = _parse_numeric_series(s)
+    _count(stats, s.name, coerced, invalid)
+    return num.mask(missing | invalid, default)
+
+def parse_int_series(s, default: int = 0, stats: dict | None = None):
+    """열 단위 safe_int(소수점 이하 절사, 결측/변환 불가/무한대/int64 범위 밖 → default)
+
+    safe_int와 다른 점은 하나다: int64 범위를 벗어나는 값은 safe_int가 파이썬 큰 정수를 돌려주지만
+    여기서는 열에 담을 수 없으므로 default가 되고 invalid로 센다(tests/test_parse_series.py).
+    """
+    import numpy as np
+
+    num, missing, invalid, coerced = _parse_numeric_series(s)
+    fits = np.isfinite(num) & (num.abs() < 2.0 ** 63)
+    invalid = invalid | (~missing & ~fits)
+    _count(stats, s.name, coerced & ~invalid, invalid)
+    return np.trunc(num.where(fits, default)).astype("int64")
+
 def timestamp(fmt: str = "%Y%m%d_%H%M%S") -> str:
     return datetime.now().strftime(fmt)
 
-def pick_engine(filepath: str) -> str | None:
+def pick_engine(filepath: str, stream_threshold_mb: float | None = None) -> str | None:
     ext = os.path.splitext(filepath)[1].lower()
     if ext == ".xlsx":
+        limit = STREAM_THRESHOLD_MB if stream_threshold_mb is None else stream_threshold_mb
+        try:
+            if limit > 0 and os.path.getsize(filepath) > limit * 1024 * 1024:
+                return STREAM_ENGINE
+        except OSError:
+            pass
         return "openpyxl"
     if ext == ".xls":
         # 주의: xlrd 2.x는 .xls 미지원. 1.2.0 사용 권장
         return "xlrd"
     return None
 
-def detect_bookstore(filepath: str) -> str | None:
+def detect_bookstore(filepath: str, sniff: bool = True) -> str | None:
+    """내용(시트 머리글 시그니처)으로 먼저 감지하고, 실패하면 파일명으로 판단"""
+    if sniff:
+        from sniff import sniff_store
+        bs = sniff_store(filepath)
+        if bs:
+            return bs
+    return detect_bookstore_by_name(filepath)
+
+def detect_bookstore_by_name(filepath: str) -> str | None:
     name = os.path.basename(filepath).lower()
     if ("예스24" in name) or ("yes24" in name):
         return "yes24"
@@ -0,0 +1,276 @@
+"""감시 폴더 증분 처리(새로 생기거나 바뀐 정산서만 파싱해 통합 결과를 갱신)
+
+표준 라이브러리 폴링 방식이다.
+- 주기마다 폴더의 .xls/.xlsx 크기·수정 시각만 본다. 그대로인 파일은 열지 않는다.
+- 크기/수정 시각이 바뀐 파일은 debounce초 동안 그대로일 때(복사·저장이 끝났을 때) 처리한다.
+- 내용 해시가 전과 같으면(다시 저장, 시각만 바뀜) 파싱하지 않는다.
+- 파일별 정규화 결과는 메모리와 ParseCache(내용 해시 키)에 있어, 재시작해도 파싱 없이 다시 합친다.
+- 상태(경로 → 크기, 수정 시각, 해시, 서점, 건수, 오류)는 JSON으로 저장한다. 재시작 때
+  크기/수정 시각이 같으면 내용을 다시 읽지 않는다.
+- 추가/변경/삭제가 있을 때만 통합 결과를 다시 써서 출력 파일을 교체한다.
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from collections.abc import Callable
+import pandas as pd
+
+from cache import ParseCache, file_digest
+from cli import EXIT_OK, EXIT_PARTIAL, EXIT_USAGE
+from export import export, format_for_path
+from pub_settlement import BookstoreSettlementProcessor, PARSER_VERSION, UNIFIED_COLUMNS, UNIFIED_SCHEMA, format_summary
+from utils import SUPPORTED_EXTS
+
+# 폴링 간격/쓰기 완료 대기 시간(초)
+WATCH_INTERVAL = float(os.environ.get("PUB_SETTLEMENT_WATCH_INTERVAL", "5"))
+DEBOUNCE_SECONDS = float(os.environ.get("PUB_SETTLEMENT_WATCH_DEBOUNCE", "2"))
+STATE_VERSION = 1
+
+# (종류, 경로, 내용) 알림. 종류: added / modified / removed / unchanged / error / saved
+EventCallback = Callable[[str, str, str], None]
+
+
+def _is_settlement_file(name: str) -> bool:
+    # 엑셀 잠금 파일(~$...)과 숨김 파일은 건너뛴다
+    return not name.startswith(("~$", ".")) and os.path.splitext(name)[1].lower() in SUPPORTED_EXTS
+
+def scan_folder(folder: str, recursive: bool = False, exclude: frozenset[str] = frozenset()) -> dict[str, tuple[int, int]]:
+    """폴더의 정산서 파일 → (크기, 수정 시각 ns). 내용은 읽지 않는다. exclude(절대 경로)는 건너뛴다."""
+    found: dict[str, tuple[int, int]] = {}
+    stack = [folder]
+    while stack:
+        try:
+            entries = list(os.scandir(stack.pop()))
+        except OSError:
+            continue
+        for e in entries:
+            try:
+                if e.is_dir(follow_symlinks=False):
+                    if recursive and not e.name.startswith("."):
+                        stack.append(e.path)
+                elif e.is_file() and _is_settlement_file(e.name):
+                    path = os.path.abspath(e.path)
+                    if path not in exclude:
+                        st = e.stat()
+                        found[path] = (st.st_size, st.st_mtime_ns)
+            except OSError:  # 스캔 도중 지워진 파일
+                continue
+    return found
+
+
+class WatchFolder:
+    """폴더를 감시하며 바뀐 파일만 BookstoreSettlementProcessor로 파싱해 통합 결과를 유지한다"""
+
+    def __init__(
+        self,
+        folder: str,
+        output: str,
+        state_path: str | None = None,
+        debounce: float = DEBOUNCE_SECONDS,
+        recursive: bool = False,
+        workers: int = 1,
+        on_event: EventCallback | None = None,
+    ):
+        self.folder = os.path.abspath(folder)
+        self.output = os.path.abspath(output)
+        self.state_path = os.path.abspath(state_path or self.output + ".watch.json")
+        root, ext = os.path.splitext(self.output)
+        self._tmp_output = f"{root}.tmp{ext}"
+        # 출력 파일을 감시 폴더 안에 두어도 자기 결과를 정산서로 다시 읽지 않게 한다
+        self._own_files = frozenset({self.output, self._tmp_output, self.state_path, self.state_path + ".tmp"})
+        self.debounce = debounce
+        self.recursive = recursive
+        self.workers = workers
+        self.on_event = on_event
+        self.cache = ParseCache(version=PARSER_VERSION)
+        self.files: dict[str, dict] = {}  # 경로 → {"size", "mtime_ns", "digest", "store", "rows", "error"}
+        self.frames: dict[str, pd.DataFrame] = {}  # 경로 → 그 파일의 통합 결과
+        self._pending: dict[str, tuple[int, int, float]] = {}  # 경로 → (크기, 수정 시각, 처음 본 시각)
+        self._load_state()
+
+    # ----------------- 상태 ----------------- #
+    def _load_state(self) -> None:
+        try:
+            with open(self.state_path, encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return
+        if state.get("version") != STATE_VERSION or state.get("folder") != self.folder:
+            return
+        files = state.get("files", {})
+        if state.get("parser_version") != PARSER_VERSION:
+            # 파서가 바뀌면 내용 해시는 그대로 쓰되 결과는 다시 파싱한다
+            for rec in files.values():
+                rec["store"] = rec["rows"] = None
+        self.files = files
+
+    def _save_state(self) -> None:
+        state = {"version": STATE_VERSION, "parser_version": PARSER_VERSION, "folder": self.folder, "files": self.files}
+        tmp = self.state_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, self.state_path)
+
+    def _emit(self, kind: str, path: str, detail: str = "") -> None:
+        if self.on_event is not None:
+            self.on_event(kind, path, detail)
+
+    # ----------------- 감시 ----------------- #
+    def poll(self, now: float | None = None) -> dict[str, list[str]]:
+        """한 번 훑어 쓰기가 끝난 변경분을 반영한다. 종류별 경로 목록을 돌려준다."""
+        now = time.monotonic() if now is None else now
+        seen = scan_folder(self.folder, self.recursive, self._own_files)
+        changes: dict[str, list[str]] = {"added": [], "modified": [], "removed": [], "unchanged": [], "error": []}
+
+        removed = [p for p in self.files if p not in seen]
+        for p in removed:
+            del self.files[p]
+            self.frames.pop(p, None)
+            self._emit("removed", p)
+        changes["removed"] = removed
+        for p in [p for p in self._pending if p not in seen]:
+            del self._pending[p]
+
+        ready: list[str] = []
+        for p, (size, mtime) in seen.items():
+            rec = self.files.get(p)
+            if rec is not None and (rec["size"], rec["mtime_ns"]) == (size, mtime):
+                self._pending.pop(p, None)
+                continue
+            first = self._pending.get(p)
+            if first is None or first[:2] != (size, mtime):
+                self._pending[p] = (size, mtime, now)  # 아직 쓰는 중일 수 있다
+            elif now - first[2] >= self.debounce:
+                del self._pending[p]
+                ready.append(p)
+
+        parse: list[str] = []
+        for p in sorted(ready):
+            size, mtime = seen[p]
+            try:
+                digest = file_digest(p)
+            except OSError as e:
+                self._emit("error", p, str(e))
+                continue
+            rec = self.files.get(p)
+            if rec is not None and rec["digest"] == digest and rec.get("rows") is not None:
+                rec.update(size=size, mtime_ns=mtime)  # 내용은 그대로
+                changes["unchanged"].append(p)
+                continue
+            changes["modified" if rec is not None else "added"].append(p)
+            self.files[p] = {"size": size, "mtime_ns": mtime, "digest": digest, "store": None, "rows": None, "error": None}
+            parse.append(p)
+
+        # 재시작 직후: 상태에는 있지만 메모리에 결과가 없는 파일은 캐시에서 채운다(없으면 다시 파싱).
+        # 쓰는 중인(_pending) 파일은 debounce가 끝나 ready로 들어올 때 처리한다.
+        for p, rec in self.files.items():
+            if p not in self.frames and p not in parse and p not in self._pending and rec.get("error") is None:
+                frame = self._from_cache(rec)
+                if frame is not None:
+                    self.frames[p] = frame
+                else:
+                    parse.append(p)
+
+        if parse:
+            self._parse(parse, changes)
+        if removed or parse:
+            self.save()
+        if removed or ready:
+            self._save_state()
+        return changes
+
+    def _from_cache(self, rec: dict) -> pd.DataFrame | None:
+        if not rec.get("store") or rec.get("rows") is None or not self.cache.enabled:
+            return None
+        try:
+            frame = self.cache.get(self.cache.key(rec["digest"], rec["store"]))
+        except OSError:
+            return None
+        return frame if frame is not None and len(frame) == rec["rows"] else None
+
+    def _parse(self, paths: list[str], changes: dict[str, list[str]]) -> None:
+        proc = BookstoreSettlementProcessor(cache=self.cache)
+        results = proc.process_files(paths, workers=self.workers)
+        stores = {r["path"]: r.get("store") for r in proc.report.files}
+        frames = dict(proc.iter_file_frames())
+        for fp, cnt, err in results:
+            rec = self.files[fp]
+            rec.update(store=stores.get(fp), rows=cnt, error=err)
+            if err is not None:
+                self.frames.pop(fp, None)  # 고칠 때까지(크기/수정 시각이 바뀔 때까지) 결과에서 뺀다
+                changes["error"].append(fp)
+                self._emit("error", fp, err)
+            else:
+                self.frames[fp] = frames[fp].reset_index(drop=True)
+                self._emit("modified" if fp in changes["modified"] else "added", fp, f"{cnt}건")
+        self._save_state()
+
+    # ----------------- 결과 ----------------- #
+    def chunks(self) -> list[pd.DataFrame]:
+        """파일 경로 순서의 통합 결과 묶음"""
+        return [self.frames[p] for p in sorted(self.frames)]
+
+    def get_unified_dataframe(self) -> pd.DataFrame:
+        chunks = self.chunks()
+        if not chunks:
+            return pd.DataFrame(columns=UNIFIED_COLUMNS).astype(UNIFIED_SCHEMA)
+        return pd.concat(chunks, ignore_index=True)
+
+    def save(self) -> None:
+        """통합 결과를 임시 파일에 쓴 뒤 출력 파일과 바꾼다(읽는 쪽이 반쯤 쓴 파일을 보지 않게)"""
+        chunks = self.chunks() or [pd.DataFrame(columns=UNIFIED_COLUMNS).astype(UNIFIED_SCHEMA)]
+        export(chunks, self._tmp_output, format_for_path(self.output))
+        os.replace(self._tmp_output, self.output)
+        self._emit("saved", self.output, f"{sum(len(c) for c in chunks)}건")
+
+    def run(self, interval: float = WATCH_INTERVAL, stop: threading.Event | None = None) -> None:
+        """stop이 set()될 때까지(없으면 Ctrl+C까지) interval초마다 poll"""
+        stop = stop or threading.Event()
+        try:
+            while not stop.is_set():
+                self.poll()
+                stop.wait(interval)
+        except KeyboardInterrupt:
+            pass
+
+
+# ----------------- 명령줄 ----------------- #
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(prog="pub-settlement-watch", description="정산서 폴더를 감시해 바뀐 파일만 통합 결과에 반영")
+    ap.add_argument("folder", help="감시할 폴더")
+    ap.add_argument("-o", "--output", required=True, help="통합 결과 파일(.xlsx/.csv/.parquet/.feather)")
+    ap.add_argument("--state", help="상태 파일(기본: 출력 파일명.watch.json)")
+    ap.add_argument("-r", "--recursive", action="store_true", help="하위 폴더도 감시")
+    ap.add_argument("-j", "--workers", type=int, default=1, help="한 번에 바뀐 파일이 여럿일 때 병렬 파싱 프로세스 수")
+    ap.add_argument("--interval", type=float, default=WATCH_INTERVAL, help=f"폴링 간격 초(기본 {WATCH_INTERVAL:g})")
+    ap.add_argument("--debounce", type=float, default=DEBOUNCE_SECONDS, help=f"쓰기 완료 대기 초(기본 {DEBOUNCE_SECONDS:g})")
+    ap.add_argument("--once", action="store_true", help="쓰기 대기 없이 한 번만 반영하고 종료")
+    args = ap.parse_args(argv)
+
+    if not os.path.isdir(args.folder):
+        print(f"폴더가 없습니다: {args.folder}", file=sys.stderr)
+        return EXIT_USAGE
+
+    def log(kind: str, path: str, detail: str) -> None:
+        print(f"[{time.strftime('%H:%M:%S')}] {kind:<9} {os.path.basename(path)} {detail}".rstrip(), file=sys.stderr)
+
+    watcher = WatchFolder(
+        args.folder, args.output, args.state,
+        debounce=0.0 if args.once else args.debounce,
+        recursive=args.recursive, workers=args.workers, on_event=log,
+    )
+    if args.once:
+        watcher.poll()  # 처음 본 파일을 대기열에 올리고
+        watcher.poll()  # 곧바로 반영
+        print(format_summary(watcher.get_unified_dataframe()))
+        return EXIT_PARTIAL if any(r.get("error") for r in watcher.files.values()) else EXIT_OK
+    watcher.run(args.interval)
+    return EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())